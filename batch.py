@@ -0,0 +1,185 @@
+import argparse
+import json
+import logging
+import os
+import re
+import statistics
+import time
+from pathlib import Path
+
+from src.agents.rpp_agent import RPPAgent, RPP_SECTIONS, build_rpp_query
+from src.config.config import MODEL_CONFIG
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ["mata_pelajaran", "kelas", "topik", "durasi"]
+
+
+def load_requests(input_file):
+    """
+    Read RPP requests from a JSONL file
+
+    Each line is an object with mata_pelajaran, kelas, topik and durasi, and
+    optionally an id and a list of sections from RPP_SECTIONS. Requests
+    without an id are numbered by their line.
+
+    Args:
+        input_file (str): Path to the JSONL request file
+
+    Returns:
+        List[Dict[str, Any]]: Requests in file order
+
+    Raises:
+        ValueError: If a line lacks a required field or names an unknown section
+    """
+    requests = []
+    with open(input_file, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            request = json.loads(line)
+            missing = [field for field in REQUIRED_FIELDS if not request.get(field)]
+            if missing:
+                raise ValueError(f"Baris {line_number}: field {', '.join(missing)} tidak ada")
+            sections = request.get("sections")
+            if sections is not None and (
+                    not isinstance(sections, list) or any(section not in RPP_SECTIONS for section in sections)):
+                raise ValueError(f"Baris {line_number}: sections harus daftar bagian dari: {', '.join(RPP_SECTIONS)}")
+            request.setdefault("id", f"rpp-{line_number}")
+            request["id"] = str(request["id"])
+            requests.append(request)
+    return requests
+
+
+def load_completed(results_file):
+    """Get the IDs of requests that already finished successfully"""
+    completed = set()
+    if results_file.exists():
+        with open(results_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by an interruption
+                    continue
+                if result.get("status") == "ok":
+                    completed.add(result["id"])
+    return completed
+
+
+def append_result(results_file, result):
+    """Append one result line and make sure it reaches the disk"""
+    with open(results_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_markdown(path, content):
+    """Write the compiled RPP atomically so an interruption never leaves half a file"""
+    tmp_path = path.with_suffix(".md.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def generate_request(agent, request, output_dir, max_concurrency):
+    """
+    Generate, compile and save the RPP of one request
+
+    Args:
+        agent (RPPAgent): Agent used for generation
+        request (Dict[str, Any]): RPP request
+        output_dir (Path): Directory for the compiled markdown
+        max_concurrency (int): Maximum concurrent section generations
+
+    Returns:
+        Dict[str, Any]: Result line for the results JSONL
+    """
+    context = {field: request[field] for field in REQUIRED_FIELDS}
+    query = build_rpp_query(**context)
+
+    start = time.perf_counter()
+    sections = {}
+    section_timings = {}
+    with agent.generate_all_sections(query, context, max_concurrency=max_concurrency,
+                                     sections=request.get("sections")) as batch:
+        for result in batch:
+            sections[result["section_name"]] = result["section_content"]
+            section_timings[result["section_name"]] = result["timings"]
+
+    output_file = output_dir / f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', request['id'])}.md"
+    write_markdown(output_file, agent.compile_full_rpp(sections))
+    latency = time.perf_counter() - start
+
+    return {
+        "id": request["id"],
+        "status": "ok",
+        "output_file": str(output_file),
+        "context": context,
+        "latency": latency,
+        "section_timings": section_timings
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pembuatan RPP secara batch dari file JSONL")
+    parser.add_argument("input_file", help="File JSONL berisi permintaan RPP")
+    parser.add_argument("--output-dir", default="rpp_output", help="Direktori hasil RPP")
+    parser.add_argument("--max-concurrency", type=int, default=MODEL_CONFIG["max_concurrency"],
+                        help="Jumlah bagian yang dibuat bersamaan")
+    args = parser.parse_args()
+
+    requests = load_requests(args.input_file)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results_file = output_dir / "results.jsonl"
+
+    # Resume: skip requests that already finished in an earlier run
+    completed = load_completed(results_file)
+    pending = [request for request in requests if request["id"] not in completed]
+    print(f"{len(requests)} permintaan, {len(requests) - len(pending)} sudah selesai, {len(pending)} diproses")
+    if not pending:
+        return
+
+    agent = RPPAgent()
+    if MODEL_CONFIG["warm_up"]:
+        warm_up = agent.warm_up()
+        if warm_up.get("warm_up") is not None:
+            print(f"Model siap dalam {warm_up['warm_up']:.1f} detik (muat model {warm_up.get('load', 0):.1f} detik)")
+
+    latencies = []
+    failed = 0
+    start = time.perf_counter()
+    for index, request in enumerate(pending, start=1):
+        try:
+            result = generate_request(agent, request, output_dir, args.max_concurrency)
+            latencies.append(result["latency"])
+            print(f"[{index}/{len(pending)}] {request['id']}: selesai dalam {result['latency']:.1f} detik "
+                  f"-> {result['output_file']}")
+        except Exception as e:
+            logger.error(f"Error generating RPP {request['id']}: {str(e)}")
+            result = {"id": request["id"], "status": "error", "error": str(e)}
+            failed += 1
+            print(f"[{index}/{len(pending)}] {request['id']}: gagal ({str(e)})")
+        append_result(results_file, result)
+    elapsed = time.perf_counter() - start
+
+    print("\n=== Ringkasan Batch ===")
+    print(f"- Berhasil: {len(latencies)}, gagal: {failed}")
+    print(f"- Waktu total: {elapsed:.1f} detik")
+    if latencies:
+        print(f"- Throughput: {len(latencies) / elapsed * 3600:.1f} RPP/jam")
+        print(f"- Latensi per RPP: rata-rata {statistics.mean(latencies):.1f} detik, "
+              f"median {statistics.median(latencies):.1f} detik, maks {max(latencies):.1f} detik")
+    print(f"- Hasil: {results_file}")
+
+
+if __name__ == "__main__":
+    main()
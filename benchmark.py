@@ -0,0 +1,398 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.config.config import DATA_CONFIG, DATA_DIR
+from src.utils.system import get_rss_mb
+
+
+def bench_ingest(args):
+    """Compare serial and process-pool document loading and chunking"""
+    from src.data.data_processor import DataProcessor
+
+    processor = DataProcessor()
+    file_paths = processor.find_files(args.directory)
+    if not file_paths:
+        print(f"Tidak ditemukan dokumen di direktori: {args.directory}")
+        return
+
+    print(f"Benchmark ingest: {len(file_paths)} file di {args.directory}")
+
+    def run(workers):
+        start = time.perf_counter()
+        chunk_count = sum(len(chunks) for _, chunks in processor.iter_directory(
+            args.directory, file_paths=file_paths, workers=workers))
+        return time.perf_counter() - start, chunk_count
+
+    # Warm up imports, loaders and the page cache so neither timed run pays for them
+    run(1)
+
+    # iter_directory never starts more workers than there are files
+    workers = max(1, min(args.workers, len(file_paths)))
+    runs = [("serial", 1)]
+    if workers > 1:
+        runs.append((f"parallel ({workers} workers)", workers))
+
+    results = {}
+    for label, run_workers in runs:
+        best = None
+        for _ in range(args.repeat):
+            elapsed, chunk_count = run(run_workers)
+            best = elapsed if best is None else min(best, elapsed)
+        results[label] = best
+        print(f"- {label}: {best:.2f} detik, {chunk_count} chunks")
+
+    if workers <= 1:
+        print("Perbandingan paralel dilewati: hanya 1 worker (atur --workers atau tambah file)")
+        return
+
+    serial_time, parallel_time = results.values()
+    if parallel_time > 0:
+        print(f"Speedup: {serial_time / parallel_time:.2f}x")
+
+
+def _memory_stress_worker(directory, worker_id, records, max_items):
+    """Add records memories from one process"""
+    from src.memory.memory_store import MemoryStoreManager
+
+    store = MemoryStoreManager(directory, max_items=max_items)
+    ids = []
+    for i in range(records):
+        ids.append(store.add_memory("stress", {"worker": worker_id, "n": i}, {"rpp_id": f"{worker_id}-{i}"}))
+
+        # Interleave flushes and reads so processes contend for the write lock
+        # and reload each other's commits
+        if i % 10 == 0:
+            store.flush()
+        if i % 25 == 0:
+            store.get_memory_counts()
+    store.close()
+    return ids
+
+
+def bench_memory_stress(args):
+    """Hammer one memory store from several processes and check nothing is lost"""
+    from src.memory.memory_store import MemoryStoreManager
+
+    directory = args.directory or tempfile.mkdtemp(prefix="memory_stress_")
+    expected = args.processes * args.records
+    print(f"Stress test memory store: {args.processes} proses x {args.records} memori di {directory}")
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.processes) as pool:
+        results = pool.starmap(
+            _memory_stress_worker,
+            [(directory, worker_id, args.records, expected) for worker_id in range(args.processes)]
+        )
+    elapsed = time.perf_counter() - start
+
+    returned_ids = [memory_id for ids in results for memory_id in ids]
+    memories = MemoryStoreManager(directory, max_items=expected).get_memories("stress")
+    stored = {(m["content"]["worker"], m["content"]["n"]) for m in memories}
+    stored_ids = {m["id"] for m in memories}
+
+    print(f"- Waktu: {elapsed:.2f} detik ({expected / elapsed:.0f} memori/detik)")
+    print(f"- Memori tersimpan: {len(stored)} dari {expected}")
+    print(f"- ID unik: {len(set(returned_ids)) == len(returned_ids)}, "
+          f"cocok dengan database: {stored_ids == set(returned_ids)}")
+
+    if len(stored) != expected or stored_ids != set(returned_ids):
+        raise SystemExit("Stress test gagal: ada memori yang hilang atau ID yang bentrok")
+    print("Stress test berhasil: tidak ada memori yang hilang")
+
+
+def _latency_summary(latencies):
+    """Format p50/p95/max of latencies given in seconds, in milliseconds"""
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (f"p50 {statistics.median(ordered) * 1000:.2f} ms, p95 {p95 * 1000:.2f} ms, "
+            f"maks {ordered[-1] * 1000:.2f} ms")
+
+
+def bench_hybrid_search(args):
+    """Measure BM25 query latency as the corpus grows, and hybrid vs dense on the live collection"""
+    from src.models.lexical_index import LexicalIndex
+
+    rng = random.Random(0)
+    vocabulary = [f"istilah{i}" for i in range(args.vocabulary)] + [
+        "kompetensi", "dasar", "indikator", "tujuan", "pembelajaran", "materi", "penilaian",
+        "kelas", "xii", "xi", "x", "3.1", "3.2", "4.1", "siswa", "guru", "kurikulum"
+    ]
+    queries = [" ".join(rng.choices(vocabulary, k=rng.randint(3, 8))) for _ in range(args.queries)]
+
+    print(f"Benchmark pencarian leksikal: {args.queries} query per ukuran korpus")
+    with tempfile.TemporaryDirectory() as directory:
+        index = LexicalIndex(os.path.join(directory, "lexical_index.sqlite3"))
+        indexed = 0
+        for size in args.sizes:
+            start = time.perf_counter()
+            batch_ids = [f"chunk-{i}" for i in range(indexed, size)]
+            batch_texts = [" ".join(rng.choices(vocabulary, k=args.chunk_terms)) for _ in batch_ids]
+            if batch_ids:
+                index.add(batch_ids, batch_texts)
+            indexed = max(indexed, size)
+            build_time = time.perf_counter() - start
+
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query, k=20)
+                latencies.append(time.perf_counter() - start)
+            print(f"- {size} chunks (indeks +{build_time:.1f} detik): {_latency_summary(latencies)}")
+
+    if args.live:
+        from src.models.vector_store import VectorStoreManager
+
+        vector_store = VectorStoreManager()
+        embedded = [(query, vector_store.embed_query(query)) for query in args.live]
+        print(f"\nKoleksi aktif ({vector_store.get_collection_stats()['count']} chunks):")
+        for mode in ["dense", "hybrid"]:
+            latencies = []
+            for query, embedding in embedded:
+                start = time.perf_counter()
+                vector_store.search(query, embedding, k=3, mode=mode)
+                latencies.append(time.perf_counter() - start)
+            print(f"- {mode}: {_latency_summary(latencies)}")
+
+
+VECTOR_BACKEND_VARIANTS = {
+    "chroma": {},
+    "flat-float16": {"index_type": "flat", "dtype": "float16"},
+    "flat-int8": {"index_type": "flat", "dtype": "int8"},
+    "ivf-float16": {"index_type": "ivf", "dtype": "float16"},
+    "ivf-int8": {"index_type": "ivf", "dtype": "int8"}
+}
+
+
+def _open_vector_backend(variant, directory, args):
+    """Open one benchmarked backend variant stored in directory"""
+    from src.models.vector_backends import ChromaBackend, NumpyIndexBackend
+
+    if variant == "chroma":
+        return ChromaBackend("benchmark", directory)
+    return NumpyIndexBackend(directory, ivf_lists=args.ivf_lists, ivf_probes=args.ivf_probes,
+                             **VECTOR_BACKEND_VARIANTS[variant])
+
+
+def _vector_backend_worker(variant, directory, args, queries, truth):
+    """Open a built backend in a fresh process and time queries against exact neighbours"""
+    # Import the backend's libraries first so only the index itself is measured
+    with tempfile.TemporaryDirectory() as scratch:
+        _open_vector_backend("chroma" if variant == "chroma" else "flat-float16", scratch, args)
+    baseline = get_rss_mb()
+
+    start = time.perf_counter()
+    backend = _open_vector_backend(variant, directory, args)
+    backend.count()
+    load_time = time.perf_counter() - start
+
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        ids = backend.query(query.tolist(), args.k)["ids"]
+        latencies.append(time.perf_counter() - start)
+        hits += len(set(ids) & set(expected))
+
+    return {
+        "load_time": load_time,
+        "latencies": latencies,
+        "recall": hits / (len(queries) * args.k),
+        "rss_mb": get_rss_mb() - baseline if baseline is not None else None
+    }
+
+
+def _directory_size_mb(directory):
+    return sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names
+    ) / (1024 * 1024)
+
+
+def bench_vector_backends(args):
+    """Compare recall@k, query latency, memory and load time of the vector backends"""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(args.clusters, args.dim))
+    vectors = centers[rng.integers(0, args.clusters, args.size)] + args.noise * rng.normal(size=(args.size, args.dim))
+    vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+    queries = vectors[rng.integers(0, args.size, args.queries)] + 0.05 * rng.normal(size=(args.queries, args.dim))
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+    ids = [f"chunk-{i}" for i in range(args.size)]
+    truth = [[ids[i] for i in np.argsort(-(vectors @ query))[:args.k]] for query in queries]
+
+    print(f"Benchmark vector backend: {args.size} vektor x {args.dim} dimensi, "
+          f"{args.queries} query, recall@{args.k} terhadap pencarian eksak")
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as root:
+        for variant in args.backends:
+            directory = os.path.join(root, variant)
+            backend = _open_vector_backend(variant, directory, args)
+            start = time.perf_counter()
+            for offset in range(0, args.size, 1000):
+                batch = slice(offset, offset + 1000)
+                backend.add(ids[batch], vectors[batch].tolist(), [f"teks {i}" for i in ids[batch]],
+                            [{"kelas": str(i % 3)} for i in range(batch.start, min(batch.stop, args.size))])
+            backend.persist()
+            build_time = time.perf_counter() - start
+            del backend
+
+            # A fresh process per backend so load time and memory are not shared
+            with context.Pool(1) as pool:
+                result = pool.apply(_vector_backend_worker, (variant, directory, args, queries, truth))
+
+            print(f"- {variant}: recall@{args.k} {result['recall']:.3f}, {_latency_summary(result['latencies'])}")
+            rss = f"+{result['rss_mb']:.0f} MB" if result["rss_mb"] is not None else "n/a"
+            print(f"    build {build_time:.1f} detik, load {result['load_time'] * 1000:.0f} ms, "
+                  f"RSS {rss}, disk {_directory_size_mb(directory):.0f} MB")
+
+
+def bench_warm_start(args):
+    """Show per-call model load and prefill time across the section prompts of one RPP"""
+    from src.agents.rpp_agent import RPPAgent, RPP_SECTIONS, build_rpp_query
+    from src.utils.llm_metrics import GenerationInfoHandler
+
+    agent = RPPAgent()
+    query = build_rpp_query(args.mata_pelajaran, args.kelas, args.topik, args.durasi)
+    relevant_docs, _ = agent._retrieve(query)
+
+    if args.warm_up:
+        warm_up = agent.warm_up()
+        print(f"Warm-up: {warm_up.get('warm_up', 0):.2f} detik, muat model {warm_up.get('load', 0):.2f} detik, "
+              f"prefill {warm_up.get('prefill', 0):.2f} detik")
+
+    print(f"Benchmark warm start: {len(RPP_SECTIONS)} bagian, maks {args.num_predict} token keluaran per bagian")
+    for section in RPP_SECTIONS:
+        timings = {}
+        prompt_text, _ = agent._build_prompt(agent._get_section_prompt(section), query, relevant_docs, timings,
+                                             {"feedback": "-"})
+        handler = GenerationInfoHandler()
+        start = time.perf_counter()
+        agent.llm.invoke(prompt_text, config={"callbacks": [handler]}, num_predict=args.num_predict)
+        timings["llm"] = time.perf_counter() - start
+        timings.update(handler.get_timings())
+
+        # Ollama only counts the prompt tokens it had to evaluate, so a
+        # reused prefix shows up as fewer evaluated than estimated tokens
+        print(f"- {section}: total {timings['llm']:.2f} detik, muat model {timings.get('load', 0):.2f} detik, "
+              f"prefill {timings.get('prefill', 0):.2f} detik "
+              f"({timings.get('prompt_eval_tokens', '?')} dari ~{timings['prompt_tokens']} token prompt)")
+
+
+# Modules that must not be imported before the menu is shown
+HEAVY_MODULES = ["torch", "sentence_transformers", "chromadb", "langchain", "langchain_core", "langchain_community"]
+
+# Runs in a fresh interpreter with every store pointed at a scratch directory
+# (sys.argv[2]), so the benchmark never migrates or trims the user's data
+STARTUP_SNIPPET = """
+import json, os, sys, time
+start = time.perf_counter()
+from src.config import config
+scratch = sys.argv[2]
+config.MEMORY_STORE_CONFIG["persist_directory"] = os.path.join(scratch, "personal_memory")
+config.VECTOR_STORE_CONFIG["persist_directory"] = os.path.join(scratch, "vector_store")
+config.EMBEDDING_CACHE_CONFIG["directory"] = os.path.join(scratch, "embedding_cache")
+config.RESPONSE_CACHE_CONFIG["path"] = os.path.join(scratch, "response_cache.sqlite3")
+from src.agents.rpp_agent import RPPAgent
+RPPAgent()
+elapsed = time.perf_counter() - start
+heavy = sorted({name.split(".")[0] for name in sys.modules} & set(json.loads(sys.argv[1])))
+print(json.dumps({"elapsed": elapsed, "heavy_modules": heavy}))
+"""
+
+
+def bench_startup(args):
+    """Measure the time from launch until RPPAgent is ready to show the menu"""
+    print(f"Benchmark startup: {args.repeat} kali")
+
+    agent_times = []
+    process_times = []
+    heavy_modules = set()
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory(prefix="startup_") as scratch:
+            start = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, "-c", STARTUP_SNIPPET, json.dumps(HEAVY_MODULES), scratch],
+                capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+            ).stdout
+            process_times.append(time.perf_counter() - start)
+
+        result = json.loads(output.strip().splitlines()[-1])
+        agent_times.append(result["elapsed"])
+        heavy_modules.update(result["heavy_modules"])
+
+    print(f"- Import + RPPAgent(): terbaik {min(agent_times):.3f} detik, terburuk {max(agent_times):.3f} detik")
+    print(f"- Proses (termasuk interpreter): terbaik {min(process_times):.3f} detik")
+    print(f"- Modul berat yang dimuat: {', '.join(sorted(heavy_modules)) or '-'}")
+
+    if min(agent_times) > args.max_seconds:
+        raise SystemExit(f"Startup lebih lambat dari {args.max_seconds} detik")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark komponen sistem RPP")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Serial vs parallel document loading")
+    ingest_parser.add_argument("--directory", default=str(DATA_DIR))
+    ingest_parser.add_argument("--workers", type=int, default=DATA_CONFIG["ingest_workers"])
+    ingest_parser.add_argument("--repeat", type=int, default=3)
+    ingest_parser.set_defaults(func=bench_ingest)
+
+    stress_parser = subparsers.add_parser("memory-stress", help="Concurrent multi-process memory store writes")
+    stress_parser.add_argument("--directory", default=None, help="Store directory (default: a new temp dir)")
+    stress_parser.add_argument("--processes", type=int, default=8)
+    stress_parser.add_argument("--records", type=int, default=500)
+    stress_parser.set_defaults(func=bench_memory_stress)
+
+    hybrid_parser = subparsers.add_parser("hybrid-search", help="BM25 and hybrid retrieval query latency")
+    hybrid_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    hybrid_parser.add_argument("--queries", type=int, default=200)
+    hybrid_parser.add_argument("--vocabulary", type=int, default=20000)
+    hybrid_parser.add_argument("--chunk-terms", type=int, default=150)
+    hybrid_parser.add_argument("--live", nargs="*", default=None, metavar="QUERY",
+                               help="Also time dense vs hybrid search for these queries on the real collection")
+    hybrid_parser.set_defaults(func=bench_hybrid_search)
+
+    backends_parser = subparsers.add_parser("vector-backends", help="Chroma vs quantized NumPy vector indexes")
+    backends_parser.add_argument("--backends", nargs="+", default=list(VECTOR_BACKEND_VARIANTS),
+                                 choices=list(VECTOR_BACKEND_VARIANTS))
+    backends_parser.add_argument("--size", type=int, default=10000)
+    backends_parser.add_argument("--dim", type=int, default=384)
+    backends_parser.add_argument("--clusters", type=int, default=200)
+    backends_parser.add_argument("--noise", type=float, default=0.5)
+    backends_parser.add_argument("--queries", type=int, default=200)
+    backends_parser.add_argument("-k", type=int, default=10)
+    backends_parser.add_argument("--ivf-lists", type=int, default=64)
+    backends_parser.add_argument("--ivf-probes", type=int, default=8)
+    backends_parser.set_defaults(func=bench_vector_backends)
+
+    warm_parser = subparsers.add_parser("warm-start", help="Model load and prefill time per section call (needs Ollama)")
+    warm_parser.add_argument("--mata-pelajaran", default="Matematika")
+    warm_parser.add_argument("--kelas", default="X")
+    warm_parser.add_argument("--topik", default="Persamaan Linear")
+    warm_parser.add_argument("--durasi", default="90")
+    warm_parser.add_argument("--num-predict", type=int, default=16)
+    warm_parser.add_argument("--no-warm-up", dest="warm_up", action="store_false")
+    warm_parser.set_defaults(func=bench_warm_start)
+
+    startup_parser = subparsers.add_parser("startup", help="Time to construct RPPAgent in a fresh process")
+    startup_parser.add_argument("--repeat", type=int, default=5)
+    startup_parser.add_argument("--max-seconds", type=float, default=1.0,
+                                help="Fail if the best startup time exceeds this")
+    startup_parser.set_defaults(func=bench_startup)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import os
+import itertools
 import logging
 from pathlib import Path
-from src.agents.rpp_agent import RPPAgent
+from src.agents.rpp_agent import RPPAgent, RPP_SECTIONS, build_rpp_query
+from src.config.config import MODEL_CONFIG
 
 # Configure logging
 logging.basicConfig(
@@ -10,11 +12,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def print_stream(stream):
+    """Print streamed tokens as they arrive and return the generator's result"""
+    while True:
+        try:
+            token = next(stream)
+        except StopIteration as stop:
+            print()
+            return stop.value
+        print(token, end="", flush=True)
+
+def print_prompt_stats(timings):
+    """Print the prompt size, context packing and prefill time of one generation"""
+    if timings.get("response_cache_hit"):
+        return
+    line = (f"(prompt ~{timings['prompt_tokens']} token, konteks {timings['context_chunks']} chunk, "
+            f"{timings['dropped_chunks']} dibuang, {timings['duplicate_chunks']} duplikat")
+    if timings.get("load") is not None:
+        line += f", muat model {timings['load']:.2f} detik"
+    if timings.get("prefill") is not None:
+        line += f", prefill {timings['prefill']:.2f} detik"
+    print(line + ")")
+
+def print_stream_stats(timings):
+    """Print the streaming speed and prompt statistics of a streamed section"""
+    if timings.get("time_to_first_token") is not None:
+        print(f"(token pertama {timings['time_to_first_token']:.1f} detik, "
+              f"{timings['tokens_per_second'] or 0:.1f} token/detik)")
+    print_prompt_stats(timings)
+
 def main():
     try:
         # Initialize RPP Agent
         agent = RPPAgent()
 
+        # Load the model while the user is still in the menu
+        if MODEL_CONFIG["warm_up"]:
+            agent.warm_up(background=True)
+
         while True:
             print("\n=== Sistem Pembuatan RPP ===")
             print("1. Proses Dokumen")
@@ -28,10 +63,20 @@ def main():
                 # Process documents
                 doc_dir = input("\nMasukkan path direktori dokumen: ")
                 if os.path.exists(doc_dir):
+                    print("Kosongkan jika mata pelajaran/kelas dideteksi dari nama folder dan file")
+                    curriculum = {
+                        "mata_pelajaran": input("Mata Pelajaran dokumen: ").strip(),
+                        "kelas": input("Kelas dokumen: ").strip()
+                    }
                     print("\nMemproses dokumen...")
-                    results = agent.process_documents(doc_dir)
+                    results = agent.process_documents(doc_dir, curriculum)
                     print(f"\nBerhasil memproses {results['processed_files']} file")
                     print(f"Total chunks: {results['total_chunks']}")
+                    print(f"File tidak berubah (dilewati): {results['skipped_files']}")
+                    print(f"File diperbarui labelnya: {results['retagged_files']}")
+                    print(f"File dihapus dari indeks: {results['removed_files']}")
+                    print(f"Waktu proses: {results['elapsed']:.1f} detik "
+                          f"({results['chunks_per_second']:.1f} chunks/detik)")
                 else:
                     print("Direktori tidak ditemukan!")
 
@@ -45,13 +90,7 @@ def main():
                 topik = input("Topik: ")
                 durasi = input("Durasi (menit): ")
 
-                base_query = f"""
-                Buatkan RPP untuk:
-                - Mata Pelajaran: {mata_pelajaran}
-                - Kelas: {kelas}
-                - Topik: {topik}
-                - Durasi: {durasi} menit
-                """
+                base_query = build_rpp_query(mata_pelajaran, kelas, topik, durasi)
 
                 context = {
                     "mata_pelajaran": mata_pelajaran,
@@ -60,52 +99,75 @@ def main():
                     "durasi": durasi
                 }
 
-                # Define the sections to generate
-                sections = [
-                    "Identitas",
-                    "Kompetensi Dasar dan Indikator",
-                    "Tujuan Pembelajaran",
-                    "Materi Pembelajaran",
-                    "Metode Pembelajaran",
-                    "Media dan Sumber Belajar",
-                    "Langkah Pembelajaran",
-                    "Penilaian"
-                ]
-
                 # Dictionary to store the final approved sections
                 approved_sections = {}
 
                 print("\nMembuat RPP secara bertahap...")
 
-                # Generate each section with user confirmation
-                for section in sections:
-                    approved = False
-
-                    while not approved:
-                        print(f"\n=== Membuat bagian: {section} ===")
-                        result = agent.generate_rpp_section(base_query, section, context)
-
-                        print(f"\n=== {section} yang Dihasilkan ===")
-                        print(result["section_content"])
-
-                        # Get feedback for this section
-                        feedback = input(f"\nApakah bagian {section} sudah sesuai? (y/n): ")
-
-                        if feedback.lower() == 'y':
-                            approved = True
-                            approved_sections[section] = result["section_content"]
-                            print(f"Bagian {section} disetujui!")
-                        else:
-                            feedback_detail = input("Berikan masukan untuk perbaikan bagian ini: ")
-                            agent.get_feedback(
-                                result.get("section_name", "unknown"),
-                                {
-                                    "feedback": feedback_detail,
-                                    "section": section,
-                                    "context": context
-                                }
-                            )
-                            print(f"Membuat ulang bagian {section} berdasarkan masukan...")
+                # The remaining sections generate concurrently in the background,
+                # next to the first one streaming here, and are handed over in
+                # order, so we only wait here for review. The streamed section
+                # takes one of the max_concurrency slots
+                max_concurrency = MODEL_CONFIG["max_concurrency"]
+                remaining = None
+                try:
+                    if max_concurrency > 1:
+                        remaining = agent.generate_all_sections(
+                            base_query, context, sections=RPP_SECTIONS[1:], max_concurrency=max_concurrency - 1
+                        )
+
+                    print(f"\n=== {RPP_SECTIONS[0]} yang Dihasilkan ===")
+                    first = print_stream(agent.stream_rpp_section(base_query, RPP_SECTIONS[0], context))
+                    print_stream_stats(first["timings"])
+
+                    if remaining is None:
+                        # Only one generation at a time: start the rest once the first is done
+                        remaining = agent.generate_all_sections(
+                            base_query, context, sections=RPP_SECTIONS[1:], max_concurrency=1
+                        )
+
+                    for result in itertools.chain([first], remaining):
+                        section = result["section_name"]
+                        approved = False
+                        streamed = result is first
+
+                        while not approved:
+                            # Regenerated sections were already printed while streaming
+                            if not streamed:
+                                print(f"\n=== {section} yang Dihasilkan ===")
+                                print(result["section_content"])
+                                print_prompt_stats(result["timings"])
+                            streamed = False
+
+                            # Get feedback for this section
+                            feedback = input(f"\nApakah bagian {section} sudah sesuai? (y/n): ")
+
+                            if feedback.lower() == 'y':
+                                approved = True
+                                approved_sections[section] = result["section_content"]
+                                print(f"Bagian {section} disetujui!")
+                            else:
+                                feedback_detail = input("Berikan masukan untuk perbaikan bagian ini: ")
+                                agent.get_feedback(
+                                    result["memory_id"],
+                                    {
+                                        "feedback": feedback_detail,
+                                        "section": section,
+                                        "context": context
+                                    }
+                                )
+                                print(f"Membuat ulang bagian {section} berdasarkan masukan...")
+
+                                print(f"\n=== {section} yang Dihasilkan ===")
+                                result = print_stream(agent.stream_rpp_section(
+                                    base_query, section, context, use_cache=False
+                                ))
+                                streamed = True
+                                print_stream_stats(result["timings"])
+                finally:
+                    # Cancel queued sections if generation fails or is interrupted
+                    if remaining is not None:
+                        remaining.close()
 
                 # Compile the complete RPP after all sections are approved
                 if approved_sections:
@@ -130,6 +192,8 @@ def main():
                 print("\nVector Store:")
                 print(f"- Total dokumen: {stats['vector_store']['count']}")
                 print(f"- Nama koleksi: {stats['vector_store']['name']}")
+                cache_stats = stats['vector_store']['retrieval_cache']
+                print(f"- Cache pencarian: {cache_stats['hits']} hit, {cache_stats['misses']} miss")
 
                 print("\nMemory Store:")
                 print(f"- Total memori: {stats['memory_store']['total_memories']}")
@@ -137,6 +201,24 @@ def main():
                 for mem_type, count in stats['memory_store']['memory_types'].items():
                     print(f"- {mem_type}: {count}")
 
+                print(f"- Indeks masukan: {stats['feedback_index']['entries']} masukan")
+
+                if stats['response_cache'] is not None:
+                    response_stats = stats['response_cache']
+                    print(f"- Cache respons: {response_stats['entries']} respons, "
+                          f"{response_stats['hits']} hit, {response_stats['misses']} miss")
+
+                print("\nModel Embedding:")
+                print(f"- Model dimuat: {stats['embeddings']['loaded_models']}")
+                for model_stats in stats['embeddings']['models']:
+                    print(f"- {model_stats['model_name']} ({model_stats['device']}): "
+                          f"dimuat dalam {model_stats['load_time']:.2f} detik")
+                for cache_name, cache_stats in stats['embeddings']['caches'].items():
+                    print(f"- Cache embedding {cache_name}: {cache_stats['entries']} vektor, "
+                          f"{cache_stats['hits']} hit, {cache_stats['misses']} miss")
+                if stats['embeddings']['rss_mb'] is not None:
+                    print(f"- Memori proses (RSS): {stats['embeddings']['rss_mb']:.1f} MB")
+
             elif choice == "4":
                 print("\nTerima kasih telah menggunakan sistem!")
                 break
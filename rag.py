@@ -1,12 +1,14 @@
 import os
-from typing import List, Dict
+from typing import Dict, Generator, List
 from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
 from langchain.chains import RetrievalQA
+from langchain.chains.question_answering.stuff_prompt import PROMPT as QA_PROMPT
 from langchain_community.llms import Ollama
 from pathlib import Path
+from src.models.embeddings import get_embeddings
+from src.utils.streaming import timed_stream
 
 class PDFRAG:
     def __init__(self, model_name: str = "rpp:latest"):
@@ -17,7 +19,7 @@ class PDFRAG:
             model_name (str): Nama model Ollama yang akan digunakan
         """
         self.model_name = model_name
-        self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        self.embeddings = get_embeddings("sentence-transformers/all-MiniLM-L6-v2")
         self.llm = Ollama(model=model_name)
         self.vector_store = None
         self.loaded_docs = {}  # Menyimpan informasi dokumen yang sudah dimuat
@@ -133,6 +135,31 @@ class PDFRAG:
         response = qa_chain.invoke({"query": question})
         return response["result"]
 
+    def stream_query(self, question: str) -> Generator[str, None, Dict]:
+        """
+        Melakukan query dan mengalirkan jawaban token demi token
+
+        Args:
+            question (str): Pertanyaan yang ingin diajukan
+
+        Yields:
+            str: Token jawaban saat dihasilkan model
+
+        Returns:
+            Dict: Statistik waktu (time_to_first_token, tokens_per_second, dll.)
+        """
+        if self.vector_store is None:
+            raise ValueError("Harap load PDF terlebih dahulu menggunakan load_directory()")
+
+        # Prompt yang sama dengan chain "stuff" bawaan RetrievalQA
+        docs = self.vector_store.similarity_search(question, k=3)
+        context = "\n\n".join(doc.page_content for doc in docs)
+        prompt = QA_PROMPT.format(context=context, question=question)
+
+        timings = {}
+        yield from timed_stream(self.llm.stream(prompt), timings)
+        return timings
+
 def main():
     # Contoh penggunaan
     rag = PDFRAG(model_name="rpp:latest")
@@ -154,8 +181,18 @@ def main():
                     break
 
                 try:
-                    answer = rag.query(question)
-                    print("\nJawaban:", answer)
+                    print("\nJawaban: ", end="", flush=True)
+                    stream = rag.stream_query(question)
+                    while True:
+                        try:
+                            print(next(stream), end="", flush=True)
+                        except StopIteration as stop:
+                            timings = stop.value
+                            break
+                    print()
+                    if timings.get("time_to_first_token") is not None:
+                        print(f"(token pertama {timings['time_to_first_token']:.1f} detik, "
+                              f"{timings['tokens_per_second'] or 0:.1f} token/detik)")
                 except Exception as e:
                     print(f"Error saat query: {str(e)}")
 
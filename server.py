@@ -0,0 +1,369 @@
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.agents.rpp_agent import RPP_SECTIONS, build_rpp_query
+from src.config.config import MODEL_CONFIG, SERVER_CONFIG
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+HTTP_STATUS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class GenerationJob:
+    """One queued call into the agent, with a channel back to the waiting request"""
+
+    def __init__(self, func: Callable, args: Tuple, stream: bool, loop: asyncio.AbstractEventLoop):
+        self.func = func
+        self.args = args
+        self.stream = stream
+        self.loop = loop
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.cancelled = threading.Event()
+        self.enqueued_at = time.perf_counter()
+
+    def emit(self, kind: str, payload: Any):
+        """Hand an event to the request handler from a worker thread"""
+        self.loop.call_soon_threadsafe(self.events.put_nowait, (kind, payload))
+
+
+class RPPServer:
+    """
+    Long-lived HTTP server around one RPPAgent
+
+    Generation requests go through a bounded asyncio queue drained by a fixed
+    number of workers, so at most llm_concurrency calls reach Ollama at once.
+    When the queue is full new requests are rejected with 503 instead of
+    piling up. Streaming responses are sent as chunked NDJSON.
+    """
+
+    def __init__(self, agent, llm_concurrency: Optional[int] = None, max_queue_size: Optional[int] = None):
+        self.agent = agent
+        self.llm_concurrency = llm_concurrency or SERVER_CONFIG["llm_concurrency"]
+        self.max_queue_size = max_queue_size or SERVER_CONFIG["max_queue_size"]
+        self.logger = logging.getLogger(__name__)
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers = []
+        self.ingest_lock: Optional[asyncio.Lock] = None
+        self.stats = {"completed": 0, "failed": 0, "rejected": 0, "active": 0}
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        """
+        Start the queue workers and the HTTP listener
+
+        Args:
+            host (str): Address to bind
+            port (int): Port to bind
+
+        Returns:
+            asyncio.AbstractServer: Listening server
+        """
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.ingest_lock = asyncio.Lock()
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.llm_concurrency)]
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        self.logger.info(f"RPP server listening on {host}:{port} "
+                         f"(llm_concurrency={self.llm_concurrency}, max_queue_size={self.max_queue_size})")
+        return server
+
+    async def stop(self):
+        """Stop the queue workers"""
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def _worker(self):
+        """Run queued jobs one at a time"""
+        while True:
+            job = await self.queue.get()
+            self.stats["active"] += 1
+            try:
+                succeeded = await asyncio.to_thread(self._run_job, job)
+                if succeeded is not None:
+                    self.stats["completed" if succeeded else "failed"] += 1
+            finally:
+                self.stats["active"] -= 1
+                self.queue.task_done()
+
+    def _run_job(self, job: GenerationJob) -> Optional[bool]:
+        """
+        Run a job on a worker thread, reporting tokens, the result or the error
+
+        Returns:
+            Optional[bool]: Whether the job succeeded, or None if the client went away
+        """
+        if job.cancelled.is_set():
+            return None
+        job.emit("started", time.perf_counter() - job.enqueued_at)
+        try:
+            if job.stream:
+                stream = job.func(*job.args)
+                while True:
+                    if job.cancelled.is_set():
+                        stream.close()
+                        return None
+                    try:
+                        token = next(stream)
+                    except StopIteration as stop:
+                        result = stop.value
+                        break
+                    job.emit("token", token)
+            else:
+                result = job.func(*job.args)
+            job.emit("result", result)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error running generation job: {str(e)}")
+            job.emit("error", str(e))
+            return False
+
+    def _submit(self, func: Callable, args: Tuple, stream: bool) -> GenerationJob:
+        """Queue a job, rejecting it when the queue is full"""
+        job = GenerationJob(func, args, stream, asyncio.get_running_loop())
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise HTTPError(503, f"Antrian penuh ({self.max_queue_size} permintaan), coba lagi nanti")
+        return job
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one HTTP request per connection"""
+        try:
+            method, path, body = await self._read_request(reader)
+            await self._dispatch(method, path, body, writer)
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {"error": e.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            self.logger.error(f"Error handling request: {str(e)}")
+            try:
+                await self._send_json(writer, 500, {"error": str(e)})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, Any]]:
+        """Parse the request line, headers and JSON body"""
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            raise ConnectionError("Empty request")
+        try:
+            method, path, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Request line tidak valid")
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        content_length = headers.get("content-length", "0")
+        if not (content_length.isascii() and content_length.isdigit()):
+            raise HTTPError(400, "Content-Length tidak valid")
+        length = int(content_length)
+        if length > SERVER_CONFIG["max_body_bytes"]:
+            raise HTTPError(413, "Body terlalu besar")
+        body = {}
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except json.JSONDecodeError:
+                raise HTTPError(400, "Body harus berupa JSON")
+            if not isinstance(body, dict):
+                raise HTTPError(400, "Body harus berupa objek JSON")
+        return method, path.split("?", 1)[0], body
+
+    async def _dispatch(self, method: str, path: str, body: Dict[str, Any], writer: asyncio.StreamWriter):
+        """Route a request to its endpoint"""
+        routes = {
+            "/generate": ("POST", self._handle_generate),
+            "/generate-section": ("POST", self._handle_generate_section),
+            "/ingest": ("POST", self._handle_ingest),
+            "/stats": ("GET", self._handle_stats)
+        }
+        if path not in routes:
+            raise HTTPError(404, f"Endpoint {path} tidak ditemukan")
+        expected_method, handler = routes[path]
+        if method != expected_method:
+            raise HTTPError(405, f"Gunakan {expected_method} untuk {path}")
+        await handler(body, writer)
+
+    @staticmethod
+    def _parse_query(body: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Get the base query and context from a request body"""
+        if body.get("query"):
+            return body["query"], body.get("context")
+
+        fields = ["mata_pelajaran", "kelas", "topik", "durasi"]
+        missing = [field for field in fields if not body.get(field)]
+        if missing:
+            raise HTTPError(400, f"Field {', '.join(missing)} tidak ada (atau kirim field query)")
+        context = {field: str(body[field]) for field in fields}
+        return build_rpp_query(**context), context
+
+    async def _handle_generate(self, body: Dict[str, Any], writer: asyncio.StreamWriter):
+        query, context = self._parse_query(body)
+        stream = bool(body.get("stream"))
+        func = self.agent.stream_rpp if stream else self.agent.generate_rpp
+        await self._respond_job(self._submit(func, (query, context), stream), writer)
+
+    async def _handle_generate_section(self, body: Dict[str, Any], writer: asyncio.StreamWriter):
+        query, context = self._parse_query(body)
+        section = body.get("section")
+        if section not in RPP_SECTIONS:
+            raise HTTPError(400, f"Bagian harus salah satu dari: {', '.join(RPP_SECTIONS)}")
+        stream = bool(body.get("stream"))
+        use_cache = body.get("use_cache", True)
+        func = self.agent.stream_rpp_section if stream else self.agent.generate_rpp_section
+        await self._respond_job(self._submit(func, (query, section, context, use_cache), stream), writer)
+
+    async def _handle_ingest(self, body: Dict[str, Any], writer: asyncio.StreamWriter):
+        directory = body.get("directory")
+        if not directory:
+            raise HTTPError(400, "Field directory tidak ada")
+        if self.ingest_lock.locked():
+            raise HTTPError(409, "Proses dokumen lain sedang berjalan")
+        async with self.ingest_lock:
+            result = await asyncio.to_thread(self.agent.process_documents, directory, body.get("curriculum"))
+        await self._send_json(writer, 200, result)
+
+    async def _handle_stats(self, body: Dict[str, Any], writer: asyncio.StreamWriter):
+        stats = await asyncio.to_thread(self.agent.get_system_stats)
+        stats["server"] = {
+            **self.stats,
+            "queue_depth": self.queue.qsize(),
+            "max_queue_size": self.max_queue_size,
+            "llm_concurrency": self.llm_concurrency
+        }
+        await self._send_json(writer, 200, stats)
+
+    async def _respond_job(self, job: GenerationJob, writer: asyncio.StreamWriter):
+        """Wait for a queued job and send its result, streaming tokens if requested"""
+        try:
+            if not job.stream:
+                while True:
+                    kind, payload = await job.events.get()
+                    if kind == "result":
+                        await self._send_json(writer, 200, payload)
+                        return
+                    if kind == "error":
+                        await self._send_json(writer, 500, {"error": payload})
+                        return
+
+            self._write_head(writer, 200, "application/x-ndjson", chunked=True)
+            while True:
+                kind, payload = await job.events.get()
+                if kind == "started":
+                    line = {"queue_wait": payload}
+                elif kind == "token":
+                    line = {"token": payload}
+                elif kind == "result":
+                    line = {"done": True, "result": payload}
+                else:
+                    line = {"done": True, "error": payload}
+                await self._write_chunk(writer, json.dumps(line, ensure_ascii=False, default=str) + "\n")
+                if kind in ("result", "error"):
+                    break
+            await self._write_chunk(writer, "")
+        finally:
+            # Stop generating for a client that went away
+            job.cancelled.set()
+
+    @staticmethod
+    def _write_head(writer: asyncio.StreamWriter, status: int, content_type: str,
+                    content_length: Optional[int] = None, chunked: bool = False):
+        head = [f"HTTP/1.1 {status} {HTTP_STATUS.get(status, '')}", f"Content-Type: {content_type}",
+                "Connection: close"]
+        if chunked:
+            head.append("Transfer-Encoding: chunked")
+        elif content_length is not None:
+            head.append(f"Content-Length: {content_length}")
+        if status == 503:
+            head.append("Retry-After: 5")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+
+    @staticmethod
+    async def _write_chunk(writer: asyncio.StreamWriter, text: str):
+        data = text.encode("utf-8")
+        writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+        await writer.drain()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Any):
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self._write_head(writer, status, "application/json; charset=utf-8", content_length=len(data))
+        writer.write(data)
+        await writer.drain()
+
+
+async def serve(agent, host: str, port: int, llm_concurrency: int, max_queue_size: int):
+    """Run the server until cancelled"""
+    rpp_server = RPPServer(agent, llm_concurrency, max_queue_size)
+    server = await rpp_server.start(host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await rpp_server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server HTTP sistem pembuatan RPP")
+    parser.add_argument("--host", default=SERVER_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=SERVER_CONFIG["port"])
+    parser.add_argument("--llm-concurrency", type=int, default=SERVER_CONFIG["llm_concurrency"])
+    parser.add_argument("--max-queue-size", type=int, default=SERVER_CONFIG["max_queue_size"])
+    parser.add_argument("--stub-llm", action="store_true",
+                        help="Gunakan LLM tiruan alih-alih Ollama (untuk pengujian lokal)")
+    args = parser.parse_args()
+
+    from src.agents.rpp_agent import RPPAgent
+
+    llm = None
+    if args.stub_llm:
+        from langchain_community.llms.fake import FakeStreamingListLLM
+        llm = FakeStreamingListLLM(responses=["Ini adalah respons tiruan untuk pengujian server RPP."])
+
+    agent = RPPAgent(llm=llm)
+    if MODEL_CONFIG["warm_up"] and not args.stub_llm:
+        agent.warm_up(background=True)
+    try:
+        asyncio.run(serve(agent, args.host, args.port, args.llm_concurrency, args.max_queue_size))
+    except KeyboardInterrupt:
+        print("\nServer dihentikan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+from typing import TYPE_CHECKING, Dict, Any, List, Set, Tuple
+import logging
+import re
+
+if TYPE_CHECKING:
+    from langchain.schema import Document
+
+# Words count as one token per four characters and punctuation as one token
+# each, which tracks the subword tokenizers of local models on Indonesian
+# text closely enough for budgeting without loading a tokenizer
+TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+
+# Sentences and lines, each keeping its delimiter so joining them restores the text
+SENTENCE_PATTERN = re.compile(r"[^.!?\n]*[.!?\n]+|[^.!?\n]+$")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in a text
+
+    Args:
+        text (str): Text to count
+
+    Returns:
+        int: Estimated token count
+    """
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut a text to at most max_tokens tokens, at a sentence end where possible
+
+    Args:
+        text (str): Text to cut
+        max_tokens (int): Token budget
+
+    Returns:
+        str: The text, or its longest prefix within the budget
+    """
+    if max_tokens <= 0:
+        return ""
+    matches = list(TOKEN_PATTERN.finditer(text))
+    if len(matches) <= max_tokens:
+        return text
+
+    cut = matches[max_tokens - 1].end()
+    boundary = max(text.rfind(delimiter, 0, cut) for delimiter in ".!?\n")
+    if boundary > cut // 2:
+        cut = boundary + 1
+    return text[:cut].rstrip()
+
+
+class ContextPacker:
+    """
+    Fit retrieved chunks into the prompt's share of the model context window
+
+    Chunks are taken in retrieval order. Sentences already seen in an earlier
+    chunk (such as the overlap between neighbouring chunks) are removed, and
+    chunks that are mostly repeats are dropped. Each remaining chunk is added
+    if it fits; one that does not fit is trimmed to the remaining budget when
+    at least min_chunk_tokens are left, and skipped otherwise, so a later,
+    smaller chunk can still fill what is left.
+    """
+
+    def __init__(self, context_window: int, output_reserve_tokens: int,
+                 min_chunk_tokens: int = 48, duplicate_threshold: float = 0.8):
+        self.context_window = context_window
+        self.output_reserve_tokens = output_reserve_tokens
+        self.min_chunk_tokens = min_chunk_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.logger = logging.getLogger(__name__)
+
+    def get_budget(self, prompt_overhead: str) -> int:
+        """
+        Tokens left for context once the prompt and the model's answer are accounted for
+
+        Args:
+            prompt_overhead (str): The prompt formatted with an empty context
+
+        Returns:
+            int: Context token budget, at least 0
+        """
+        return max(0, self.context_window - self.output_reserve_tokens - count_tokens(prompt_overhead))
+
+    @staticmethod
+    def _sentence_key(sentence: str) -> str:
+        return " ".join(sentence.lower().split())
+
+    def _deduplicate(self, text: str, seen: Set[str]) -> Tuple[str, float]:
+        """Remove sentences already seen, returning the rest and the repeated share of tokens"""
+        kept = []
+        total = 0
+        repeated = 0
+        for sentence in SENTENCE_PATTERN.findall(text):
+            key = self._sentence_key(sentence)
+            tokens = count_tokens(sentence)
+            total += tokens
+            if key and key in seen:
+                repeated += tokens
+                continue
+            kept.append(sentence)
+        return "".join(kept).strip(), repeated / total if total else 1.0
+
+    def pack(self, documents: List["Document"], budget: int) -> Tuple[str, List["Document"], Dict[str, Any]]:
+        """
+        Select, deduplicate and trim chunks to fit a token budget
+
+        Args:
+            documents (List[Document]): Retrieved chunks, best first
+            budget (int): Context token budget, see get_budget
+
+        Returns:
+            Tuple[str, List[Document], Dict[str, Any]]: Context text, the chunks it
+                draws on, and packing statistics
+        """
+        seen: Set[str] = set()
+        parts = []
+        packed = []
+        used = 0
+        duplicates = 0
+        trimmed = 0
+        dropped = 0
+
+        for doc in documents:
+            text, repeated = self._deduplicate(doc.page_content, seen)
+            if not text or repeated >= self.duplicate_threshold:
+                duplicates += 1
+                continue
+
+            tokens = count_tokens(text)
+            remaining = budget - used
+            if tokens > remaining:
+                if remaining < self.min_chunk_tokens:
+                    dropped += 1
+                    continue
+                text = truncate_to_tokens(text, remaining)
+                tokens = count_tokens(text)
+                trimmed += 1
+
+            parts.append(text)
+            packed.append(doc)
+            used += tokens
+            seen.update(self._sentence_key(sentence) for sentence in SENTENCE_PATTERN.findall(text))
+
+        if dropped:
+            self.logger.info(f"Dropped {dropped} chunks that did not fit the {budget}-token context budget")
+
+        return "\n\n".join(parts), packed, {
+            "context_budget": budget,
+            "context_tokens": used,
+            "context_chunks": len(packed),
+            "trimmed_chunks": trimmed,
+            "dropped_chunks": dropped,
+            "duplicate_chunks": duplicates
+        }
@@ -0,0 +1,122 @@
+from typing import Dict, Any, Optional
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class ResponseCache:
+    """Persistent LRU cache of LLM responses, stored in SQLite"""
+
+    def __init__(self, path: str, max_entries: int = 2000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._initialize_cache()
+
+    def _initialize_cache(self):
+        """Open the cache database, creating it if needed"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used);
+            """)
+            self.logger.info(f"Response cache initialized at {self.path}")
+        except Exception as e:
+            self.logger.error(f"Error initializing response cache: {str(e)}")
+            raise
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """
+        Build a cache key from everything that determines a response
+
+        Args:
+            **parts: Key components; must be JSON serializable
+
+        Returns:
+            str: Hex digest of the components
+        """
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached response
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[str]: Cached response, or None on a miss
+        """
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+                self.hits += 1
+                return row[0]
+            except Exception as e:
+                self.logger.error(f"Error reading response cache: {str(e)}")
+                return None
+
+    def put(self, key: str, response: str):
+        """
+        Store a response, replacing any previous one and evicting the least recently used entries
+
+        Args:
+            key (str): Cache key
+            response (str): Response to cache
+        """
+        with self._lock:
+            try:
+                now = time.time()
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                        (key, response, now, now)
+                    )
+                    self._conn.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,)
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            except Exception as e:
+                self.logger.error(f"Error writing response cache: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict[str, Any]: Entry count, hits and misses
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses
+        }
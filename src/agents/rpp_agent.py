@@ -1,41 +1,247 @@
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, Generator, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import logging
-from langchain.chains import RetrievalQA
-from langchain_community.llms import Ollama
-from langchain.prompts import PromptTemplate
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain.schema import Document
-
-from ..config.config import MODEL_CONFIG, API_CONFIG
+import os
+import threading
+import time
+from pathlib import Path
+
+from ..config.config import (
+    MODEL_CONFIG, API_CONFIG, MEMORY_STORE_CONFIG, FEEDBACK_CONFIG, RESPONSE_CACHE_CONFIG, CONTEXT_CONFIG
+)
 from ..data.data_processor import DataProcessor
 from ..models.vector_store import VectorStoreManager
+from ..models.embeddings import get_embedding_stats
 from ..memory.memory_store import MemoryStoreManager
+from ..memory.feedback_index import FeedbackIndex
+from ..utils.streaming import timed_stream
+from ..utils.curriculum import CURRICULUM_FIELDS, normalize_kelas, normalize_subject
+from .response_cache import ResponseCache
+from .context_packer import ContextPacker, count_tokens
+
+# langchain is imported when the model and prompts are first needed, not at startup
+if TYPE_CHECKING:
+    from langchain.prompts import PromptTemplate
+    from langchain.schema import Document
+
+# Sections of an RPP, in the order they appear in the compiled document
+RPP_SECTIONS = [
+    "Identitas",
+    "Kompetensi Dasar dan Indikator",
+    "Tujuan Pembelajaran",
+    "Materi Pembelajaran",
+    "Metode Pembelajaran",
+    "Media dan Sumber Belajar",
+    "Langkah Pembelajaran",
+    "Penilaian"
+]
+
+def build_rpp_query(mata_pelajaran: str, kelas: str, topik: str, durasi: str) -> str:
+    """
+    Build the base query used to retrieve sources and generate every section
+
+    Args:
+        mata_pelajaran (str): Subject
+        kelas (str): Grade
+        topik (str): Topic
+        durasi (str): Duration in minutes
+
+    Returns:
+        str: Base query for RPP generation
+    """
+    return f"""
+                Buatkan RPP untuk:
+                - Mata Pelajaran: {mata_pelajaran}
+                - Kelas: {kelas}
+                - Topik: {topik}
+                - Durasi: {durasi} menit
+                """
+
+# Bump when the prompt templates change so cached responses are not reused
+PROMPT_TEMPLATE_VERSION = 3
+
+# Prompts start with text that never changes, followed by what changes least
+# often (the sources and request, shared by all sections of one RPP) and end
+# with the section itself, so Ollama can reuse the KV cache of the prefix
+# from one call to the next
+SECTION_PROMPT_PREFIX = """
+            Kamu adalah asisten yang ahli dalam membuat Rencana Pelaksanaan Pembelajaran (RPP).
+            Tugasmu adalah membuat satu bagian RPP berdasarkan informasi dari dokumen sumber,
+            sesuai dengan kurikulum dan kebutuhan siswa. Tulis bagian yang diminta secara detail
+            dan lengkap, dan jangan menulis bagian lain dari RPP.
+"""
+
+SECTION_PROMPT_TEMPLATE = SECTION_PROMPT_PREFIX + """
+            Informasi dari Dokumen Sumber:
+            {context}
+
+            Detail RPP yang Diminta:
+            {question}
+
+            Masukan guru dari pembuatan RPP sebelumnya yang perlu diperhatikan:
+            {feedback}
+
+            Sekarang, hanya buatkan bagian {section} dari RPP secara detail dan lengkap.
+            Jangan menulis bagian lain dari RPP, fokus hanya pada bagian {section}.
+            """
+
+class SectionBatch:
+    """
+    RPP sections generating on a thread pool, handed over in document order
+
+    Iterating yields each section, recorded in memory, once it and every
+    section before it have finished. close(), or leaving a with block,
+    cancels the sections that have not started yet, so an abandoned batch
+    does not keep the model busy.
+    """
+
+    def __init__(self, agent: "RPPAgent", query: str, context: Optional[Dict[str, Any]],
+                 sections: List[str], max_concurrency: int):
+        self.agent = agent
+        self.query = query
+        self.context = context
+        self.sections = sections
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="rpp-section")
+        try:
+            self._futures = [
+                self._executor.submit(agent._generate_section_content, query, section, context)
+                for section in sections
+            ]
+        except Exception:
+            self.close()
+            raise
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        try:
+            for section, future in zip(self.sections, self._futures):
+                try:
+                    result, relevant_docs, timings = future.result()
+                    yield self.agent._record_section(
+                        self.query, section, self.context, result, relevant_docs, timings
+                    )
+                except Exception as e:
+                    self.agent.logger.error(f"Error generating RPP section {section}: {str(e)}")
+                    raise
+        finally:
+            self.close()
+
+    def close(self):
+        """Cancel sections that have not started; the ones already generating run to completion"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "SectionBatch":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
 
 class RPPAgent:
-    def __init__(self):
+    def __init__(self, llm=None):
+        """
+        Args:
+            llm (optional): LLM to generate with instead of the local Ollama model,
+                e.g. a stub for local testing
+        """
         self.logger = logging.getLogger(__name__)
+        self._init_lock = threading.Lock()
 
-        # Initialize components
+        # Initialize components; the embedding model, the Chroma collection and
+        # the local model are only loaded once they are first used
         self.data_processor = DataProcessor()
         self.vector_store = VectorStoreManager()
         self.memory_store = MemoryStoreManager()
+        self._llm = llm
 
-        # Initialize local model
-        self.llm = Ollama(
-            model=MODEL_CONFIG["local_model"],
-            temperature=MODEL_CONFIG["temperature"],
-            num_ctx=MODEL_CONFIG["max_tokens"]
+        # Vector index over past feedback, synced with the memory store on first lookup
+        self.feedback_index = FeedbackIndex(
+            lambda: self.embeddings,
+            str(Path(MEMORY_STORE_CONFIG["persist_directory"]) / "feedback_index")
         )
+        self._feedback_synced = False
 
-        # Initialize local embeddings
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=MODEL_CONFIG["embedding_model"]
+        # Opt-in cache of generated responses for identical requests
+        self.response_cache = None
+        if RESPONSE_CACHE_CONFIG["enabled"]:
+            self.response_cache = ResponseCache(
+                RESPONSE_CACHE_CONFIG["path"],
+                max_entries=RESPONSE_CACHE_CONFIG["max_entries"]
+            )
+
+        # Retrieved chunks are packed into what is left of num_ctx after the prompt
+        self.context_packer = ContextPacker(
+            context_window=CONTEXT_CONFIG["context_window"],
+            output_reserve_tokens=CONTEXT_CONFIG["output_reserve_tokens"],
+            min_chunk_tokens=CONTEXT_CONFIG["min_chunk_tokens"],
+            duplicate_threshold=CONTEXT_CONFIG["duplicate_threshold"]
         )
 
-        # Initialize RAG chain
-        self._initialize_rag_chain()
+        # Prompts are built on first generation
+        self._rpp_prompt = None
+        self.section_prompts: Dict[str, "PromptTemplate"] = {}
+
+    @property
+    def llm(self):
+        """Local model, created on first use"""
+        if self._llm is None:
+            with self._init_lock:
+                if self._llm is None:
+                    from langchain_community.llms import Ollama
+
+                    self._llm = Ollama(
+                        model=MODEL_CONFIG["local_model"],
+                        temperature=MODEL_CONFIG["temperature"],
+                        num_ctx=CONTEXT_CONFIG["context_window"],
+                        keep_alive=MODEL_CONFIG["keep_alive"]
+                    )
+        return self._llm
+
+    def warm_up(self, background: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Load the local model and prefill the static prompt prefix
+
+        Ollama keeps the model loaded for MODEL_CONFIG["keep_alive"] after
+        each call and reuses the KV cache of a matching prompt prefix, so
+        after a warm-up the first section neither waits for the model to
+        load nor prefills the shared instructions.
+
+        Args:
+            background (bool): Warm up in a daemon thread and return immediately
+
+        Returns:
+            Optional[Dict[str, Any]]: Warm-up, load and prefill timings, or None
+                when run in the background
+        """
+        if background:
+            threading.Thread(target=self.warm_up, name="llm-warm-up", daemon=True).start()
+            return None
+
+        from ..utils.llm_metrics import GenerationInfoHandler
+
+        timings = {}
+        try:
+            handler = GenerationInfoHandler()
+            start = time.perf_counter()
+            self.llm.invoke(SECTION_PROMPT_PREFIX, config={"callbacks": [handler]}, num_predict=1)
+            timings["warm_up"] = time.perf_counter() - start
+            timings.update(handler.get_timings())
+            self.logger.info(f"Model warmed up in {timings['warm_up']:.1f}s")
+        except Exception as e:
+            self.logger.error(f"Error warming up model: {str(e)}")
+        return timings
+
+    @property
+    def embeddings(self):
+        """Process-wide embedding model shared with the vector store"""
+        return self.vector_store.embeddings
+
+    @property
+    def rpp_prompt(self) -> "PromptTemplate":
+        """Full RPP prompt, built together with the section prompts on first use"""
+        if self._rpp_prompt is None:
+            self._initialize_rag_chain()
+        return self._rpp_prompt
 
     def _initialize_rag_chain(self):
         """Initialize the RAG chain with custom prompt for local model"""
@@ -45,12 +251,6 @@ class RPPAgent:
             Kamu adalah asisten yang ahli dalam membuat Rencana Pelaksanaan Pembelajaran (RPP).
             Berdasarkan informasi dari dokumen sumber, buatkan RPP yang sesuai dengan kurikulum dan kebutuhan siswa.
 
-            Informasi dari Dokumen Sumber:
-            {context}
-
-            Detail RPP yang Diminta:
-            {question}
-
             Buatkan RPP yang lengkap dengan komponen berikut:
             1. Identitas (Sekolah, Mata Pelajaran, Kelas/Semester, Materi, Alokasi Waktu)
             2. Kompetensi Dasar dan Indikator Pencapaian Kompetensi
@@ -76,147 +276,548 @@ class RPPAgent:
 
             Berikan jawaban yang terstruktur dan sesuai dengan format RPP yang baik.
             Pastikan contoh soal yang diberikan bervariasi dan sesuai dengan tingkat kesulitan siswa.
+
+            Informasi dari Dokumen Sumber:
+            {context}
+
+            Detail RPP yang Diminta:
+            {question}
             """
 
-            prompt = PromptTemplate(
+            from langchain.prompts import PromptTemplate
+
+            self._rpp_prompt = PromptTemplate(
                 template=prompt_template,
                 input_variables=["context", "question"]
             )
 
-            # Inisialisasi RAG chain dengan model lokal
-            self.qa_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=self.vector_store.vector_store.as_retriever(
-                    search_kwargs={"k": 3}
-                ),
-                chain_type_kwargs={
-                    "prompt": prompt,
-                    "verbose": True
-                }
-            )
+            # Precompile one prompt per RPP section so generation only formats them
+            for section in RPP_SECTIONS:
+                self._get_section_prompt(section)
 
             self.logger.info("RAG chain initialized successfully with local model")
         except Exception as e:
             self.logger.error(f"Error initializing RAG chain: {str(e)}")
             raise
 
-    def _get_relevant_feedback(self, context: Dict[str, Any]) -> str:
-        """Get relevant feedback based on context"""
-        try:
-            # Get recent feedback
-            feedback_memories = self.memory_store.get_memories(
-                memory_type="feedback",
-                limit=5
+    def _get_section_prompt(self, section: str) -> "PromptTemplate":
+        """
+        Get the prompt for a section, building and registering it on first use
+
+        Args:
+            section (str): Section name
+
+        Returns:
+            PromptTemplate: Section prompt with context, question and feedback variables
+        """
+        prompt = self.section_prompts.get(section)
+        if prompt is None:
+            from langchain.prompts import PromptTemplate
+
+            prompt = PromptTemplate(
+                template=SECTION_PROMPT_TEMPLATE,
+                input_variables=["context", "question", "feedback"],
+                partial_variables={"section": section}
             )
+            self.section_prompts[section] = prompt
+        return prompt
+
+    @staticmethod
+    def _retrieval_filter(context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Metadata filter for the subject and grade of a generation request"""
+        if not context:
+            return None
+        retrieval_filter = {
+            field: context[field]
+            for field in CURRICULUM_FIELDS
+            if context.get(field)
+        }
+        return retrieval_filter or None
+
+    @staticmethod
+    def _relaxed_filters(retrieval_filter: Optional[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Filters to try in turn: all fields, each field alone, then no filter"""
+        if not retrieval_filter:
+            return [None]
+        filters = [retrieval_filter]
+        if len(retrieval_filter) > 1:
+            filters += [{field: value} for field, value in retrieval_filter.items()]
+        return filters + [None]
+
+    def _retrieve(self, query: str, k: int = 3,
+                  context: Optional[Dict[str, Any]] = None) -> Tuple[List["Document"], Dict[str, Any]]:
+        """
+        Retrieve relevant documents once, timing the embed and search stages
+
+        Results are served from the retrieval cache when the same query was
+        already run against the current collection version. When the context
+        names a subject and/or grade, only chunks tagged with them are
+        searched. If none match both, the subject alone and then the grade
+        alone are tried before falling back to the whole collection.
+
+        Args:
+            query (str): Search query
+            k (int): Number of documents to retrieve
+            context (Dict[str, Any], optional): Generation context with mata_pelajaran and kelas
+
+        Returns:
+            Tuple[List[Document], Dict[str, Any]]: Retrieved documents and stage timings in seconds
+        """
+        timings = {}
+        version = self.vector_store.collection_version
+        retrieval_filter = self._retrieval_filter(context)
+
+        cached = self.vector_store.retrieval_cache.get(query, k, version, retrieval_filter)
+        if cached is not None:
+            timings["embed"] = 0.0
+            timings["search"] = 0.0
+            timings["retrieval_cache_hit"] = True
+            return cached, timings
+
+        start = time.perf_counter()
+        query_embedding = self.vector_store.embed_query(query)
+        timings["embed"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        relevant_docs = []
+        for applied_filter in self._relaxed_filters(retrieval_filter):
+            relevant_docs = self.vector_store.search(query, query_embedding, k=k, filter=applied_filter)
+            if relevant_docs:
+                break
+            if applied_filter:
+                self.logger.info(f"No chunks match {applied_filter}, relaxing the retrieval filter")
+        if retrieval_filter and applied_filter is None:
+            self.logger.warning(f"No chunks tagged for {retrieval_filter}, searched the whole collection")
+        timings["search"] = time.perf_counter() - start
+        timings["retrieval_filter"] = applied_filter
+        timings["retrieval_cache_hit"] = False
+
+        self.vector_store.retrieval_cache.put(query, k, version, relevant_docs, retrieval_filter)
+        return relevant_docs, timings
+
+    def _build_prompt(self, prompt: "PromptTemplate", query: str, relevant_docs: List["Document"],
+                      timings: Dict[str, Any],
+                      prompt_variables: Optional[Dict[str, Any]] = None) -> Tuple[str, List["Document"]]:
+        """
+        Format a prompt with the retrieved documents packed into the context budget
+
+        Documents the packer drops, as duplicates or over budget, are not
+        returned, so sources and cache keys cover exactly what the model sees.
+
+        Args:
+            prompt (PromptTemplate): Prompt with context and question variables
+            query (str): Query for generation
+            relevant_docs (List[Document]): Retrieved documents, best first
+            timings (Dict[str, Any]): Stage timings, updated in place with prompt_build,
+                prompt_tokens and the packing statistics
+            prompt_variables (Dict[str, Any], optional): Other prompt variables
+
+        Returns:
+            Tuple[str, List[Document]]: Prompt text and the documents packed into it
+        """
+        start = time.perf_counter()
+        variables = {"question": query, **(prompt_variables or {})}
+        budget = self.context_packer.get_budget(prompt.format(context="", **variables))
+        context_text, packed_docs, packing_stats = self.context_packer.pack(relevant_docs, budget)
+        prompt_text = prompt.format(context=context_text, **variables)
+        timings["prompt_build"] = time.perf_counter() - start
+        timings["prompt_tokens"] = count_tokens(prompt_text)
+        timings.update(packing_stats)
+        return prompt_text, packed_docs
+
+    def _generate_from_prompt(self, prompt_text: str, timings: Dict[str, Any]) -> str:
+        """
+        Run the local model on a built prompt
+
+        Args:
+            prompt_text (str): Prompt from _build_prompt
+            timings (Dict[str, Any]): Stage timings, updated in place
+
+        Returns:
+            str: Model output
+        """
+        from ..utils.llm_metrics import GenerationInfoHandler
+
+        handler = GenerationInfoHandler()
+        start = time.perf_counter()
+        result = self.llm.invoke(prompt_text, config={"callbacks": [handler]})
+        timings["llm"] = time.perf_counter() - start
+        timings.update(handler.get_timings())
+
+        return result
+
+    def _stream_from_prompt(self, prompt_text: str, timings: Dict[str, Any]) -> Iterator[str]:
+        """
+        Stream the local model on a built prompt
+
+        Args:
+            prompt_text (str): Prompt from _build_prompt
+            timings (Dict[str, Any]): Stage timings, updated in place once the stream ends
+
+        Yields:
+            str: Tokens as the model produces them
+        """
+        from ..utils.llm_metrics import GenerationInfoHandler
+
+        handler = GenerationInfoHandler()
+        yield from timed_stream(self.llm.stream(prompt_text, config={"callbacks": [handler]}), timings)
+        timings.update(handler.get_timings())
+
+    def _response_cache_key(self, query: str, section: Optional[str], relevant_docs: List["Document"],
+                            prompt_variables: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Build the response cache key of a generation request
+
+        The key covers everything that changes the prompt or the model output:
+        the normalized query, the section, the prompt template version, the
+        model settings, the retrieved chunks and any other prompt variables.
+
+        Args:
+            query (str): Query for generation
+            section (str, optional): Section name, or None for a full RPP
+            relevant_docs (List[Document]): Documents the model sees
+            prompt_variables (Dict[str, Any], optional): Other prompt variables
+
+        Returns:
+            Optional[str]: Cache key, or None if the response cache is disabled
+        """
+        if self.response_cache is None:
+            return None
+
+        return ResponseCache.make_key(
+            query=" ".join(query.lower().split()),
+            section=section,
+            template_version=PROMPT_TEMPLATE_VERSION,
+            model=MODEL_CONFIG["local_model"],
+            temperature=MODEL_CONFIG["temperature"],
+            max_tokens=MODEL_CONFIG["max_tokens"],
+            chunk_ids=[
+                doc.metadata.get("chunk_id") or hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+                for doc in relevant_docs
+            ],
+            prompt_variables=prompt_variables or {}
+        )
+
+    def _get_cached_response(self, key: Optional[str], use_cache: bool, timings: Dict[str, Any]) -> Optional[str]:
+        """
+        Look up a generated response in the response cache
+
+        Args:
+            key (str, optional): Cache key from _response_cache_key
+            use_cache (bool): Whether cached responses may be returned
+            timings (Dict[str, Any]): Stage timings, updated in place
+
+        Returns:
+            Optional[str]: Cached response, or None on a miss or bypass
+        """
+        if key is None or not use_cache:
+            return None
+
+        start = time.perf_counter()
+        cached = self.response_cache.get(key)
+        timings["response_cache_lookup"] = time.perf_counter() - start
+        timings["response_cache_hit"] = cached is not None
+        return cached
 
-            if not feedback_memories:
-                return ""
+    def _put_cached_response(self, key: Optional[str], result: str):
+        """Store a generated response, replacing any cached one for the same request"""
+        if key is not None and result:
+            self.response_cache.put(key, result)
 
-            # Filter feedback based on context
-            relevant_feedback = []
-            for memory in feedback_memories:
-                if memory["metadata"].get("context", {}).get("mata_pelajaran") == context.get("mata_pelajaran"):
-                    relevant_feedback.append(memory["content"].get("feedback", ""))
+    @staticmethod
+    def _feedback_text(feedback: Dict[str, Any]) -> str:
+        """Text of a feedback entry as it is embedded in the feedback index"""
+        section = feedback.get("section")
+        text = feedback.get("feedback", "")
+        return f"{section}: {text}" if section else text
 
-            return "\n".join(relevant_feedback) if relevant_feedback else ""
+    def _sync_feedback_index(self):
+        """Bring the feedback index in line with the feedback memories"""
+        try:
+            self.feedback_index.sync([
+                (memory["id"], self._feedback_text(memory["content"]))
+                for memory in self.memory_store.get_memories("feedback")
+            ])
+            self._feedback_synced = True
+        except Exception as e:
+            self.logger.error(f"Error syncing feedback index: {str(e)}")
+
+    def _get_relevant_feedback(self, query: str, section: str, timings: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Get past feedback semantically similar to the section being generated
+
+        Args:
+            query (str): Base query for RPP generation
+            section (str): Section being generated
+            timings (Dict[str, Any], optional): Stage timings, updated in place
+
+        Returns:
+            str: Relevant feedback, one entry per line, or "-" if there is none
+        """
+        start = time.perf_counter()
+        try:
+            # Sync once per process, then pick up feedback stored by other processes
+            if (not self._feedback_synced
+                    or set(self.memory_store.get_memory_ids("feedback")) != self.feedback_index.get_synced_ids()):
+                self._sync_feedback_index()
+
+            matches = self.feedback_index.search(
+                f"{section}\n{query}",
+                k=FEEDBACK_CONFIG["top_k"],
+                min_score=FEEDBACK_CONFIG["min_score"]
+            )
+            return "\n".join(f"- {text}" for _, text, _ in matches) if matches else "-"
         except Exception as e:
             self.logger.error(f"Error getting relevant feedback: {str(e)}")
-            return ""
+            return "-"
+        finally:
+            if timings is not None:
+                timings["feedback_lookup"] = time.perf_counter() - start
+
+    @staticmethod
+    def _curriculum_fields(metadata: Dict[str, Any]) -> Dict[str, str]:
+        """Subject and grade of a file's metadata, normalized as stored on its chunks"""
+        fields = {
+            "mata_pelajaran": normalize_subject(metadata.get("mata_pelajaran")),
+            "kelas": normalize_kelas(metadata.get("kelas"))
+        }
+        return {field: value for field, value in fields.items() if value}
 
-    def process_documents(self, directory: str) -> Dict[str, Any]:
+    def _get_file_metadata(self, file_path: str, directory: str,
+                           curriculum: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """File metadata with inferred curriculum fields, overridden by any given ones"""
+        metadata = self.data_processor.get_metadata(file_path, directory)
+        metadata.update(self._curriculum_fields({**metadata, **(curriculum or {})}))
+        return metadata
+
+    def process_documents(self, directory: str, curriculum: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Process documents in a directory and add to vector store
 
+        Only new or modified files are chunked and embedded. Files whose
+        content hash matches the ingestion manifest are skipped, and files
+        that were removed from the directory have their chunks deleted.
+
+        Chunks are tagged with mata_pelajaran and kelas, inferred from the
+        directory and file names or given explicitly, so retrieval can filter
+        on them. Unchanged files whose tags changed are retagged in place.
+
         Args:
             directory (str): Path to directory containing documents
+            curriculum (Dict[str, Any], optional): mata_pelajaran and/or kelas for every file
 
         Returns:
             Dict[str, Any]: Processing results
         """
         try:
-            # Process documents
-            processed_docs = self.data_processor.process_directory(directory)
-
-            # Add to vector store
-            for file_path, chunks in processed_docs.items():
-                metadata = self.data_processor.get_metadata(file_path)
-                self.vector_store.add_documents(chunks, metadata)
-
-                # Store processing memory
-                self.memory_store.add_memory(
-                    "document_processing",
-                    {
-                        "file_path": file_path,
-                        "chunks_count": len(chunks)
-                    },
-                    metadata
-                )
+            # Work out which files changed since the last ingestion
+            file_paths = self.data_processor.find_files(directory)
+            changed_hashes = {}
+            skipped_files = 0
+            retagged_files = 0
+            for file_path in file_paths:
+                try:
+                    content_hash = self.data_processor.compute_file_hash(file_path)
+                except Exception:
+                    continue
+                if self.vector_store.get_source_hash(file_path) == content_hash:
+                    skipped_files += 1
+                    fields = self._curriculum_fields(self._get_file_metadata(file_path, directory, curriculum))
+                    if self.vector_store.get_source_fields(file_path) != fields:
+                        self.vector_store.update_source_metadata(file_path, fields, persist=False)
+                        retagged_files += 1
+                else:
+                    changed_hashes[file_path] = content_hash
+
+            # Drop chunks of files that no longer exist
+            current_sources = {os.path.abspath(file_path) for file_path in file_paths}
+            removed_sources = [
+                source for source in self.vector_store.get_sources(directory)
+                if source not in current_sources
+            ]
+            for source in removed_sources:
+                self.vector_store.remove_source(source, persist=False)
+
+            # Process documents as a pipeline: file N+1 is embedded while a
+            # background writer stores file N. The collection and the manifest
+            # are persisted once at the end
+            processed_files = 0
+            total_chunks = 0
+            start = time.perf_counter()
+
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-store-writer") as writer:
+                pending_write = None
+                for file_path, chunks in self.data_processor.iter_directory(directory, file_paths=list(changed_hashes)):
+                    metadata = self._get_file_metadata(file_path, directory, curriculum)
+                    metadata["content_hash"] = changed_hashes[file_path]
+                    embeddings = self.vector_store.embed_documents(chunks)
+
+                    if pending_write is not None:
+                        pending_write.result()
+                    pending_write = writer.submit(
+                        self.vector_store.add_embedded_documents,
+                        chunks,
+                        embeddings,
+                        metadata,
+                        source=file_path,
+                        content_hash=changed_hashes[file_path],
+                        persist=False
+                    )
+
+                    processed_files += 1
+                    total_chunks += len(chunks)
+
+                    # Store processing memory
+                    self.memory_store.add_memory(
+                        "document_processing",
+                        {
+                            "file_path": file_path,
+                            "chunks_count": len(chunks)
+                        },
+                        metadata
+                    )
+
+                if pending_write is not None:
+                    pending_write.result()
+
+            if processed_files or removed_sources or retagged_files:
+                self.vector_store.persist()
+
+            elapsed = time.perf_counter() - start
 
             return {
-                "processed_files": len(processed_docs),
-                "total_chunks": sum(len(chunks) for chunks in processed_docs.values())
+                "processed_files": processed_files,
+                "total_chunks": total_chunks,
+                "skipped_files": skipped_files,
+                "retagged_files": retagged_files,
+                "removed_files": len(removed_sources),
+                "elapsed": elapsed,
+                "chunks_per_second": total_chunks / elapsed if elapsed > 0 else 0.0
             }
         except Exception as e:
             self.logger.error(f"Error processing documents: {str(e)}")
             raise
 
-    def generate_rpp(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _record_rpp(self, query: str, context: Optional[Dict[str, Any]], result: str,
+                    relevant_docs: List["Document"], timings: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store a generated RPP in memory and build the RPP result
+
+        Args:
+            query (str): Query for RPP generation
+            context (Dict[str, Any], optional): Additional context
+            result (str): Generated RPP text
+            relevant_docs (List[Document]): Documents the model saw
+            timings (Dict[str, Any]): Stage timings
+
+        Returns:
+            Dict[str, Any]: Generated RPP
+        """
+        # Store interaction memory
+        memory_id = self.memory_store.add_memory(
+            "rpp_generation",
+            {
+                "query": query,
+                "response": result,
+                "context": context,
+                "sources": [doc.metadata for doc in relevant_docs],
+                "timings": timings,
+            }
+        )
+
+        return {
+            "memory_id": memory_id,
+            "rpp": result,
+            "sources": [doc.metadata for doc in relevant_docs],
+            "timings": timings
+        }
+
+    def generate_rpp(self, query: str, context: Optional[Dict[str, Any]] = None,
+                     use_cache: bool = True) -> Dict[str, Any]:
         """
         Generate RPP based on query and context using local model
 
         Args:
             query (str): Query for RPP generation
             context (Dict[str, Any], optional): Additional context
+            use_cache (bool): Return a cached response for an identical request if there is one
 
         Returns:
             Dict[str, Any]: Generated RPP
         """
         try:
-            # Get relevant documents using local embeddings
-            relevant_docs = self.vector_store.similarity_search(query)
+            # Retrieve once; the packed documents go into the prompt and the sources
+            relevant_docs, timings = self._retrieve(query, context=context)
+            prompt_text, packed_docs = self._build_prompt(self.rpp_prompt, query, relevant_docs, timings)
 
-            # Prepare context from relevant documents
-            context_text = "\n\n".join([doc.page_content for doc in relevant_docs])
+            cache_key = self._response_cache_key(query, None, packed_docs)
+            result = self._get_cached_response(cache_key, use_cache, timings)
+            if result is None:
+                # Generate RPP using local model
+                result = self._generate_from_prompt(prompt_text, timings)
+                self._put_cached_response(cache_key, result)
 
-            # Generate RPP using local model
-            response = self.qa_chain.invoke({
-                "query": query,
-                "context": context_text,
-            })
+            return self._record_rpp(query, context, result, packed_docs, timings)
+        except Exception as e:
+            self.logger.error(f"Error generating RPP: {str(e)}")
+            raise
 
-            # Store interaction memory
-            self.memory_store.add_memory(
-                "rpp_generation",
-                {
-                    "query": query,
-                    "response": response["result"],
-                    "context": context,
-                    "sources": [doc.metadata for doc in relevant_docs],
-                }
-            )
+    def stream_rpp(self, query: str, context: Optional[Dict[str, Any]] = None,
+                   use_cache: bool = True) -> Generator[str, None, Dict[str, Any]]:
+        """
+        Stream an RPP token by token, storing it in memory when the stream ends
 
-            return {
-                "rpp": response["result"],
-                "sources": [doc.metadata for doc in relevant_docs]
-            }
+        A cached response for an identical request is yielded in one piece.
+
+        Args:
+            query (str): Query for RPP generation
+            context (Dict[str, Any], optional): Additional context
+            use_cache (bool): Return a cached response for an identical request if there is one
+
+        Yields:
+            str: Tokens as the model produces them
+
+        Returns:
+            Dict[str, Any]: Generated RPP, as the generator's return value
+        """
+        try:
+            relevant_docs, timings = self._retrieve(query, context=context)
+            prompt_text, packed_docs = self._build_prompt(self.rpp_prompt, query, relevant_docs, timings)
+
+            cache_key = self._response_cache_key(query, None, packed_docs)
+            cached = self._get_cached_response(cache_key, use_cache, timings)
+            if cached is not None:
+                yield cached
+                return self._record_rpp(query, context, cached, packed_docs, timings)
+
+            tokens = []
+            for token in self._stream_from_prompt(prompt_text, timings):
+                tokens.append(token)
+                yield token
+
+            result = "".join(tokens)
+            self._put_cached_response(cache_key, result)
+            return self._record_rpp(query, context, result, packed_docs, timings)
         except Exception as e:
-            self.logger.error(f"Error generating RPP: {str(e)}")
+            self.logger.error(f"Error streaming RPP: {str(e)}")
             raise
 
-    def get_feedback(self, rpp_id: str, feedback: Dict[str, Any]):
+    def get_feedback(self, rpp_id: int, feedback: Dict[str, Any]) -> int:
         """
         Store feedback for generated RPP
 
         Args:
-            rpp_id (str): ID of the RPP
+            rpp_id (int): Memory ID of the RPP or section generation record
             feedback (Dict[str, Any]): Feedback content
+
+        Returns:
+            int: Memory ID of the stored feedback
         """
         try:
             # Add feedback type for better categorization
             feedback_type = "content" if "contoh soal" in feedback.get("feedback", "").lower() else "general"
 
-            self.memory_store.add_memory(
+            feedback_id = self.memory_store.add_memory(
                 "feedback",
                 {
                     **feedback,
@@ -224,12 +825,95 @@ class RPPAgent:
                 },
                 {"rpp_id": rpp_id}
             )
+            self.feedback_index.add(feedback_id, self._feedback_text(feedback))
+
+            # Link the generation record back to its feedback
+            generation = self.memory_store.get_memory(rpp_id)
+            if generation is not None:
+                self.memory_store.update_memory(
+                    rpp_id,
+                    {"feedback_ids": generation.get("feedback_ids", []) + [feedback_id]}
+                )
+
             self.logger.info(f"Feedback stored for RPP: {rpp_id}")
+            return feedback_id
         except Exception as e:
             self.logger.error(f"Error storing feedback: {str(e)}")
             raise
 
-    def generate_rpp_section(self, query: str, section: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _generate_section_content(self, query: str, section: str, context: Optional[Dict[str, Any]] = None,
+                                  use_cache: bool = True) -> Tuple[str, List["Document"], Dict[str, Any]]:
+        """
+        Generate the text of one section without recording it
+
+        Args:
+            query (str): Base query for RPP generation
+            section (str): The specific section to generate
+            context (Dict[str, Any], optional): Additional context, used to filter retrieval
+            use_cache (bool): Return a cached response for an identical request if there is one
+
+        Returns:
+            Tuple[str, List[Document], Dict[str, Any]]: Section text, source documents and stage timings
+        """
+        # Retrieve once; the packed documents go into the prompt and the sources
+        relevant_docs, timings = self._retrieve(query, context=context)
+
+        # Use the precompiled section-specific prompt
+        section_prompt = self._get_section_prompt(section)
+
+        # Generate the section, reminding the model of similar past feedback
+        feedback = self._get_relevant_feedback(query, section, timings)
+
+        prompt_text, packed_docs = self._build_prompt(
+            section_prompt, query, relevant_docs, timings, {"feedback": feedback}
+        )
+
+        cache_key = self._response_cache_key(query, section, packed_docs, {"feedback": feedback})
+        result = self._get_cached_response(cache_key, use_cache, timings)
+        if result is None:
+            result = self._generate_from_prompt(prompt_text, timings)
+            self._put_cached_response(cache_key, result)
+        return result, packed_docs, timings
+
+    def _record_section(self, query: str, section: str, context: Optional[Dict[str, Any]], result: str,
+                        relevant_docs: List["Document"], timings: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store a generated section in memory and build the section result
+
+        Args:
+            query (str): Base query for RPP generation
+            section (str): Section name
+            context (Dict[str, Any], optional): Additional context
+            result (str): Generated section text
+            relevant_docs (List[Document]): Documents the model saw
+            timings (Dict[str, Any]): Stage timings
+
+        Returns:
+            Dict[str, Any]: Generated RPP section
+        """
+        # Store interaction memory
+        memory_id = self.memory_store.add_memory(
+            "rpp_section_generation",
+            {
+                "query": query,
+                "section": section,
+                "response": result,
+                "context": context,
+                "sources": [doc.metadata for doc in relevant_docs],
+                "timings": timings,
+            }
+        )
+
+        return {
+            "memory_id": memory_id,
+            "section_content": result,
+            "section_name": section,
+            "sources": [doc.metadata for doc in relevant_docs],
+            "timings": timings
+        }
+
+    def generate_rpp_section(self, query: str, section: str, context: Optional[Dict[str, Any]] = None,
+                             use_cache: bool = True) -> Dict[str, Any]:
         """
         Generate a specific section of the RPP based on query and context
 
@@ -237,75 +921,95 @@ class RPPAgent:
             query (str): Base query for RPP generation
             section (str): The specific section to generate
             context (Dict[str, Any], optional): Additional context
+            use_cache (bool): Return a cached response for an identical request if there is one;
+                pass False to regenerate a rejected section
 
         Returns:
             Dict[str, Any]: Generated RPP section
         """
         try:
-            # Get relevant documents using local embeddings
-            relevant_docs = self.vector_store.similarity_search(query)
+            result, relevant_docs, timings = self._generate_section_content(query, section, context, use_cache)
+            return self._record_section(query, section, context, result, relevant_docs, timings)
+        except Exception as e:
+            self.logger.error(f"Error generating RPP section {section}: {str(e)}")
+            raise
 
-            # Prepare context from relevant documents
-            context_text = "\n\n".join([doc.page_content for doc in relevant_docs])
+    def stream_rpp_section(self, query: str, section: str, context: Optional[Dict[str, Any]] = None,
+                           use_cache: bool = True) -> Generator[str, None, Dict[str, Any]]:
+        """
+        Stream a specific section of the RPP, storing it in memory when the stream ends
 
-            # Create section-specific prompt
-            section_prompt_template = f"""
-            Kamu adalah asisten yang ahli dalam membuat Rencana Pelaksanaan Pembelajaran (RPP).
-            Berdasarkan informasi dari dokumen sumber, buatkan bagian {section} dari RPP untuk:
-            {{question}}
+        A cached response for an identical request is yielded in one piece.
 
-            Informasi dari Dokumen Sumber:
-            {{context}}
+        Args:
+            query (str): Base query for RPP generation
+            section (str): The specific section to generate
+            context (Dict[str, Any], optional): Additional context
+            use_cache (bool): Return a cached response for an identical request if there is one;
+                pass False to regenerate a rejected section
 
-            Sekarang, hanya buatkan bagian {section} dari RPP secara detail dan lengkap.
-            Jangan menulis bagian lain dari RPP, fokus hanya pada bagian {section}.
-            """
+        Yields:
+            str: Tokens as the model produces them
 
-            section_prompt = PromptTemplate(
-                template=section_prompt_template,
-                input_variables=["context", "question"]
-            )
+        Returns:
+            Dict[str, Any]: Generated RPP section, as the generator's return value
+        """
+        try:
+            relevant_docs, timings = self._retrieve(query, context=context)
+            section_prompt = self._get_section_prompt(section)
+            feedback = self._get_relevant_feedback(query, section, timings)
 
-            # Use the section prompt for this specific generation
-            section_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=self.vector_store.vector_store.as_retriever(
-                    search_kwargs={"k": 3}
-                ),
-                chain_type_kwargs={
-                    "prompt": section_prompt,
-                    "verbose": True
-                }
+            prompt_text, packed_docs = self._build_prompt(
+                section_prompt, query, relevant_docs, timings, {"feedback": feedback}
             )
 
-            # Generate the section
-            response = section_chain.invoke({
-                "query": query,
-                "context": context_text,
-            })
+            cache_key = self._response_cache_key(query, section, packed_docs, {"feedback": feedback})
+            cached = self._get_cached_response(cache_key, use_cache, timings)
+            if cached is not None:
+                yield cached
+                return self._record_section(query, section, context, cached, packed_docs, timings)
 
-            # Store interaction memory
-            self.memory_store.add_memory(
-                "rpp_section_generation",
-                {
-                    "query": query,
-                    "section": section,
-                    "response": response["result"],
-                    "context": context,
-                    "sources": [doc.metadata for doc in relevant_docs],
-                }
-            )
+            tokens = []
+            for token in self._stream_from_prompt(prompt_text, timings):
+                tokens.append(token)
+                yield token
 
-            return {
-                "section_content": response["result"],
-                "section_name": section,
-                "sources": [doc.metadata for doc in relevant_docs]
-            }
+            result = "".join(tokens)
+            self._put_cached_response(cache_key, result)
+            return self._record_section(query, section, context, result, packed_docs, timings)
         except Exception as e:
-            self.logger.error(f"Error generating RPP section {section}: {str(e)}")
+            self.logger.error(f"Error streaming RPP section {section}: {str(e)}")
             raise
 
+    def generate_all_sections(self, query: str, context: Optional[Dict[str, Any]] = None,
+                              max_concurrency: Optional[int] = None,
+                              sections: Optional[List[str]] = None) -> "SectionBatch":
+        """
+        Generate all RPP sections concurrently, handing them over in document order
+
+        All sections are dispatched to a bounded thread pool when this is
+        called, so they generate while the caller does other work (such as
+        streaming another section) and while earlier ones are being reviewed.
+
+        Args:
+            query (str): Base query for RPP generation
+            context (Dict[str, Any], optional): Additional context
+            max_concurrency (int, optional): Maximum concurrent generations
+            sections (List[str], optional): Sections to generate, defaults to RPP_SECTIONS
+
+        Returns:
+            SectionBatch: The dispatched sections; iterate it for the results in
+                compile_full_rpp order, and close it (or use it in a with block)
+                to cancel what has not started if they are not all needed
+        """
+        sections = sections or RPP_SECTIONS
+        max_concurrency = max_concurrency or MODEL_CONFIG["max_concurrency"]
+
+        # Retrieve up front so every worker hits the retrieval cache
+        self._retrieve(query, context=context)
+
+        return SectionBatch(self, query, context, sections, max_concurrency)
+
     def compile_full_rpp(self, sections: Dict[str, str]) -> str:
         """
         Compile all the approved sections into a complete RPP
@@ -317,22 +1021,10 @@ class RPPAgent:
             str: Complete RPP document
         """
         try:
-            # Define the order of sections in the final RPP
-            section_order = [
-                "Identitas",
-                "Kompetensi Dasar dan Indikator",
-                "Tujuan Pembelajaran",
-                "Materi Pembelajaran",
-                "Metode Pembelajaran",
-                "Media dan Sumber Belajar",
-                "Langkah Pembelajaran",
-                "Penilaian"
-            ]
-
             # Compile the RPP in the correct order
             full_rpp = "# RENCANA PELAKSANAAN PEMBELAJARAN (RPP)\n\n"
 
-            for section in section_order:
+            for section in RPP_SECTIONS:
                 if section in sections:
                     full_rpp += f"## {section}\n"
                     full_rpp += sections[section]
@@ -352,18 +1044,22 @@ class RPPAgent:
         """
         try:
             vector_store_stats = self.vector_store.get_collection_stats()
+            memory_counts = self.memory_store.get_memory_counts()
             memory_stats = {
-                "total_memories": len(self.memory_store.get_memories()),
+                "total_memories": sum(memory_counts.values()),
                 "memory_types": {
-                    "document_processing": len(self.memory_store.get_memories("document_processing")),
-                    "rpp_generation": len(self.memory_store.get_memories("rpp_generation")),
-                    "feedback": len(self.memory_store.get_memories("feedback"))
+                    "document_processing": memory_counts.get("document_processing", 0),
+                    "rpp_generation": memory_counts.get("rpp_generation", 0),
+                    "feedback": memory_counts.get("feedback", 0)
                 }
             }
 
             return {
                 "vector_store": vector_store_stats,
                 "memory_store": memory_stats,
+                "embeddings": get_embedding_stats(),
+                "feedback_index": self.feedback_index.get_stats(),
+                "response_cache": self.response_cache.get_stats() if self.response_cache else None,
                 "model": {
                     "name": MODEL_CONFIG["local_model"],
                     "embedding_model": MODEL_CONFIG["embedding_model"]
@@ -11,22 +11,98 @@ MEMORY_DIR = BASE_DIR / "memory"
 MODEL_CONFIG = {
     "local_model": "rpp:latest",
     "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
+    "embedding_device": os.getenv("EMBEDDING_DEVICE", "cpu"),
+    "embedding_batch_size": 64,
+    "normalize_embeddings": False,
     "chunk_size": 1000,
     "chunk_overlap": 200,
     "temperature": 0.7,
-    "max_tokens": 2000
+    "max_tokens": 2000,
+    "max_concurrency": 2,
+    # How long Ollama keeps the model loaded after a call, so slow reviews do not unload it
+    "keep_alive": os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
+    # Load the model and prefill the static prompt prefix at startup
+    "warm_up": os.getenv("RPP_WARM_UP", "1") == "1"
+}
+
+# Prompt context packing configurations; the window is the model's num_ctx
+CONTEXT_CONFIG = {
+    "context_window": MODEL_CONFIG["max_tokens"],
+    # Tokens of the window kept free for the model's answer
+    "output_reserve_tokens": 700,
+    # A chunk that would have to be trimmed below this is dropped instead
+    "min_chunk_tokens": 48,
+    # Chunks whose text is at least this share of already included sentences are dropped
+    "duplicate_threshold": 0.8
 }
 
 # Vector Store configurations
 VECTOR_STORE_CONFIG = {
     "collection_name": "rpp_knowledge_base",
-    "persist_directory": str(MODELS_DIR / "vector_store")
+    "persist_directory": str(MODELS_DIR / "vector_store"),
+    "manifest_file": "ingest_manifest.json",
+    "retrieval_cache_size": 128,
+    "retrieval_cache_ttl": 3600,
+    # "dense" searches Chroma only, "hybrid" fuses it with a BM25 index by reciprocal rank
+    "retrieval_mode": os.getenv("RETRIEVAL_MODE", "hybrid"),
+    "lexical_index_file": "lexical_index.sqlite3",
+    "bm25_k1": 1.5,
+    "bm25_b": 0.75,
+    "hybrid_candidates": 20,
+    "rrf_k": 60,
+    # Chunk metadata fields retrieval can filter on
+    "filter_fields": ["mata_pelajaran", "kelas", "source_file"],
+    # "chroma" or "numpy" (memory-mapped float16/int8 vectors, flat or IVF search)
+    "backend": os.getenv("VECTOR_BACKEND", "chroma"),
+    "numpy_index": {
+        "directory": "numpy_index",
+        "index_type": os.getenv("VECTOR_INDEX_TYPE", "flat"),
+        "dtype": os.getenv("VECTOR_INDEX_DTYPE", "float16"),
+        "ivf_lists": 64,
+        "ivf_probes": 8
+    }
+}
+
+# Embedding cache configurations
+EMBEDDING_CACHE_CONFIG = {
+    "enabled": True,
+    "directory": str(MODELS_DIR / "embedding_cache"),
+    "max_entries": 200000
 }
 
 # Memory Store configurations
 MEMORY_STORE_CONFIG = {
     "persist_directory": str(MEMORY_DIR / "personal_memory"),
-    "max_memory_items": 1000
+    "database_file": "memory.sqlite3",
+    # Default per-type item cap for memory types without a retention policy
+    "max_memory_items": 1000,
+    # Per-type retention; evicted memories of archived types go to gzip cold files
+    "retention": {
+        "rpp_generation": {"max_items": 200, "max_age_days": 30, "max_bytes": 5 * 1024 * 1024, "archive": True},
+        "rpp_section_generation": {"max_items": 400, "max_age_days": 30, "max_bytes": 10 * 1024 * 1024, "archive": True},
+        "feedback": {"max_items": 5000, "max_age_days": None, "max_bytes": None, "archive": False},
+        "document_processing": {"max_items": 500, "max_age_days": 180, "max_bytes": None, "archive": False}
+    },
+    "archive_directory": "archive",
+    "flush_interval": 2.0,
+    "flush_batch_size": 100,
+    "id_block_size": 64,
+    # Entries kept in the change log other processes catch up from; a store
+    # that falls further behind reloads in full
+    "change_log_size": 10000
+}
+
+# Generation response cache configurations (opt-in)
+RESPONSE_CACHE_CONFIG = {
+    "enabled": os.getenv("RPP_RESPONSE_CACHE", "0") == "1",
+    "path": str(MODELS_DIR / "response_cache.sqlite3"),
+    "max_entries": 2000
+}
+
+# Feedback retrieval configurations
+FEEDBACK_CONFIG = {
+    "top_k": 3,
+    "min_score": 0.35
 }
 
 # API configurations
@@ -35,10 +111,20 @@ API_CONFIG = {
     "openai_model": "gpt-4o-mini"
 }
 
+# HTTP serving configurations
+SERVER_CONFIG = {
+    "host": os.getenv("RPP_SERVER_HOST", "127.0.0.1"),
+    "port": int(os.getenv("RPP_SERVER_PORT", "8000")),
+    "llm_concurrency": MODEL_CONFIG["max_concurrency"],
+    "max_queue_size": 16,
+    "max_body_bytes": 1024 * 1024
+}
+
 # Data processing configurations
 DATA_CONFIG = {
     "allowed_extensions": [".pdf", ".docx", ".txt"],
-    "max_file_size": 10 * 1024 * 1024
+    "max_file_size": 10 * 1024 * 1024,
+    "ingest_workers": int(os.getenv("INGEST_WORKERS", min(4, os.cpu_count() or 1)))
 }
 
 # Create necessary directories
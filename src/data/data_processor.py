@@ -1,24 +1,51 @@
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
 import os
-from langchain_community.document_loaders import PyPDFLoader, TextLoader, Docx2txtLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.schema import Document
 import logging
 
 from ..config.config import DATA_CONFIG, MODEL_CONFIG
+from ..utils.curriculum import infer_curriculum_metadata
+
+# langchain loaders and splitters are imported on first use, not at startup
+if TYPE_CHECKING:
+    from langchain.schema import Document
+
+# Per-process DataProcessor used by ingestion pool workers
+_worker_processor = None
+
+
+def _process_file_in_worker(file_path: str) -> List["Document"]:
+    """Process a single file inside a pool worker process"""
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = DataProcessor()
+    return _worker_processor.process_file(file_path)
+
 
 class DataProcessor:
     def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=MODEL_CONFIG["chunk_size"],
-            chunk_overlap=MODEL_CONFIG["chunk_overlap"],
-            length_function=len
-        )
+        self._text_splitter = None
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def text_splitter(self):
+        """Text splitter, created on first use"""
+        if self._text_splitter is None:
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+            self._text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=MODEL_CONFIG["chunk_size"],
+                chunk_overlap=MODEL_CONFIG["chunk_overlap"],
+                length_function=len
+            )
+        return self._text_splitter
+
     def _get_loader(self, file_path: str):
         """Get appropriate loader based on file extension"""
+        from langchain_community.document_loaders import PyPDFLoader, TextLoader, Docx2txtLoader
+
         ext = os.path.splitext(file_path)[1].lower()
         if ext == '.pdf':
             return PyPDFLoader(file_path)
@@ -29,7 +56,7 @@ class DataProcessor:
         else:
             raise ValueError(f"Unsupported file type: {ext}")
 
-    def process_file(self, file_path: str) -> List[Document]:
+    def process_file(self, file_path: str) -> List["Document"]:
         """
         Process a single file and return chunks
 
@@ -66,37 +93,114 @@ class DataProcessor:
             self.logger.error(f"Error processing file {file_path}: {str(e)}")
             raise
 
-    def process_directory(self, directory: str) -> Dict[str, List[Document]]:
+    def find_files(self, directory: str) -> List[str]:
         """
-        Process all supported files in a directory
+        Find all supported files in a directory
 
         Args:
             directory (str): Path to directory
 
         Returns:
-            Dict[str, List[Document]]: Dictionary mapping file paths to their chunks
+            List[str]: Paths of supported files
         """
-        results = {}
         directory_path = Path(directory)
-
-        # Find all supported files
+        file_paths = []
         for ext in DATA_CONFIG["allowed_extensions"]:
             for file_path in directory_path.rglob(f"*{ext}"):
+                file_paths.append(str(file_path))
+        return file_paths
+
+    def compute_file_hash(self, file_path: str) -> str:
+        """
+        Compute the SHA-256 hash of a file's content
+
+        Args:
+            file_path (str): Path to the file
+
+        Returns:
+            str: Hex digest of the file content
+        """
+        try:
+            digest = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            return digest.hexdigest()
+        except Exception as e:
+            self.logger.error(f"Error hashing file {file_path}: {str(e)}")
+            raise
+
+    def iter_directory(self, directory: str, file_paths: Optional[List[str]] = None,
+                       workers: Optional[int] = None) -> Iterator[Tuple[str, List["Document"]]]:
+        """
+        Process supported files in a directory, yielding each file as it finishes
+
+        With more than one worker, files are loaded and chunked in a process
+        pool and yielded in completion order. A file that fails is logged and
+        skipped without affecting the others.
+
+        Args:
+            directory (str): Path to directory
+            file_paths (List[str], optional): Only process these files instead of scanning the directory
+            workers (int, optional): Number of worker processes, defaults to DATA_CONFIG["ingest_workers"]
+
+        Yields:
+            Tuple[str, List[Document]]: File path and its chunks
+        """
+        if file_paths is None:
+            file_paths = self.find_files(directory)
+        if workers is None:
+            workers = DATA_CONFIG["ingest_workers"]
+        workers = max(1, min(workers, len(file_paths)))
+
+        if workers == 1:
+            for file_path in file_paths:
                 try:
-                    chunks = self.process_file(str(file_path))
-                    results[str(file_path)] = chunks
+                    yield file_path, self.process_file(file_path)
                 except Exception as e:
                     self.logger.error(f"Failed to process {file_path}: {str(e)}")
                     continue
+            return
 
-        return results
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_process_file_in_worker, file_path): file_path
+                for file_path in file_paths
+            }
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    chunks = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to process {file_path}: {str(e)}")
+                    continue
+                yield file_path, chunks
 
-    def get_metadata(self, file_path: str) -> Dict[str, Any]:
+    def process_directory(self, directory: str, file_paths: Optional[List[str]] = None,
+                          workers: Optional[int] = None) -> Dict[str, List["Document"]]:
+        """
+        Process all supported files in a directory
+
+        Args:
+            directory (str): Path to directory
+            file_paths (List[str], optional): Only process these files instead of scanning the directory
+            workers (int, optional): Number of worker processes, defaults to DATA_CONFIG["ingest_workers"]
+
+        Returns:
+            Dict[str, List[Document]]: Dictionary mapping file paths to their chunks
+        """
+        return dict(self.iter_directory(directory, file_paths=file_paths, workers=workers))
+
+    def get_metadata(self, file_path: str, directory: Optional[str] = None) -> Dict[str, Any]:
         """
         Get metadata about a file
 
+        Besides file stats, the subject (mata_pelajaran) and grade (kelas)
+        are inferred from the directory and file names below directory.
+
         Args:
             file_path (str): Path to the file
+            directory (str, optional): Directory the file is being ingested from
 
         Returns:
             Dict[str, Any]: File metadata
@@ -108,7 +212,8 @@ class DataProcessor:
                 "file_size": stats.st_size,
                 "created_time": stats.st_ctime,
                 "modified_time": stats.st_mtime,
-                "extension": os.path.splitext(file_path)[1].lower()
+                "extension": os.path.splitext(file_path)[1].lower(),
+                **infer_curriculum_metadata(file_path, directory)
             }
         except Exception as e:
             self.logger.error(f"Error getting metadata for {file_path}: {str(e)}")
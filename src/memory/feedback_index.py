@@ -0,0 +1,205 @@
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Set, Tuple, Union
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+import numpy as np
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+
+
+class FeedbackIndex:
+    """
+    Small in-process vector index over feedback memories
+
+    Feedback embeddings are kept as one L2-normalized float32 matrix, so a
+    lookup is a single matrix-vector product. The matrix and the matching
+    memory IDs are persisted next to the memory store.
+    """
+
+    def __init__(self, embeddings: Union["Embeddings", Callable[[], "Embeddings"]], directory: str):
+        """
+        Args:
+            embeddings: Embedding model, or a function returning it so the model
+                is only loaded once feedback is first embedded
+            directory (str): Directory the index is persisted in
+        """
+        self._embeddings = embeddings
+        self.directory = Path(directory)
+        self.vectors_file = self.directory / "vectors.npy"
+        self.ids_file = self.directory / "ids.json"
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._ids: List[int] = []
+        self._texts: Dict[int, str] = {}
+        # Feedback seen but not indexed because its text is empty
+        self._skipped: Set[int] = set()
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._load_index()
+
+    @property
+    def embeddings(self) -> "Embeddings":
+        """Embedding model, resolved on first use"""
+        if callable(self._embeddings) and not hasattr(self._embeddings, "embed_query"):
+            self._embeddings = self._embeddings()
+        return self._embeddings
+
+    def _load_index(self):
+        """Load the persisted index, if any"""
+        try:
+            if self.vectors_file.exists() and self.ids_file.exists():
+                with open(self.ids_file, 'r') as f:
+                    data = json.load(f)
+                self._ids = data["ids"]
+                self._texts = {int(memory_id): text for memory_id, text in data["texts"].items()}
+                self._vectors = np.load(self.vectors_file)
+            self.logger.info(f"Feedback index loaded with {len(self._ids)} entries")
+        except Exception as e:
+            self.logger.error(f"Error loading feedback index, starting empty: {str(e)}")
+            self._ids, self._texts = [], {}
+            self._vectors = np.zeros((0, 0), dtype=np.float32)
+
+    def _save_index(self):
+        """Persist the index, replacing the files atomically"""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_vectors = self.directory / "vectors.tmp.npy"
+            tmp_ids = self.directory / "ids.json.tmp"
+            np.save(tmp_vectors, self._vectors)
+            with open(tmp_ids, 'w') as f:
+                json.dump({"ids": self._ids, "texts": self._texts}, f)
+            os.replace(tmp_vectors, self.vectors_file)
+            os.replace(tmp_ids, self.ids_file)
+        except Exception as e:
+            self.logger.error(f"Error saving feedback index: {str(e)}")
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _add_unlocked(self, items: List[Tuple[int, str]]):
+        vectors = self._normalize(np.asarray(
+            self.embeddings.embed_documents([text for _, text in items]), dtype=np.float32
+        ))
+        if self._vectors.size == 0:
+            self._vectors = vectors
+        else:
+            self._vectors = np.vstack([self._vectors, vectors])
+        for memory_id, text in items:
+            self._ids.append(memory_id)
+            self._texts[memory_id] = text
+
+    def add(self, memory_id: int, text: str):
+        """
+        Embed a feedback memory and add it to the index
+
+        Args:
+            memory_id (int): ID of the feedback memory
+            text (str): Text to embed
+        """
+        if not text.strip():
+            with self._lock:
+                self._skipped.add(memory_id)
+            return
+        with self._lock:
+            if memory_id in self._texts:
+                return
+            self._add_unlocked([(memory_id, text)])
+            self._save_index()
+
+    def sync(self, items: List[Tuple[int, str]]):
+        """
+        Make the index match the given feedback memories
+
+        Missing entries are embedded and added; entries whose memory no
+        longer exists are dropped.
+
+        Args:
+            items (List[Tuple[int, str]]): Memory ID and text of every feedback memory
+        """
+        with self._lock:
+            wanted = {memory_id for memory_id, _ in items}
+            self._skipped = {memory_id for memory_id, text in items if not text.strip()}
+            changed = False
+
+            stale = [i for i, memory_id in enumerate(self._ids) if memory_id not in wanted]
+            if stale:
+                keep = [i for i in range(len(self._ids)) if self._ids[i] in wanted]
+                self._vectors = self._vectors[keep] if keep else np.zeros((0, 0), dtype=np.float32)
+                for i in stale:
+                    self._texts.pop(self._ids[i], None)
+                self._ids = [self._ids[i] for i in keep]
+                changed = True
+
+            missing = [(memory_id, text) for memory_id, text in items
+                       if memory_id not in self._texts and text.strip()]
+            if missing:
+                self._add_unlocked(missing)
+                changed = True
+
+            if changed:
+                self._save_index()
+                self.logger.info(f"Feedback index synced: {len(missing)} added, {len(stale)} removed")
+
+    def search(self, query: str, k: int = 3, min_score: float = 0.0) -> List[Tuple[int, str, float]]:
+        """
+        Find the feedback most similar to a query
+
+        Args:
+            query (str): Query text
+            k (int): Maximum number of results
+            min_score (float): Minimum cosine similarity
+
+        Returns:
+            List[Tuple[int, str, float]]: Memory ID, text and similarity, best first
+        """
+        if not self._ids:
+            return []
+
+        query_vector = self._normalize(np.asarray([self.embeddings.embed_query(query)], dtype=np.float32))[0]
+
+        with self._lock:
+            if not self._ids:
+                return []
+            scores = self._vectors @ query_vector
+
+            k = min(k, len(self._ids))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [
+                (self._ids[i], self._texts[self._ids[i]], float(scores[i]))
+                for i in top
+                if scores[i] >= min_score
+            ]
+
+    def get_synced_ids(self) -> Set[int]:
+        """
+        Get the IDs of every feedback memory the index has seen
+
+        Returns:
+            Set[int]: IDs of indexed feedback and of feedback skipped for having no text
+        """
+        with self._lock:
+            return set(self._ids) | self._skipped
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics
+
+        Returns:
+            Dict[str, Any]: Entry count and vector dimension
+        """
+        with self._lock:
+            return {
+                "entries": len(self._ids),
+                "dimension": int(self._vectors.shape[1]) if self._vectors.size else None
+            }
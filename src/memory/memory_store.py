@@ -1,6 +1,14 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
+from collections import deque
+from contextlib import contextmanager
+from datetime import timedelta
+import atexit
+import gzip
+import itertools
 import json
-import os
+import sqlite3
+import threading
+import uuid
 from datetime import datetime
 import logging
 from pathlib import Path
@@ -8,43 +16,591 @@ from pathlib import Path
 from ..config.config import MEMORY_STORE_CONFIG
 
 class MemoryStoreManager:
-    def __init__(self):
-        self.memory_file = Path(MEMORY_STORE_CONFIG["persist_directory"]) / "memory.json"
-        self.max_items = MEMORY_STORE_CONFIG["max_memory_items"]
+    """
+    Memory store with an in-memory view and write-behind SQLite persistence
+
+    Every memory gets a monotonic integer ID when it is added. All memories
+    are loaded once into a type-partitioned in-memory view with an ID index,
+    so reads and ID lookups never touch disk. Writes update the view
+    immediately and are queued; a background thread flushes the queue in one
+    transaction every flush_interval seconds, when flush_batch_size writes
+    are pending, or on shutdown.
+
+    Several processes can share one store. Every write is an SQLite
+    transaction taken with BEGIN IMMEDIATE, so it is atomic and serialized
+    by SQLite's file lock. IDs are reserved from the database in blocks so
+    they stay unique across processes. Every write is also recorded in a
+    change log, so when another process has committed since the last read
+    only the logged changes are applied to the view. The view is reloaded
+    in full only when the log cannot tell what changed: after a clear or a
+    migration, or when the entries were pruned before they were read.
+
+    Each memory type has its own retention policy (item count, age and
+    total bytes), enforced on every insert by evicting that type's oldest
+    memories. Evicted memories of archived types are appended to a gzip
+    JSONL cold file instead of being dropped.
+    """
+
+    def __init__(self, persist_directory: Optional[str] = None, max_items: Optional[int] = None):
+        persist_directory = Path(persist_directory or MEMORY_STORE_CONFIG["persist_directory"])
+        self.memory_file = persist_directory / "memory.json"
+        self.database_file = persist_directory / MEMORY_STORE_CONFIG["database_file"]
+        self.archive_directory = persist_directory / MEMORY_STORE_CONFIG["archive_directory"]
+        self.max_items = max_items or MEMORY_STORE_CONFIG["max_memory_items"]
+        self.retention = MEMORY_STORE_CONFIG["retention"]
+        self.id_block_size = MEMORY_STORE_CONFIG["id_block_size"]
+        self.flush_interval = MEMORY_STORE_CONFIG["flush_interval"]
+        self.flush_batch_size = MEMORY_STORE_CONFIG["flush_batch_size"]
+        self.change_log_size = MEMORY_STORE_CONFIG["change_log_size"]
         self.logger = logging.getLogger(__name__)
+
+        # In-memory view: ID index in insertion order, plus per-type queues oldest first
+        self._index: Dict[int, Dict[str, Any]] = {}
+        self._by_type: Dict[str, deque] = {}
+        self._sizes: Dict[int, int] = {}
+        self._type_bytes: Dict[str, int] = {}
+
+        # IDs reserved for this process: [_next_id, _id_limit)
+        self._next_id = 0
+        self._id_limit = 0
+
+        # SQLite data_version seen at the last sync, to detect other writers
+        self._data_version = None
+
+        # Last change log entry applied to the view, and this store's tag on the entries it writes
+        self._change_version = 0
+        self._writer = uuid.uuid4().hex
+
+        # Writes waiting to be flushed, in order, and the batch being written
+        self._pending: List[Tuple[Any, ...]] = []
+        self._writing: List[Tuple[Any, ...]] = []
+
+        # Lock order: _flush_lock, then _lock, then _db_lock
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._db_lock = threading.RLock()
+        self._flush_requested = threading.Event()
+        self._closed = False
+
         self._initialize_memory_store()
 
+        self._flusher = threading.Thread(target=self._flush_loop, name="memory-store-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
     def _initialize_memory_store(self):
-        """Initialize memory store file if it doesn't exist"""
+        """Initialize the SQLite memory store, migrate the legacy JSON file and load the view"""
         try:
-            self.memory_file.parent.mkdir(parents=True, exist_ok=True)
-            if not self.memory_file.exists():
-                with open(self.memory_file, 'w') as f:
-                    json.dump({"memories": []}, f)
+            self.database_file.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.database_file),
+                timeout=30,
+                check_same_thread=False,
+                isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Commits are batched, so each one can afford a full fsync
+            self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS memories (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    memory_id INTEGER UNIQUE,
+                    type TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    rpp_id TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_memories_type ON memories (type, seq);
+                CREATE INDEX IF NOT EXISTS idx_memories_timestamp ON memories (timestamp);
+                CREATE INDEX IF NOT EXISTS idx_memories_rpp_id ON memories (rpp_id);
+                CREATE INDEX IF NOT EXISTS idx_memories_memory_id ON memories (memory_id);
+                CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS changes (
+                    version INTEGER PRIMARY KEY AUTOINCREMENT,
+                    writer TEXT,
+                    kind TEXT NOT NULL,
+                    memory_id INTEGER,
+                    type TEXT
+                );
+            """)
+            self._migrate_json_store()
+            self._assign_missing_ids()
+            self._load_memories()
+
+            # Apply retention to whatever was persisted before
+            with self._lock:
+                for memory_type in list(self._by_type):
+                    self._enforce_retention(memory_type)
+            self.flush()
+
             self.logger.info("Memory store initialized successfully")
         except Exception as e:
             self.logger.error(f"Error initializing memory store: {str(e)}")
             raise
 
-    def _load_memories(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Load memories from file"""
-        try:
+    @contextmanager
+    def _transaction(self):
+        """Run a write transaction holding SQLite's write lock for its duration"""
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _allocate_ids(self, count: int) -> int:
+        """Reserve count consecutive IDs inside the current transaction and return the first"""
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'next_id'").fetchone()
+        max_id = self._conn.execute("SELECT MAX(memory_id) FROM memories").fetchone()[0] or 0
+        start = max(row[0] if row else 1, max_id + 1)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES ('next_id', ?)", (start + count,)
+        )
+        return start
+
+    def _reserve_ids(self):
+        """Reserve a new block of IDs for this process"""
+        with self._transaction():
+            self._next_id = self._allocate_ids(self.id_block_size)
+        self._id_limit = self._next_id + self.id_block_size
+
+    def _migrate_json_store(self):
+        """Import memories from the legacy memory.json file, once"""
+        if not self.memory_file.exists():
+            return
+
+        with self._transaction():
+            # The file is left in place, so the import is recorded in the
+            # database; another process may have migrated while we waited,
+            # and older versions renamed the file to memory.json.migrated
+            if (self._conn.execute("SELECT 1 FROM meta WHERE name = 'json_migrated'").fetchone()
+                    or self.memory_file.with_suffix(".json.migrated").exists()):
+                return
+
             with open(self.memory_file, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            self.logger.error(f"Error loading memories: {str(e)}")
+                memories = json.load(f).get("memories", [])
+            self._insert_rows(memories)
+            self._log_changes("reload", [(None, None)], writer=None)
+            self._conn.execute("INSERT INTO meta (name, value) VALUES ('json_migrated', 1)")
+
+        self.logger.info(f"Migrated {len(memories)} memories from {self.memory_file}")
+
+    def _assign_missing_ids(self):
+        """Give an ID to persisted memories that predate memory IDs"""
+        with self._transaction():
+            rows = self._conn.execute(
+                "SELECT seq, data FROM memories WHERE memory_id IS NULL ORDER BY seq"
+            ).fetchall()
+            if not rows:
+                return
+
+            next_id = self._allocate_ids(len(rows))
+            updates = []
+            for seq, data in rows:
+                memory = json.loads(data)
+                memory["id"] = next_id
+                updates.append((next_id, json.dumps(memory), seq))
+                next_id += 1
+            self._conn.executemany("UPDATE memories SET memory_id = ?, data = ? WHERE seq = ?", updates)
+            self._log_changes("reload", [(None, None)], writer=None)
+
+    def _load_memories(self):
+        """Load all persisted memories into the in-memory view"""
+        with self._db_lock:
+            # Read before the rows: a commit in between makes this version stale,
+            # which only costs a sync that finds nothing new
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            self._conn.execute("BEGIN")
+            try:
+                rows = self._conn.execute("SELECT data FROM memories ORDER BY seq").fetchall()
+                change_version = self._conn.execute("SELECT MAX(version) FROM changes").fetchone()[0]
+            finally:
+                self._conn.execute("COMMIT")
+
+            self._index.clear()
+            self._by_type.clear()
+            self._sizes.clear()
+            self._type_bytes.clear()
+            for (data,) in rows:
+                self._append_to_view(json.loads(data))
+            self._data_version = data_version
+            self._change_version = change_version or 0
+
+    def _reload(self):
+        """Write pending changes and reload the whole view"""
+        # The lock is held from taking the pending writes until the reload is
+        # done, so a memory added meanwhile by another thread cannot be wiped
+        # from the view
+        with self._flush_lock, self._lock:
+            operations = self._pending
+            self._pending = []
+            try:
+                self._write_operations(operations)
+            except Exception:
+                self._pending = operations + self._pending
+                raise
+            self._load_memories()
+
+    def _sync_with_other_processes(self):
+        """Bring the view up to date if another process has committed since the last sync"""
+        with self._db_lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+
+        with self._lock:
+            if self._apply_changes():
+                self._data_version = data_version
+                return
+        self._reload()
+
+    def _apply_changes(self) -> bool:
+        """
+        Apply the changes other processes logged since the last sync; must be called with the lock held
+
+        Returns:
+            bool: False if the view has to be reloaded in full instead
+        """
+        with self._db_lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute("SELECT value FROM meta WHERE name = 'changes_pruned'").fetchone()
+                if row and self._change_version < row[0]:
+                    return False
+
+                changes = self._conn.execute(
+                    "SELECT kind, memory_id FROM changes "
+                    "WHERE version > ? AND (writer IS NULL OR writer != ?) ORDER BY version",
+                    (self._change_version, self._writer)
+                ).fetchall()
+                if any(kind in ("clear", "reload") for kind, _ in changes):
+                    return False
+
+                changed_ids = list({memory_id for kind, memory_id in changes if kind in ("insert", "update")})
+                rows = {}
+                for start in range(0, len(changed_ids), 500):
+                    batch = changed_ids[start:start + 500]
+                    rows.update(self._conn.execute(
+                        f"SELECT memory_id, data FROM memories WHERE memory_id IN ({','.join('?' * len(batch))})",
+                        batch
+                    ))
+                change_version = self._conn.execute("SELECT MAX(version) FROM changes").fetchone()[0]
+            finally:
+                self._conn.execute("COMMIT")
+
+        # Updates this process has not written yet overwrite the other process's on flush
+        pending_updates = {
+            operation[1] for operation in itertools.chain(self._writing, self._pending) if operation[0] == "update"
+        }
+        for kind, memory_id in changes:
+            memory = self._index.get(memory_id)
+            if kind == "insert" and memory is None and memory_id in rows:
+                self._append_to_view(json.loads(rows[memory_id]))
+            elif kind == "update" and memory is not None and memory_id in rows and memory_id not in pending_updates:
+                self._replace_in_view(memory, json.loads(rows[memory_id]))
+            elif kind == "delete" and memory is not None:
+                self._remove_from_view(memory_id)
+
+        self._change_version = change_version or 0
+        return True
+
+    def _append_to_view(self, memory: Dict[str, Any]):
+        self._index[memory["id"]] = memory
+        self._by_type.setdefault(memory["type"], deque()).append(memory)
+        self._track_size(memory)
+
+    def _track_size(self, memory: Dict[str, Any]):
+        """Record the serialized size of a memory for byte-based retention"""
+        size = len(json.dumps(memory))
+        previous = self._sizes.get(memory["id"], 0)
+        self._sizes[memory["id"]] = size
+        self._type_bytes[memory["type"]] = self._type_bytes.get(memory["type"], 0) + size - previous
+
+    def _remove_from_view(self, memory_id: int):
+        memory = self._index.pop(memory_id)
+        memories = self._by_type[memory["type"]]
+        if memories[0] is memory:
+            memories.popleft()
+        else:
+            memories.remove(memory)
+        self._type_bytes[memory["type"]] -= self._sizes.pop(memory_id, 0)
+
+    def _replace_in_view(self, memory: Dict[str, Any], updated: Dict[str, Any]):
+        if memory["type"] != updated["type"]:
+            self._remove_from_view(memory["id"])
+            self._append_to_view(updated)
+            return
+        memory.clear()
+        memory.update(updated)
+        self._track_size(memory)
+
+    def _remove_oldest_of_type(self, memory_type: str) -> Dict[str, Any]:
+        oldest = self._by_type[memory_type].popleft()
+        del self._index[oldest["id"]]
+        self._type_bytes[memory_type] -= self._sizes.pop(oldest["id"], 0)
+        return oldest
+
+    def _get_retention(self, memory_type: str) -> Dict[str, Any]:
+        policy = self.retention.get(memory_type)
+        if policy is None:
+            return {"max_items": self.max_items, "max_age_days": None, "max_bytes": None, "archive": False}
+        return policy
+
+    def _enforce_retention(self, memory_type: str):
+        """
+        Evict the oldest memories of a type until its retention policy holds
+
+        Only the type that just changed is checked, and each check looks at
+        the oldest entry only, so the cost is proportional to what is evicted.
+        Must be called with the lock held.
+        """
+        policy = self._get_retention(memory_type)
+        memories = self._by_type.get(memory_type)
+        if not memories:
+            return
+
+        max_age_days = policy.get("max_age_days")
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat() if max_age_days else None
+
+        evicted = []
+        while memories and self._exceeds_retention(memory_type, policy, cutoff):
+            evicted.append(self._remove_oldest_of_type(memory_type))
+
+        if evicted:
+            if policy.get("archive"):
+                self._queue(("archive", evicted))
+            self._queue(("delete", [memory["id"] for memory in evicted]))
+            self.logger.info(f"Retention evicted {len(evicted)} memories of type: {memory_type}")
+
+    def _exceeds_retention(self, memory_type: str, policy: Dict[str, Any], cutoff: Optional[str]) -> bool:
+        """Check whether a type's oldest memory has to go under its retention policy"""
+        memories = self._by_type[memory_type]
+        if policy.get("max_items") is not None and len(memories) > policy["max_items"]:
+            return True
+        # Always keep the newest memory, however large it is
+        if policy.get("max_bytes") is not None and len(memories) > 1 \
+                and self._type_bytes.get(memory_type, 0) > policy["max_bytes"]:
+            return True
+        return cutoff is not None and memories[0]["timestamp"] < cutoff
+
+    def _write_archive(self, memories: List[Dict[str, Any]]):
+        """Append evicted memories to the gzip-compressed cold files, one per type and month"""
+        self.archive_directory.mkdir(parents=True, exist_ok=True)
+        by_file: Dict[Path, List[Dict[str, Any]]] = {}
+        for memory in memories:
+            archive_file = self.archive_directory / f"{memory['type']}-{memory['timestamp'][:7]}.jsonl.gz"
+            by_file.setdefault(archive_file, []).append(memory)
+
+        for archive_file, file_memories in by_file.items():
+            with gzip.open(archive_file, "at", encoding="utf-8") as f:
+                for memory in file_memories:
+                    f.write(json.dumps(memory) + "\n")
+
+    def _insert_rows(self, memories: List[Dict[str, Any]]):
+        """Insert memories inside the current transaction"""
+        self._conn.executemany(
+            "INSERT INTO memories (memory_id, type, timestamp, rpp_id, data) VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    memory.get("id"),
+                    memory["type"],
+                    memory["timestamp"],
+                    (memory.get("metadata") or {}).get("rpp_id"),
+                    json.dumps(memory)
+                )
+                for memory in memories
+            ]
+        )
+
+    def _log_changes(self, kind: str, changes: List[Tuple[Optional[int], Optional[str]]],
+                     writer: Optional[str] = ""):
+        """
+        Record changes in the change log inside the current transaction
+
+        Args:
+            kind (str): "insert", "update", "delete", "clear" or "reload"
+            changes (List[Tuple[int, str]]): Memory ID and type of each change
+            writer (str, optional): Store that made the change, defaults to this one;
+                None for changes every store has to apply, its own included
+        """
+        if writer == "":
+            writer = self._writer
+        self._conn.executemany(
+            "INSERT INTO changes (writer, kind, memory_id, type) VALUES (?, ?, ?, ?)",
+            [(writer, kind, memory_id, memory_type) for memory_id, memory_type in changes]
+        )
+
+    def _prune_changes(self):
+        """Keep the newest change_log_size change log entries, inside the current transaction"""
+        last_version = self._conn.execute("SELECT MAX(version) FROM changes").fetchone()[0]
+        if last_version is None or last_version <= self.change_log_size:
+            return
+        cutoff = last_version - self.change_log_size
+        if self._conn.execute("DELETE FROM changes WHERE version <= ?", (cutoff,)).rowcount:
+            # Stores that have not read up to here have to reload in full
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('changes_pruned', ?)", (cutoff,)
+            )
+
+    def _existing_ids(self, memory_ids: List[int]) -> Set[int]:
+        """IDs among memory_ids that are still stored, inside the current transaction"""
+        existing = set()
+        for start in range(0, len(memory_ids), 500):
+            batch = memory_ids[start:start + 500]
+            existing.update(row[0] for row in self._conn.execute(
+                f"SELECT memory_id FROM memories WHERE memory_id IN ({','.join('?' * len(batch))})", batch
+            ))
+        return existing
+
+    def _enforce_stored_item_limits(self, memory_types: Set[str]) -> bool:
+        """
+        Evict stored memories over their type's item limit, inside the current transaction
+
+        Each process enforces retention on its own view, which does not yet
+        include memories other processes have queued, so the stored rows are
+        checked again when the inserts are written.
+
+        Returns:
+            bool: Whether anything was evicted
+        """
+        evicted = False
+        for memory_type in memory_types:
+            policy = self._get_retention(memory_type)
+            if policy.get("max_items") is None:
+                continue
+            rows = self._conn.execute(
+                "SELECT memory_id, data FROM memories WHERE type = ? ORDER BY seq DESC LIMIT -1 OFFSET ?",
+                (memory_type, policy["max_items"])
+            ).fetchall()
+            if not rows:
+                continue
+            if policy.get("archive"):
+                self._write_archive([json.loads(data) for _, data in reversed(rows)])
+            self._conn.executemany("DELETE FROM memories WHERE memory_id = ?", [(row[0],) for row in rows])
+            # No process's view knows about these evictions yet, this one's included
+            self._log_changes("delete", [(row[0], memory_type) for row in rows], writer=None)
+            evicted = True
+        return evicted
+
+    def _apply_pending(self, operations: List[Tuple[Any, ...]]) -> bool:
+        """
+        Apply queued writes inside the current transaction
+
+        Returns:
+            bool: Whether stored memories missing from the view's retention were evicted
+        """
+        inserted_types = set()
+        for operation in operations:
+            kind = operation[0]
+            if kind == "insert":
+                self._insert_rows([operation[1]])
+                self._log_changes("insert", [(operation[1]["id"], operation[1]["type"])])
+                inserted_types.add(operation[1]["type"])
+            elif kind == "archive":
+                # Written while holding the write lock, before the rows are deleted,
+                # so a crash can duplicate archived records but never lose them.
+                # Memories another process already evicted are not archived again
+                existing = self._existing_ids([memory["id"] for memory in operation[1]])
+                self._write_archive([memory for memory in operation[1] if memory["id"] in existing])
+            elif kind == "delete":
+                self._conn.executemany(
+                    "DELETE FROM memories WHERE memory_id = ?", [(memory_id,) for memory_id in operation[1]]
+                )
+                self._log_changes("delete", [(memory_id, None) for memory_id in operation[1]])
+            elif kind == "update":
+                memory = operation[2]
+                self._conn.execute(
+                    "UPDATE memories SET type = ?, rpp_id = ?, data = ? WHERE memory_id = ?",
+                    (
+                        memory["type"],
+                        (memory.get("metadata") or {}).get("rpp_id"),
+                        json.dumps(memory),
+                        operation[1]
+                    )
+                )
+                self._log_changes("update", [(operation[1], memory["type"])])
+            elif kind == "clear":
+                if operation[1]:
+                    self._conn.execute("DELETE FROM memories WHERE type = ?", (operation[1],))
+                else:
+                    self._conn.execute("DELETE FROM memories")
+                self._log_changes("clear", [(None, operation[1])])
+
+        evicted = self._enforce_stored_item_limits(inserted_types)
+        self._prune_changes()
+        return evicted
+
+    def _queue(self, operation: Tuple[Any, ...]):
+        """Queue a write; must be called with the lock held"""
+        self._pending.append(operation)
+        if len(self._pending) >= self.flush_batch_size:
+            self._flush_requested.set()
+
+    def _flush_loop(self):
+        """Flush pending writes periodically until the store is closed"""
+        while not self._closed:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Already logged by flush; the writes stay queued for the next attempt
+                pass
+
+    def _flush_pending(self):
+        """Write pending changes in one transaction; must be called with the flush lock held"""
+        with self._lock:
+            operations = self._pending
+            self._pending = []
+            self._writing = operations
+
+        try:
+            evicted = self._write_operations(operations)
+        except Exception:
+            with self._lock:
+                self._pending = operations + self._pending
+                self._writing = []
             raise
 
-    def _save_memories(self, data: Dict[str, List[Dict[str, Any]]]):
-        """Save memories to file"""
+        with self._lock:
+            self._writing = []
+            if evicted:
+                # The view still holds the evicted memories; catch up on the next read
+                self._data_version = None
+
+    def _write_operations(self, operations: List[Tuple[Any, ...]]) -> bool:
+        """
+        Write queued operations in one transaction
+
+        Returns:
+            bool: Whether stored memories missing from the view's retention were evicted
+        """
+        if not operations:
+            return False
+
         try:
-            with open(self.memory_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            with self._transaction():
+                return self._apply_pending(operations)
         except Exception as e:
-            self.logger.error(f"Error saving memories: {str(e)}")
+            self.logger.error(f"Error flushing memories: {str(e)}")
             raise
 
-    def add_memory(self, memory_type: str, content: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None):
+    def flush(self):
+        """Write all pending changes to disk in a single transaction"""
+        with self._flush_lock:
+            self._flush_pending()
+
+    def close(self):
+        """Flush pending changes and stop the background flusher"""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush_requested.set()
+        self.flush()
+
+    def add_memory(self, memory_type: str, content: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> int:
         """
         Add a new memory
 
@@ -52,27 +608,35 @@ class MemoryStoreManager:
             memory_type (str): Type of memory (e.g., 'feedback', 'interaction')
             content (Dict[str, Any]): Memory content
             metadata (Dict[str, Any], optional): Additional metadata
+
+        Returns:
+            int: ID of the new memory
         """
         try:
-            data = self._load_memories()
+            # Enforce retention against what other processes have stored too
+            self._sync_with_other_processes()
+            with self._lock:
+                if self._next_id >= self._id_limit:
+                    self._reserve_ids()
 
-            # Create new memory entry
-            memory = {
-                "type": memory_type,
-                "content": content,
-                "metadata": metadata or {},
-                "timestamp": datetime.now().isoformat()
-            }
+                # Create new memory entry
+                memory = {
+                    "id": self._next_id,
+                    "type": memory_type,
+                    "content": content,
+                    "metadata": metadata or {},
+                    "timestamp": datetime.now().isoformat()
+                }
+                self._next_id += 1
 
-            # Add to memories list
-            data["memories"].append(memory)
+                self._append_to_view(memory)
+                self._queue(("insert", memory))
 
-            # Trim if exceeding max items
-            if len(data["memories"]) > self.max_items:
-                data["memories"] = data["memories"][-self.max_items:]
+                # Apply this type's retention policy
+                self._enforce_retention(memory_type)
 
-            self._save_memories(data)
             self.logger.info(f"Successfully added new memory of type: {memory_type}")
+            return memory["id"]
         except Exception as e:
             self.logger.error(f"Error adding memory: {str(e)}")
             raise
@@ -89,41 +653,104 @@ class MemoryStoreManager:
             List[Dict[str, Any]]: List of memories
         """
         try:
-            data = self._load_memories()
-            memories = data["memories"]
+            self._sync_with_other_processes()
+            with self._lock:
+                # Filter by type if specified
+                memories = self._by_type.get(memory_type, deque()) if memory_type else self._index.values()
+
+                # Apply limit if specified, keeping the most recent memories
+                if limit:
+                    selected = list(itertools.islice(reversed(memories), limit))
+                    selected.reverse()
+                else:
+                    selected = list(memories)
+
+                return [dict(memory) for memory in selected]
+        except Exception as e:
+            self.logger.error(f"Error getting memories: {str(e)}")
+            raise
+
+    def get_memory_ids(self, memory_type: str) -> List[int]:
+        """
+        Get the IDs of the memories of a type
+
+        Args:
+            memory_type (str): Memory type
+
+        Returns:
+            List[int]: Memory IDs, oldest first
+        """
+        self._sync_with_other_processes()
+        with self._lock:
+            return [memory["id"] for memory in self._by_type.get(memory_type, ())]
+
+    def get_memory_counts(self) -> Dict[str, int]:
+        """
+        Get the number of memories of each type
+
+        Returns:
+            Dict[str, int]: Memory count per type
+        """
+        self._sync_with_other_processes()
+        with self._lock:
+            return {memory_type: len(memories) for memory_type, memories in self._by_type.items()}
 
-            # Filter by type if specified
-            if memory_type:
-                memories = [m for m in memories if m["type"] == memory_type]
+    def get_archived_memories(self, memory_type: str) -> List[Dict[str, Any]]:
+        """
+        Read memories of a type that retention moved to the cold archive
 
-            # Apply limit if specified
-            if limit:
-                memories = memories[-limit:]
+        Args:
+            memory_type (str): Memory type
 
+        Returns:
+            List[Dict[str, Any]]: Archived memories, oldest first
+        """
+        try:
+            memories = []
+            for archive_file in sorted(self.archive_directory.glob(f"{memory_type}-*.jsonl.gz")):
+                with gzip.open(archive_file, "rt", encoding="utf-8") as f:
+                    memories.extend(json.loads(line) for line in f if line.strip())
             return memories
         except Exception as e:
-            self.logger.error(f"Error getting memories: {str(e)}")
+            self.logger.error(f"Error reading archived memories: {str(e)}")
             raise
 
-    def update_memory(self, memory_id: str, updates: Dict[str, Any]):
+    def get_memory(self, memory_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a single memory by ID
+
+        Args:
+            memory_id (int): ID of the memory
+
+        Returns:
+            Optional[Dict[str, Any]]: The memory, or None if it does not exist
+        """
+        self._sync_with_other_processes()
+        with self._lock:
+            memory = self._index.get(memory_id)
+            return dict(memory) if memory is not None else None
+
+    def update_memory(self, memory_id: int, updates: Dict[str, Any]):
         """
         Update an existing memory
 
         Args:
-            memory_id (str): ID of memory to update
+            memory_id (int): ID of memory to update
             updates (Dict[str, Any]): Updates to apply
         """
         try:
-            data = self._load_memories()
-
-            # Find and update memory
-            for memory in data["memories"]:
-                if memory.get("id") == memory_id:
+            self._sync_with_other_processes()
+            with self._lock:
+                # Find and update memory
+                memory = self._index.get(memory_id)
+                if memory is not None:
                     memory.update(updates)
+                    memory["id"] = memory_id
                     memory["last_updated"] = datetime.now().isoformat()
-                    break
+                    self._track_size(memory)
+                    self._queue(("update", memory_id, memory))
+                    self._enforce_retention(memory["type"])
 
-            self._save_memories(data)
             self.logger.info(f"Successfully updated memory: {memory_id}")
         except Exception as e:
             self.logger.error(f"Error updating memory: {str(e)}")
@@ -137,14 +764,19 @@ class MemoryStoreManager:
             memory_type (str, optional): Clear only memories of this type
         """
         try:
-            data = self._load_memories()
-
-            if memory_type:
-                data["memories"] = [m for m in data["memories"] if m["type"] != memory_type]
-            else:
-                data["memories"] = []
+            with self._lock:
+                if memory_type:
+                    for memory in self._by_type.pop(memory_type, ()):
+                        del self._index[memory["id"]]
+                        self._sizes.pop(memory["id"], None)
+                    self._type_bytes.pop(memory_type, None)
+                else:
+                    self._index.clear()
+                    self._by_type.clear()
+                    self._sizes.clear()
+                    self._type_bytes.clear()
+                self._queue(("clear", memory_type))
 
-            self._save_memories(data)
             self.logger.info(f"Successfully cleared memories" +
                            (f" of type: {memory_type}" if memory_type else ""))
         except Exception as e:
@@ -0,0 +1,284 @@
+from typing import Dict, Any, List, Optional
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Rows fetched per SQL statement, below SQLite's bound-parameter limit
+_SQL_BATCH = 500
+
+
+class EmbeddingCache:
+    """
+    Content-addressed, size-bounded on-disk cache of embedding vectors
+
+    Vectors are stored as float32 rows in a memory-mapped file. A SQLite
+    index maps each key to its row and tracks last use for LRU eviction;
+    rows freed by eviction are reused for new entries.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 200000):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        self.vectors_path = self.directory / "vectors.f32"
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self._initialize_cache()
+
+    def _initialize_cache(self):
+        """Open the SQLite index, creating the cache directory if needed"""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.directory / "index.sqlite3"),
+                timeout=30,
+                check_same_thread=False,
+                isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    slot INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used);
+                CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY);
+                CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            """)
+            self.logger.info(f"Embedding cache initialized at {self.directory}")
+        except Exception as e:
+            self.logger.error(f"Error initializing embedding cache: {str(e)}")
+            raise
+
+    def _get_meta(self, name: str) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value: int):
+        self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+    def _open_vectors(self, dim: int, min_rows: int = 0) -> np.memmap:
+        """Map the vector file, growing it to hold at least min_rows rows"""
+        row_bytes = dim * 4
+        size = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        rows = size // row_bytes
+
+        if rows < min_rows:
+            rows = min(max(min_rows, rows * 2, 1024), max(self.max_entries, min_rows))
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(rows * row_bytes)
+
+        if self._vectors is None or self._vectors.shape[0] != rows:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(rows, dim))
+        return self._vectors
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached vectors
+
+        Args:
+            keys (List[str]): Cache keys
+
+        Returns:
+            Dict[str, np.ndarray]: Vectors for the keys that were cached
+        """
+        found = {}
+        if not keys:
+            return found
+
+        with self._lock:
+            try:
+                # Look up and read slots holding SQLite's write lock, like put_many,
+                # so another process cannot evict and reuse a slot in between
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    dim = self._get_meta("dim")
+                    slots = {}
+                    if dim is not None:
+                        unique_keys = list(dict.fromkeys(keys))
+                        for i in range(0, len(unique_keys), _SQL_BATCH):
+                            batch = unique_keys[i:i + _SQL_BATCH]
+                            placeholders = ",".join("?" * len(batch))
+                            rows = self._conn.execute(
+                                f"SELECT key, slot FROM entries WHERE key IN ({placeholders})", batch
+                            ).fetchall()
+                            slots.update(rows)
+
+                    if slots:
+                        # Remaps if another process has grown the file since we mapped it
+                        vectors = self._open_vectors(dim)
+
+                        for key, slot in slots.items():
+                            found[key] = np.array(vectors[slot])
+
+                        now = time.time()
+                        self._conn.executemany(
+                            "UPDATE entries SET last_used = ? WHERE key = ?",
+                            [(now, key) for key in slots]
+                        )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+
+                hit_count = sum(1 for key in keys if key in found)
+                self.hits += hit_count
+                self.misses += len(keys) - hit_count
+                return found
+            except Exception as e:
+                self.logger.error(f"Error reading embedding cache: {str(e)}")
+                return {}
+
+    def put_many(self, items: Dict[str, List[float]]):
+        """
+        Store vectors, evicting least recently used entries when full
+
+        Args:
+            items (Dict[str, List[float]]): Vectors keyed by cache key
+        """
+        if not items or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    first_vector = next(iter(items.values()))
+                    dim = self._get_meta("dim")
+                    if dim is None:
+                        dim = len(first_vector)
+                        self._set_meta("dim", dim)
+
+                    # Skip keys another writer already stored
+                    new_keys = []
+                    for key in items:
+                        if self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is None:
+                            new_keys.append(key)
+                    new_keys = new_keys[:self.max_entries]
+                    if not new_keys:
+                        self._conn.execute("COMMIT")
+                        return
+
+                    # Evict least recently used entries to make room
+                    count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                    overflow = count + len(new_keys) - self.max_entries
+                    if overflow > 0:
+                        evicted = self._conn.execute(
+                            "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?", (overflow,)
+                        ).fetchall()
+                        self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in evicted])
+                        self._conn.executemany("INSERT INTO free_slots (slot) VALUES (?)", [(slot,) for _, slot in evicted])
+                        self.evictions += len(evicted)
+
+                    # Reuse freed rows first, then append new ones
+                    free = [row[0] for row in self._conn.execute(
+                        "SELECT slot FROM free_slots ORDER BY slot LIMIT ?", (len(new_keys),)
+                    ).fetchall()]
+                    self._conn.executemany("DELETE FROM free_slots WHERE slot = ?", [(slot,) for slot in free])
+                    next_slot = self._get_meta("next_slot") or 0
+                    appended = len(new_keys) - len(free)
+                    slots = free + list(range(next_slot, next_slot + appended))
+                    self._set_meta("next_slot", next_slot + appended)
+
+                    vectors = self._open_vectors(dim, min_rows=next_slot + appended)
+                    for key, slot in zip(new_keys, slots):
+                        vectors[slot] = np.asarray(items[key], dtype=np.float32)
+                    vectors.flush()
+
+                    now = time.time()
+                    self._conn.executemany(
+                        "INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                        [(key, slot, now) for key, slot in zip(new_keys, slots)]
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            except Exception as e:
+                self.logger.error(f"Error writing embedding cache: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict[str, Any]: Entry count, hits, misses and evictions
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size_bytes": self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that consults an EmbeddingCache before embedding"""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, namespace: str):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.namespace = namespace
+
+    def _make_key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _embed_cached(self, kind: str, texts: List[str], embed_fn) -> List[List[float]]:
+        keys = [self._make_key(kind, text) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        # Embed each missing text once, even if it appears several times
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            computed = dict(zip(missing.keys(), embed_fn(list(missing.values()))))
+            self.cache.put_many(computed)
+        else:
+            computed = {}
+
+        return [
+            computed[key] if key in computed else cached[key].tolist()
+            for key in keys
+        ]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed_cached("document", texts, self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_cached("query", [text], lambda texts: [self.embeddings.embed_query(texts[0])])[0]
+
+
+def get_cache_directory(base_directory: str, namespace: str) -> str:
+    """
+    Get the cache directory for one embedding model configuration
+
+    Args:
+        base_directory (str): Root directory of the embedding cache
+        namespace (str): Model name and encode settings
+
+    Returns:
+        str: Directory holding that configuration's vectors and index
+    """
+    return os.path.join(base_directory, hashlib.sha1(namespace.encode("utf-8")).hexdigest()[:12])
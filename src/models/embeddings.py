@@ -0,0 +1,112 @@
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple, Union
+import logging
+import threading
+import time
+
+from ..config.config import MODEL_CONFIG, EMBEDDING_CACHE_CONFIG
+from ..utils.system import get_rss_mb
+
+# langchain and torch are imported on first load, not at startup
+if TYPE_CHECKING:
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    from .embedding_cache import CachedEmbeddings, EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+# Process-wide registry of loaded embedding models, keyed by (model_name, device)
+_embeddings: Dict[Tuple[str, str], Union["HuggingFaceEmbeddings", "CachedEmbeddings"]] = {}
+_caches: Dict[Tuple[str, str], "EmbeddingCache"] = {}
+_load_stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def get_embeddings(model_name: Optional[str] = None,
+                   device: Optional[str] = None) -> Union["HuggingFaceEmbeddings", "CachedEmbeddings"]:
+    """
+    Get the shared embedding model, loading it on first use
+
+    When the embedding cache is enabled the model is wrapped so that every
+    embedding call is served from the on-disk cache where possible.
+
+    Args:
+        model_name (str, optional): Sentence-transformers model name
+        device (str, optional): Torch device to load the model on
+
+    Returns:
+        Union[HuggingFaceEmbeddings, CachedEmbeddings]: Shared embedding model instance
+    """
+    model_name = model_name or MODEL_CONFIG["embedding_model"]
+    device = device or MODEL_CONFIG["embedding_device"]
+    key = (model_name, device)
+
+    embeddings = _embeddings.get(key)
+    if embeddings is not None:
+        return embeddings
+
+    with _lock:
+        # Another thread may have loaded the model while we waited
+        if key in _embeddings:
+            return _embeddings[key]
+
+        try:
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+            from .embedding_cache import CachedEmbeddings, EmbeddingCache, get_cache_directory
+
+            rss_before = get_rss_mb()
+            start = time.perf_counter()
+
+            embeddings = HuggingFaceEmbeddings(
+                model_name=model_name,
+                model_kwargs={"device": device},
+                encode_kwargs={
+                    "batch_size": MODEL_CONFIG["embedding_batch_size"],
+                    "normalize_embeddings": MODEL_CONFIG["normalize_embeddings"]
+                }
+            )
+
+            load_time = time.perf_counter() - start
+            rss_after = get_rss_mb()
+
+            if EMBEDDING_CACHE_CONFIG["enabled"]:
+                # Vectors depend on the model and on normalization, not on the device
+                namespace = f"{model_name}|normalize={MODEL_CONFIG['normalize_embeddings']}"
+                cache = EmbeddingCache(
+                    get_cache_directory(EMBEDDING_CACHE_CONFIG["directory"], namespace),
+                    max_entries=EMBEDDING_CACHE_CONFIG["max_entries"]
+                )
+                _caches[key] = cache
+                embeddings = CachedEmbeddings(embeddings, cache, namespace)
+
+            _embeddings[key] = embeddings
+            _load_stats[key] = {
+                "model_name": model_name,
+                "device": device,
+                "load_time": load_time,
+                "rss_before_mb": rss_before,
+                "rss_after_mb": rss_after,
+                "rss_delta_mb": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None
+            }
+
+            logger.info(
+                f"Loaded embedding model {model_name} on {device} in {load_time:.2f}s "
+                f"(RSS: {rss_after if rss_after is not None else 'n/a'} MB)"
+            )
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error loading embedding model {model_name}: {str(e)}")
+            raise
+
+
+def get_embedding_stats() -> Dict[str, Any]:
+    """
+    Get statistics about the embedding models loaded in this process
+
+    Returns:
+        Dict[str, Any]: Loaded model count, per-model load stats and current RSS
+    """
+    return {
+        "loaded_models": len(_embeddings),
+        "models": list(_load_stats.values()),
+        "caches": {f"{name} ({device})": cache.get_stats() for (name, device), cache in _caches.items()},
+        "rss_mb": get_rss_mb()
+    }
@@ -0,0 +1,299 @@
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from collections import Counter
+import json
+import logging
+import math
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+# Function words that carry no retrieval signal in Indonesian curriculum text
+INDONESIAN_STOPWORDS = {
+    "yang", "dan", "di", "ke", "dari", "untuk", "dengan", "pada", "dalam", "ini", "itu",
+    "atau", "adalah", "akan", "juga", "tidak", "ada", "oleh", "sebagai", "secara", "agar",
+    "dapat", "bisa", "serta", "karena", "jika", "maka", "bahwa", "saat", "setelah", "sebelum",
+    "antara", "tersebut", "para", "suatu", "sebuah", "lebih", "sudah", "telah", "masih", "hanya",
+    "per", "pun", "lagi", "kami", "kita", "mereka", "anda", "ia", "dia", "nya", "buatkan",
+    "the", "of", "and", "to", "in", "for", "a", "an", "is"
+}
+
+# Kompetensi Dasar codes such as 3.1 or 4.10.2 stay one token; everything else
+# splits on non-alphanumerics, so roman numerals like XII survive as "xii"
+TOKEN_PATTERN = re.compile(r"\d+(?:\.\d+)+|[0-9a-z]+")
+
+# Particles and possessive suffixes that are glued onto Indonesian words
+PARTICLE_SUFFIXES = ("nya", "lah", "kah", "pun")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split Indonesian text into index terms
+
+    Text is lowercased, stopwords are dropped and enclitic particles
+    (-nya, -lah, -kah, -pun) are stripped from longer words so that
+    "pembelajarannya" and "pembelajaran" match.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        List[str]: Index terms, in text order
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in INDONESIAN_STOPWORDS:
+            continue
+        for suffix in PARTICLE_SUFFIXES:
+            if len(token) > len(suffix) + 4 and token.endswith(suffix):
+                token = token[:-len(suffix)]
+                break
+        terms.append(token)
+    return terms
+
+
+class LexicalIndex:
+    """
+    Persistent BM25 inverted index over vector store chunks
+
+    Each chunk's term counts are stored as one SQLite row next to the Chroma
+    collection and inverted into in-memory posting lists on first use, so a
+    query only touches the posting lists of its own terms. Chunks can carry
+    filter fields (subject, grade, source), kept as in-memory partitions so
+    a filtered query only scores chunks inside the partition.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._fields: Dict[str, Dict[str, str]] = {}
+        self._partitions: Dict[Tuple[str, str], Set[str]] = {}
+
+    def _ensure_loaded(self):
+        """Open the index database and load the postings, once"""
+        if self._conn is not None:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    chunk_id TEXT PRIMARY KEY,
+                    term_counts TEXT NOT NULL,
+                    fields TEXT
+                );
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(chunks)")}
+            if "fields" not in columns:
+                conn.execute("ALTER TABLE chunks ADD COLUMN fields TEXT")
+
+            for chunk_id, term_counts, fields in conn.execute("SELECT chunk_id, term_counts, fields FROM chunks"):
+                self._add_to_memory(chunk_id, json.loads(term_counts))
+                self._set_fields(chunk_id, json.loads(fields) if fields else {})
+
+            self._conn = conn
+            self.logger.info(f"Lexical index loaded with {len(self._lengths)} chunks and {len(self._postings)} terms")
+        except Exception as e:
+            self.logger.error(f"Error loading lexical index: {str(e)}")
+            raise
+
+    def _add_to_memory(self, chunk_id: str, term_counts: Dict[str, int]):
+        for term, tf in term_counts.items():
+            self._postings.setdefault(term, {})[chunk_id] = tf
+        length = sum(term_counts.values())
+        self._lengths[chunk_id] = length
+        self._total_length += length
+
+    def _set_fields(self, chunk_id: str, fields: Dict[str, str]):
+        for item in self._fields.pop(chunk_id, {}).items():
+            partition = self._partitions.get(item)
+            if partition is not None:
+                partition.discard(chunk_id)
+                if not partition:
+                    del self._partitions[item]
+        if fields:
+            self._fields[chunk_id] = dict(fields)
+            for item in fields.items():
+                self._partitions.setdefault(item, set()).add(chunk_id)
+
+    def _remove_from_memory(self, chunk_id: str, terms: Iterable[str]):
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(chunk_id, 0)
+        self._set_fields(chunk_id, {})
+
+    def add(self, chunk_ids: List[str], texts: List[str], fields: Optional[List[Dict[str, str]]] = None):
+        """
+        Index chunks, replacing any chunks already indexed under the same IDs
+
+        Args:
+            chunk_ids (List[str]): Chunk IDs, as used in the vector store
+            texts (List[str]): Text of each chunk
+            fields (List[Dict[str, str]], optional): Filter fields of each chunk
+        """
+        with self._lock:
+            self._ensure_loaded()
+            try:
+                existing = [chunk_id for chunk_id in chunk_ids if chunk_id in self._lengths]
+                if existing:
+                    self.delete(existing)
+
+                fields = fields or [{} for _ in chunk_ids]
+                rows = []
+                for chunk_id, text, chunk_fields in zip(chunk_ids, texts, fields):
+                    term_counts = dict(Counter(tokenize(text)))
+                    self._add_to_memory(chunk_id, term_counts)
+                    self._set_fields(chunk_id, chunk_fields)
+                    rows.append((chunk_id, json.dumps(term_counts), json.dumps(chunk_fields)))
+
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO chunks (chunk_id, term_counts, fields) VALUES (?, ?, ?)", rows
+                    )
+            except Exception as e:
+                self.logger.error(f"Error adding chunks to lexical index: {str(e)}")
+                raise
+
+    def delete(self, chunk_ids: List[str]):
+        """
+        Remove chunks from the index
+
+        Args:
+            chunk_ids (List[str]): IDs of the chunks to remove
+        """
+        with self._lock:
+            self._ensure_loaded()
+            try:
+                chunk_ids = [chunk_id for chunk_id in chunk_ids if chunk_id in self._lengths]
+                if not chunk_ids:
+                    return
+
+                with self._conn:
+                    for chunk_id in chunk_ids:
+                        row = self._conn.execute(
+                            "SELECT term_counts FROM chunks WHERE chunk_id = ?", (chunk_id,)).fetchone()
+                        self._remove_from_memory(chunk_id, json.loads(row[0]) if row else [])
+                    self._conn.executemany("DELETE FROM chunks WHERE chunk_id = ?", [(c,) for c in chunk_ids])
+            except Exception as e:
+                self.logger.error(f"Error deleting chunks from lexical index: {str(e)}")
+                raise
+
+    def update_fields(self, chunk_ids: List[str], fields: List[Dict[str, str]]):
+        """
+        Replace the filter fields of indexed chunks
+
+        Args:
+            chunk_ids (List[str]): IDs of the chunks to update
+            fields (List[Dict[str, str]]): New filter fields of each chunk
+        """
+        with self._lock:
+            self._ensure_loaded()
+            try:
+                rows = []
+                for chunk_id, chunk_fields in zip(chunk_ids, fields):
+                    if chunk_id in self._lengths:
+                        self._set_fields(chunk_id, chunk_fields)
+                        rows.append((json.dumps(chunk_fields), chunk_id))
+
+                with self._conn:
+                    self._conn.executemany("UPDATE chunks SET fields = ? WHERE chunk_id = ?", rows)
+            except Exception as e:
+                self.logger.error(f"Error updating lexical index fields: {str(e)}")
+                raise
+
+    def clear(self):
+        """Remove every chunk from the index"""
+        with self._lock:
+            self._ensure_loaded()
+            try:
+                with self._conn:
+                    self._conn.execute("DELETE FROM chunks")
+                self._postings = {}
+                self._lengths = {}
+                self._total_length = 0
+                self._fields = {}
+                self._partitions = {}
+            except Exception as e:
+                self.logger.error(f"Error clearing lexical index: {str(e)}")
+                raise
+
+    def _partition(self, filter: Dict[str, str]) -> Set[str]:
+        """IDs of the chunks matching every filter field"""
+        partitions = sorted((self._partitions.get(item, set()) for item in filter.items()), key=len)
+        return set.intersection(*partitions) if partitions else set()
+
+    def search(self, query: str, k: int = 10, filter: Optional[Dict[str, str]] = None) -> List[Tuple[str, float]]:
+        """
+        Rank chunks against a query with BM25
+
+        Args:
+            query (str): Search query
+            k (int): Number of results to return
+            filter (Dict[str, str], optional): Only rank chunks whose fields match all of these
+
+        Returns:
+            List[Tuple[str, float]]: Chunk IDs and BM25 scores, best first
+        """
+        with self._lock:
+            self._ensure_loaded()
+            chunk_count = len(self._lengths)
+            if not chunk_count:
+                return []
+
+            allowed = self._partition(filter) if filter else None
+            if allowed is not None and not allowed:
+                return []
+
+            average_length = self._total_length / chunk_count
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (chunk_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                if allowed is None:
+                    matches = postings.items()
+                elif len(allowed) < len(postings):
+                    matches = [(chunk_id, postings[chunk_id]) for chunk_id in allowed if chunk_id in postings]
+                else:
+                    matches = [(chunk_id, tf) for chunk_id, tf in postings.items() if chunk_id in allowed]
+                for chunk_id, tf in matches:
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._lengths)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics
+
+        Returns:
+            Dict[str, Any]: Chunk and term counts
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return {
+                "chunks": len(self._lengths),
+                "terms": len(self._postings),
+                "partitions": len(self._partitions),
+                "average_length": self._total_length / len(self._lengths) if self._lengths else 0.0
+            }
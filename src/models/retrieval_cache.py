@@ -0,0 +1,100 @@
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+import logging
+import threading
+import time
+
+if TYPE_CHECKING:
+    from langchain.schema import Document
+
+
+class RetrievalCache:
+    """LRU cache of retrieval results with a time-to-live per entry"""
+
+    def __init__(self, max_size: int = 128, ttl: Optional[float] = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.logger = logging.getLogger(__name__)
+        self._entries: "OrderedDict[Tuple[str, int, int, Tuple], Tuple[float, List[Document]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _make_key(query: str, k: int, version: int,
+                  filter: Optional[Dict[str, Any]] = None) -> Tuple[str, int, int, Tuple]:
+        return (query.strip(), k, version, tuple(sorted((filter or {}).items())))
+
+    def get(self, query: str, k: int, version: int,
+            filter: Optional[Dict[str, Any]] = None) -> Optional[List["Document"]]:
+        """
+        Get cached results for a query
+
+        Args:
+            query (str): Search query
+            k (int): Number of results requested
+            version (int): Collection version the results must belong to
+            filter (Dict[str, Any], optional): Metadata filter the results were retrieved with
+
+        Returns:
+            Optional[List[Document]]: Cached documents, or None on a miss
+        """
+        key = self._make_key(query, k, version, filter)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, documents = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(documents)
+
+    def put(self, query: str, k: int, version: int, documents: List["Document"],
+            filter: Optional[Dict[str, Any]] = None):
+        """
+        Store results for a query, evicting the least recently used entry if full
+
+        Args:
+            query (str): Search query
+            k (int): Number of results requested
+            version (int): Collection version the results belong to
+            documents (List[Document]): Retrieved documents
+            filter (Dict[str, Any], optional): Metadata filter the results were retrieved with
+        """
+        if self.max_size <= 0:
+            return
+
+        key = self._make_key(query, k, version, filter)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), list(documents))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+        self.logger.info("Retrieval cache cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict[str, Any]: Entry count, hits and misses
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses
+            }
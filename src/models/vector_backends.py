@@ -0,0 +1,635 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from abc import ABC, abstractmethod
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where the single-writer check is skipped
+    fcntl = None
+
+DEFAULT_INCLUDE = ("documents", "metadatas")
+
+
+class VectorBackend(ABC):
+    """
+    Storage and nearest-neighbour search for embedded chunks
+
+    Results use Chroma's shapes: get returns {"ids", "documents",
+    "metadatas"} and query returns the same plus "distances", as flat
+    lists. Filters use the subset of Chroma's where syntax that
+    VectorStoreManager builds: {field: value} or {"$and": [...]}.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def add(self, ids: List[str], embeddings: List[List[float]], documents: List[str],
+            metadatas: List[Dict[str, Any]]):
+        """Store chunks, replacing any stored under the same IDs"""
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        """Remove chunks by ID"""
+
+    @abstractmethod
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            include: Sequence[str] = DEFAULT_INCLUDE, limit: Optional[int] = None,
+            offset: Optional[int] = None) -> Dict[str, List[Any]]:
+        """Fetch chunks by ID or filter, or page through all of them"""
+
+    @abstractmethod
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Replace the metadata of stored chunks"""
+
+    @abstractmethod
+    def query(self, embedding: List[float], k: int,
+              where: Optional[Dict[str, Any]] = None) -> Dict[str, List[Any]]:
+        """Find the k chunks nearest to an embedding"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored chunks"""
+
+    def persist(self):
+        """Make pending writes durable"""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every chunk"""
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Backend statistics"""
+
+
+class ChromaBackend(VectorBackend):
+    """Chroma collection with its sqlite + HNSW files"""
+
+    name = "chroma"
+
+    def __init__(self, collection_name: str, persist_directory: str):
+        from langchain_community.vectorstores import Chroma
+
+        self.store = Chroma(collection_name=collection_name, persist_directory=persist_directory)
+        self.collection = self.store._collection
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def delete(self, ids):
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def get(self, ids=None, where=None, include=DEFAULT_INCLUDE, limit=None, offset=None):
+        return self.collection.get(ids=ids, where=where, include=list(include), limit=limit, offset=offset)
+
+    def update_metadatas(self, ids, metadatas):
+        if ids:
+            # Chroma merges metadata on update; keys to drop have to be set to None
+            existing = self.collection.get(ids=ids, include=["metadatas"])
+            previous = dict(zip(existing["ids"], existing["metadatas"]))
+            metadatas = [
+                {**{key: None for key in previous.get(chunk_id) or {}}, **(metadata or {})}
+                for chunk_id, metadata in zip(ids, metadatas)
+            ]
+            self.collection.update(ids=ids, metadatas=metadatas)
+
+    def query(self, embedding, k, where=None):
+        result = self.collection.query(
+            query_embeddings=[embedding],
+            n_results=k,
+            where=where,
+            include=["documents", "metadatas", "distances"]
+        )
+        return {key: result[key][0] for key in ("ids", "documents", "metadatas", "distances")}
+
+    def count(self):
+        return self.collection.count()
+
+    def persist(self):
+        self.store.persist()
+
+    def clear(self):
+        ids = self.collection.get(include=[])["ids"]
+        for start in range(0, len(ids), 1000):
+            self.collection.delete(ids=ids[start:start + 1000])
+
+    def get_stats(self):
+        return {
+            "backend": self.name,
+            "name": self.collection.name,
+            "metadata": self.collection.metadata
+        }
+
+
+class NumpyIndexBackend(VectorBackend):
+    """
+    In-process vector index over memory-mapped, quantized vectors
+
+    Vectors are L2-normalized and stored as float16, or as int8 with one
+    float32 scale per row, in a memory-mapped file, so the index costs 2 or
+    1 bytes per dimension and opens without reading the vectors. Chunk text
+    and metadata live in SQLite. A flat index scores every vector; an IVF
+    index clusters them with k-means and only scores the closest lists.
+    Distances are cosine distances.
+
+    The index has a single writer. Slots are allocated from in-process
+    state, so the first write takes an exclusive lock on the index
+    directory, held for the backend's lifetime, and a write from a second
+    process raises RuntimeError instead of overwriting the first one's
+    slots. Other processes can still query; they see the index as it was
+    when they opened it.
+    """
+
+    name = "numpy"
+
+    # Rows scored per matrix product, to bound the dequantized copy
+    BLOCK_ROWS = 4096
+
+    def __init__(self, directory: str, index_type: str = "flat", dtype: str = "float16",
+                 ivf_lists: int = 64, ivf_probes: int = 8, partition_fields: Iterable[str] = ()):
+        if index_type not in ("flat", "ivf"):
+            raise ValueError(f"Unknown index type: {index_type}")
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+
+        self.directory = Path(directory)
+        self.index_type = index_type
+        self.dtype = dtype
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = ivf_probes
+        self.partition_fields = set(partition_fields)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.RLock()
+        self._dim: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None
+        self._valid = np.zeros(0, dtype=bool)
+        self._lists = np.zeros(0, dtype=np.int32)
+        self._slot_ids: Dict[int, str] = {}
+        self._id_to_slot: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._next_slot = 0
+        self._metadatas: Dict[int, Dict[str, Any]] = {}
+        self._partitions: Dict[Tuple[str, Any], Set[int]] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_count = 0
+        self._data_version = None
+        self._writer_lock_file = None
+        self._initialize_index()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.directory / f"vectors.{self.dtype}"
+
+    @property
+    def scales_path(self) -> Path:
+        return self.directory / "scales.f32"
+
+    @property
+    def centroids_path(self) -> Path:
+        return self.directory / "centroids.npy"
+
+    def _initialize_index(self):
+        """Open the SQLite store and load IDs, metadata and IVF lists"""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.directory / "index.sqlite3"),
+                timeout=30,
+                check_same_thread=False,
+                isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    slot INTEGER PRIMARY KEY,
+                    chunk_id TEXT UNIQUE NOT NULL,
+                    document TEXT,
+                    metadata TEXT NOT NULL,
+                    list_id INTEGER NOT NULL DEFAULT -1
+                );
+                CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+            """)
+
+            self._load_state()
+        except Exception as e:
+            self.logger.error(f"Error loading vector index: {str(e)}")
+            raise
+
+    def _load_state(self):
+        """Load IDs, metadata, IVF lists and the vector map from disk"""
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._vectors = None
+        self._scales = None
+        self._valid = np.zeros(0, dtype=bool)
+        self._lists = np.zeros(0, dtype=np.int32)
+        self._slot_ids = {}
+        self._id_to_slot = {}
+        self._metadatas = {}
+        self._partitions = {}
+        self._centroids = None
+        self._trained_count = 0
+
+        meta = dict(self._conn.execute("SELECT name, value FROM meta"))
+        if "dtype" in meta and meta["dtype"] != self.dtype:
+            self.logger.warning(f"Vector index was built with {meta['dtype']}, ignoring configured {self.dtype}")
+            self.dtype = meta["dtype"]
+        if "dim" in meta:
+            self._dim = int(meta["dim"])
+            self._open_vectors(0)
+
+        rows = self._conn.execute("SELECT slot, chunk_id, metadata, list_id FROM chunks").fetchall()
+        self._next_slot = max((row[0] for row in rows), default=-1) + 1
+        self._ensure_capacity(self._next_slot)
+        for slot, chunk_id, metadata, list_id in rows:
+            self._slot_ids[slot] = chunk_id
+            self._id_to_slot[chunk_id] = slot
+            self._set_metadata(slot, json.loads(metadata))
+            self._valid[slot] = True
+            self._lists[slot] = list_id
+        self._free_slots = [slot for slot in range(self._next_slot) if slot not in self._slot_ids]
+
+        if self.centroids_path.exists():
+            self._centroids = np.load(self.centroids_path)
+            self._trained_count = int(meta.get("trained_count", len(rows)))
+
+        self.logger.info(f"Vector index loaded with {len(rows)} chunks ({self.index_type}, {self.dtype})")
+
+    def _acquire_writer_lock(self, required: bool = True) -> bool:
+        """
+        Become the index's single writer, must be called with the lock held
+
+        If another process wrote the index since it was loaded (and has
+        since exited), the state is reloaded first so slots are allocated
+        from what is on disk.
+
+        Args:
+            required (bool): Raise if another process is the writer, instead of returning False
+
+        Returns:
+            bool: Whether this process may write
+        """
+        if self._writer_lock_file is not None or fcntl is None:
+            return True
+
+        lock_file = open(self.directory / "writer.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            if required:
+                raise RuntimeError(
+                    f"Vector index {self.directory} is written by another process; "
+                    f"the numpy backend supports a single writer"
+                )
+            return False
+        self._writer_lock_file = lock_file
+
+        if self._conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+            self._load_state()
+        return True
+
+    def _open_vectors(self, min_rows: int):
+        """Map the vector (and scale) files, growing them to hold at least min_rows rows"""
+        itemsize = np.dtype(self.dtype).itemsize
+        row_bytes = self._dim * itemsize
+        size = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        rows = size // row_bytes
+
+        if rows < min_rows or rows == 0:
+            rows = max(min_rows, rows * 2, 1024)
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(rows * row_bytes)
+            if self.dtype == "int8":
+                with open(self.scales_path, "ab") as f:
+                    f.truncate(rows * 4)
+
+        if self._vectors is None or self._vectors.shape[0] != rows:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r+", shape=(rows, self._dim))
+            if self.dtype == "int8":
+                if self._scales is not None:
+                    self._scales.flush()
+                self._scales = np.memmap(self.scales_path, dtype=np.float32, mode="r+", shape=(rows,))
+
+    def _ensure_capacity(self, rows: int):
+        """Grow the per-slot arrays (and the vector files, once the dimension is known)"""
+        if self._dim is not None:
+            self._open_vectors(rows)
+        capacity = max(rows, self._vectors.shape[0] if self._vectors is not None else 0)
+        if capacity > len(self._valid):
+            self._valid = np.concatenate([self._valid, np.zeros(capacity - len(self._valid), dtype=bool)])
+            self._lists = np.concatenate([self._lists, np.full(capacity - len(self._lists), -1, dtype=np.int32)])
+
+    def _set_metadata(self, slot: int, metadata: Optional[Dict[str, Any]]):
+        """Replace a slot's metadata and its filter partitions"""
+        for item in self._metadatas.pop(slot, {}).items():
+            if item[0] in self.partition_fields:
+                partition = self._partitions.get(item)
+                if partition is not None:
+                    partition.discard(slot)
+                    if not partition:
+                        del self._partitions[item]
+        if metadata is not None:
+            self._metadatas[slot] = metadata
+            for item in metadata.items():
+                if item[0] in self.partition_fields:
+                    self._partitions.setdefault(item, set()).add(slot)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _store_vectors(self, slots: np.ndarray, vectors: np.ndarray):
+        """Quantize normalized vectors into their slots"""
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._vectors[slots] = np.round(vectors / scales[:, None]).astype(np.int8)
+            self._scales[slots] = scales
+        else:
+            self._vectors[slots] = vectors.astype(np.float16)
+
+    def _load_vectors(self, slots: np.ndarray) -> np.ndarray:
+        """Dequantize the vectors in some slots to float32"""
+        if len(slots) and slots[-1] - slots[0] + 1 == len(slots):
+            # A run of slots is read as a slice of the map instead of gathered row by row
+            slots = slice(int(slots[0]), int(slots[-1]) + 1)
+        vectors = self._vectors[slots].astype(np.float32)
+        if self.dtype == "int8":
+            vectors *= self._scales[slots][:, None]
+        return vectors
+
+    def _score(self, slots: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the query to the vectors in some slots"""
+        scores = np.empty(len(slots), dtype=np.float32)
+        for start in range(0, len(slots), self.BLOCK_ROWS):
+            block = slots[start:start + self.BLOCK_ROWS]
+            scores[start:start + len(block)] = self._load_vectors(block) @ query
+        return scores
+
+    def _assign_lists(self, slots: np.ndarray):
+        """Put vectors in the IVF list of their nearest centroid"""
+        for start in range(0, len(slots), self.BLOCK_ROWS):
+            block = slots[start:start + self.BLOCK_ROWS]
+            self._lists[block] = np.argmax(self._load_vectors(block) @ self._centroids.T, axis=1)
+
+    def _needs_training(self) -> bool:
+        # Clustering pays off once every list can hold a few dozen vectors
+        count = len(self._id_to_slot)
+        if self.index_type != "ivf" or count < self.ivf_lists * 39:
+            return False
+        return self._centroids is None or count >= 2 * self._trained_count
+
+    def _train(self, iterations: int = 10):
+        """Cluster the vectors with spherical k-means and rebuild the IVF lists"""
+        slots = np.nonzero(self._valid)[0]
+        lists = min(self.ivf_lists, max(1, len(slots) // 39))
+        rng = np.random.default_rng(0)
+
+        sample = slots if len(slots) <= lists * 256 else rng.choice(slots, lists * 256, replace=False)
+        vectors = self._load_vectors(np.sort(sample))
+        centroids = vectors[rng.choice(len(vectors), lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            for list_id in range(lists):
+                members = vectors[assignment == list_id]
+                if len(members):
+                    centroids[list_id] = members.sum(axis=0)
+            centroids = self._normalize(centroids)
+
+        self._centroids = centroids.astype(np.float32)
+        self._assign_lists(slots)
+        self._trained_count = len(slots)
+
+        np.save(self.centroids_path, self._centroids)
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "UPDATE chunks SET list_id = ? WHERE slot = ?",
+            [(int(self._lists[slot]), int(slot)) for slot in slots]
+        )
+        self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('trained_count', ?)",
+                           (str(self._trained_count),))
+        self._conn.execute("COMMIT")
+        self.logger.info(f"Trained IVF index with {lists} lists over {len(slots)} vectors")
+
+    def _match_where(self, where: Dict[str, Any]) -> Set[int]:
+        """Slots whose metadata matches every equality condition of a where clause"""
+        conditions = where["$and"] if "$and" in where else [where]
+        result: Optional[Set[int]] = None
+        for condition in conditions:
+            for field, value in condition.items():
+                if isinstance(value, dict):
+                    if set(value) != {"$eq"}:
+                        raise ValueError(f"Unsupported filter on {field}: {value}")
+                    value = value["$eq"]
+                if field in self.partition_fields:
+                    slots = self._partitions.get((field, value), set())
+                else:
+                    slots = {slot for slot, metadata in self._metadatas.items() if metadata.get(field) == value}
+                result = set(slots) if result is None else result & slots
+        return result or set()
+
+    def _fetch(self, slots: List[int], include: Sequence[str]) -> Dict[str, List[Any]]:
+        """Read chunks from SQLite, in the order of slots"""
+        rows = {}
+        for start in range(0, len(slots), 500):
+            batch = [int(slot) for slot in slots[start:start + 500]]
+            placeholders = ",".join("?" * len(batch))
+            for slot, document in self._conn.execute(
+                    f"SELECT slot, document FROM chunks WHERE slot IN ({placeholders})", batch):
+                rows[slot] = document
+
+        result = {"ids": [self._slot_ids[slot] for slot in slots]}
+        if "documents" in include:
+            result["documents"] = [rows.get(int(slot)) for slot in slots]
+        if "metadatas" in include:
+            result["metadatas"] = [self._metadatas.get(int(slot), {}) for slot in slots]
+        return result
+
+    def add(self, ids, embeddings, documents, metadatas):
+        if not ids:
+            return
+        with self._lock:
+            self._acquire_writer_lock()
+            try:
+                vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+                if self._dim is None:
+                    self._dim = vectors.shape[1]
+                    self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('dim', ?)", (str(self._dim),))
+                    self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('dtype', ?)", (self.dtype,))
+                elif vectors.shape[1] != self._dim:
+                    raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self._dim}")
+
+                slots = []
+                for chunk_id in ids:
+                    slot = self._id_to_slot.get(chunk_id)
+                    if slot is None:
+                        if self._free_slots:
+                            slot = self._free_slots.pop()
+                        else:
+                            slot = self._next_slot
+                            self._next_slot += 1
+                    slots.append(slot)
+                self._ensure_capacity(self._next_slot)
+
+                slots_array = np.asarray(slots, dtype=np.int64)
+                self._store_vectors(slots_array, vectors)
+                if self._centroids is not None:
+                    self._assign_lists(slots_array)
+
+                for slot, chunk_id, metadata in zip(slots, ids, metadatas):
+                    self._slot_ids[slot] = chunk_id
+                    self._id_to_slot[chunk_id] = slot
+                    self._set_metadata(slot, metadata or {})
+                    self._valid[slot] = True
+
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunks (slot, chunk_id, document, metadata, list_id) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (slot, chunk_id, document, json.dumps(metadata or {}), int(self._lists[slot]))
+                        for slot, chunk_id, document, metadata in zip(slots, ids, documents, metadatas)
+                    ]
+                )
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                self.logger.error(f"Error adding vectors to index: {str(e)}")
+                raise
+
+    def delete(self, ids):
+        with self._lock:
+            self._acquire_writer_lock()
+            slots = [self._id_to_slot.pop(chunk_id) for chunk_id in ids if chunk_id in self._id_to_slot]
+            if not slots:
+                return
+            for slot in slots:
+                del self._slot_ids[slot]
+                self._set_metadata(slot, None)
+                self._valid[slot] = False
+                self._lists[slot] = -1
+            self._free_slots.extend(slots)
+
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM chunks WHERE slot = ?", [(slot,) for slot in slots])
+            self._conn.execute("COMMIT")
+
+    def get(self, ids=None, where=None, include=DEFAULT_INCLUDE, limit=None, offset=None):
+        with self._lock:
+            if ids is not None:
+                slots = [self._id_to_slot[chunk_id] for chunk_id in ids if chunk_id in self._id_to_slot]
+            elif where:
+                slots = sorted(self._match_where(where))
+            else:
+                slots = sorted(self._slot_ids)
+            offset = offset or 0
+            slots = slots[offset:offset + limit] if limit is not None else slots[offset:]
+            return self._fetch(slots, include)
+
+    def update_metadatas(self, ids, metadatas):
+        with self._lock:
+            self._acquire_writer_lock()
+            rows = []
+            for chunk_id, metadata in zip(ids, metadatas):
+                slot = self._id_to_slot.get(chunk_id)
+                if slot is not None:
+                    self._set_metadata(slot, metadata or {})
+                    rows.append((json.dumps(metadata or {}), slot))
+
+            self._conn.execute("BEGIN")
+            self._conn.executemany("UPDATE chunks SET metadata = ? WHERE slot = ?", rows)
+            self._conn.execute("COMMIT")
+
+    def query(self, embedding, k, where=None):
+        with self._lock:
+            empty = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+            if not self._id_to_slot:
+                return empty
+            # A reader leaves training to the writer
+            if self._needs_training() and self._acquire_writer_lock(required=False):
+                self._train()
+
+            query = self._normalize(np.asarray([embedding], dtype=np.float32))[0]
+            allowed = np.fromiter(self._match_where(where), dtype=np.int64) if where else None
+            if allowed is not None and not len(allowed):
+                return empty
+
+            candidates = None
+            if self._centroids is not None:
+                probes = np.argsort(-(self._centroids @ query))[:self.ivf_probes]
+                in_probes = np.isin(self._lists, probes) & self._valid
+                candidates = allowed[in_probes[allowed]] if allowed is not None else np.nonzero(in_probes)[0]
+                if len(candidates) < k:
+                    # Too few vectors in the probed lists; score everything instead
+                    candidates = None
+            if candidates is None:
+                candidates = np.sort(allowed) if allowed is not None else np.nonzero(self._valid)[0]
+
+            scores = self._score(candidates, query)
+            top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+            top = top[np.argsort(-scores[top])]
+
+            result = self._fetch([int(slot) for slot in candidates[top]], DEFAULT_INCLUDE)
+            result["distances"] = [float(1.0 - score) for score in scores[top]]
+            return result
+
+    def count(self):
+        with self._lock:
+            return len(self._id_to_slot)
+
+    def persist(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            if self._scales is not None:
+                self._scales.flush()
+            if self._needs_training() and self._acquire_writer_lock(required=False):
+                self._train()
+
+    def clear(self):
+        with self._lock:
+            self._acquire_writer_lock()
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("DELETE FROM meta WHERE name = 'trained_count'")
+            self._conn.execute("COMMIT")
+            self._valid[:] = False
+            self._lists[:] = -1
+            self._slot_ids = {}
+            self._id_to_slot = {}
+            self._free_slots = []
+            self._next_slot = 0
+            self._metadatas = {}
+            self._partitions = {}
+            self._centroids = None
+            self._trained_count = 0
+            if self.centroids_path.exists():
+                self.centroids_path.unlink()
+
+    def get_stats(self):
+        with self._lock:
+            bytes_per_vector = (self._dim or 0) * np.dtype(self.dtype).itemsize + (4 if self.dtype == "int8" else 0)
+            return {
+                "backend": self.name,
+                "name": self.directory.name,
+                "index_type": self.index_type,
+                "dtype": self.dtype,
+                "count": len(self._id_to_slot),
+                "dimension": self._dim,
+                "bytes_per_vector": bytes_per_vector,
+                "ivf_lists": len(self._centroids) if self._centroids is not None else 0
+            }
@@ -1,43 +1,351 @@
-from typing import List, Dict, Any
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain.schema import Document
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
 import logging
 
 from ..config.config import MODEL_CONFIG, VECTOR_STORE_CONFIG
+from .embeddings import get_embeddings
+from .retrieval_cache import RetrievalCache
+from .lexical_index import LexicalIndex
+from .vector_backends import ChromaBackend, NumpyIndexBackend, VectorBackend
+from ..utils.curriculum import CURRICULUM_FIELDS, normalize_kelas, normalize_subject
+
+# chromadb and langchain are imported when the backend is first opened
+if TYPE_CHECKING:
+    from langchain.schema import Document
 
 class VectorStoreManager:
     def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=MODEL_CONFIG["embedding_model"]
-        )
-        self.vector_store = None
+        # The embedding model and the vector backend are loaded on first use
+        self._embeddings = None
+        self.backend: Optional[VectorBackend] = None
+        self._init_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
-        self._initialize_vector_store()
+
+        # Chroma keeps its files directly in the persist directory; other
+        # backends get a subdirectory with their own manifest and BM25 index
+        self.backend_name = VECTOR_STORE_CONFIG["backend"]
+        self.store_directory = Path(VECTOR_STORE_CONFIG["persist_directory"])
+        if self.backend_name == "numpy":
+            self.store_directory = self.store_directory / VECTOR_STORE_CONFIG["numpy_index"]["directory"]
+        elif self.backend_name != "chroma":
+            raise ValueError(f"Unknown vector store backend: {self.backend_name}")
+
+        # Manifest of ingested files: source path -> content hash and chunk IDs
+        self.manifest_file = self.store_directory / VECTOR_STORE_CONFIG["manifest_file"]
+        self.manifest = self._load_manifest()
+        # Manifest changes are written with the next persist()
+        self._manifest_dirty = False
+
+        # BM25 index over the same chunks, for hybrid search
+        self.lexical_index = LexicalIndex(
+            str(self.store_directory / VECTOR_STORE_CONFIG["lexical_index_file"]),
+            k1=VECTOR_STORE_CONFIG["bm25_k1"],
+            b=VECTOR_STORE_CONFIG["bm25_b"]
+        )
+        self._lexical_index_checked = False
+
+        # Bumped whenever the collection changes so cached retrievals go stale
+        self.collection_version = 0
+        self.retrieval_cache = RetrievalCache(
+            max_size=VECTOR_STORE_CONFIG["retrieval_cache_size"],
+            ttl=VECTOR_STORE_CONFIG["retrieval_cache_ttl"]
+        )
+
+    @property
+    def embeddings(self):
+        """Shared embedding model, loaded on first use"""
+        if self._embeddings is None:
+            self._embeddings = get_embeddings(MODEL_CONFIG["embedding_model"])
+        return self._embeddings
 
     def _initialize_vector_store(self):
-        """Initialize or load existing vector store"""
+        """Initialize or load the configured vector backend"""
         try:
-            self.vector_store = Chroma(
-                collection_name=VECTOR_STORE_CONFIG["collection_name"],
-                embedding_function=self.embeddings,
-                persist_directory=VECTOR_STORE_CONFIG["persist_directory"]
-            )
-            self.logger.info("Vector store initialized successfully")
+            with self._init_lock:
+                # Another thread may have opened the backend while we waited
+                if self.backend is not None:
+                    return
+
+                # Chunks and queries are always embedded here and passed to the
+                # backend as vectors, so opening it does not load the model
+                if self.backend_name == "numpy":
+                    numpy_config = VECTOR_STORE_CONFIG["numpy_index"]
+                    self.backend = NumpyIndexBackend(
+                        str(self.store_directory),
+                        index_type=numpy_config["index_type"],
+                        dtype=numpy_config["dtype"],
+                        ivf_lists=numpy_config["ivf_lists"],
+                        ivf_probes=numpy_config["ivf_probes"],
+                        partition_fields=VECTOR_STORE_CONFIG["filter_fields"] + ["source"]
+                    )
+                else:
+                    self.backend = ChromaBackend(
+                        collection_name=VECTOR_STORE_CONFIG["collection_name"],
+                        persist_directory=VECTOR_STORE_CONFIG["persist_directory"]
+                    )
+            self.logger.info(f"Vector store initialized successfully ({self.backend_name} backend)")
         except Exception as e:
             self.logger.error(f"Error initializing vector store: {str(e)}")
             raise
 
-    def add_documents(self, documents: List[Document], metadata: Dict[str, Any] = None):
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Load the ingestion manifest from disk"""
+        try:
+            if self.manifest_file.exists():
+                with open(self.manifest_file, 'r') as f:
+                    return json.load(f)
+            return {}
+        except Exception as e:
+            self.logger.error(f"Error loading ingestion manifest: {str(e)}")
+            raise
+
+    def _save_manifest(self):
+        """Save the ingestion manifest to disk, replacing the file atomically"""
+        try:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.manifest_file.with_name(self.manifest_file.name + ".tmp")
+            with open(tmp_file, 'w') as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp_file, self.manifest_file)
+            self._manifest_dirty = False
+        except Exception as e:
+            self.logger.error(f"Error saving ingestion manifest: {str(e)}")
+            raise
+
+    @staticmethod
+    def _normalize_source(source: str) -> str:
+        return os.path.abspath(source)
+
+    @staticmethod
+    def _make_chunk_ids(source: str, content_hash: str, count: int) -> List[str]:
+        """Build deterministic chunk IDs from the source path and content hash"""
+        source_hash = hashlib.sha1(source.encode("utf-8")).hexdigest()[:8]
+        return [f"{source_hash}-{content_hash[:16]}-{i}" for i in range(count)]
+
+    @staticmethod
+    def _filter_fields(metadata: Dict[str, Any]) -> Dict[str, str]:
+        """Pick the filterable fields out of a chunk's metadata"""
+        return {
+            field: str(metadata[field])
+            for field in VECTOR_STORE_CONFIG["filter_fields"]
+            if metadata.get(field) is not None
+        }
+
+    def _normalize_filter(self, filter: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+        """
+        Map a user-facing filter onto the stored metadata fields
+
+        Subjects and grades are normalized the way ingestion stores them, and
+        a source path is matched against the absolute path of the file.
+
+        Args:
+            filter (Dict[str, Any], optional): mata_pelajaran, kelas and/or source
+
+        Returns:
+            Optional[Dict[str, str]]: Stored field -> value, or None if nothing is filtered
+        """
+        if not filter:
+            return None
+
+        normalized = {}
+        for field, value in filter.items():
+            if field == "mata_pelajaran":
+                value = normalize_subject(value)
+            elif field == "kelas":
+                value = normalize_kelas(value)
+            elif field == "source":
+                field, value = "source_file", self._normalize_source(value) if value else None
+            else:
+                value = str(value) if value is not None else None
+            if value:
+                normalized[field] = value
+        return normalized or None
+
+    @staticmethod
+    def _make_where(filter: Dict[str, str]) -> Dict[str, Any]:
+        """Build a Chroma where clause matching every filter field"""
+        clauses = [{field: value} for field, value in sorted(filter.items())]
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def get_source_hash(self, source: str) -> Optional[str]:
+        """
+        Get the content hash recorded for an ingested file
+
+        Args:
+            source (str): Path to the source file
+
+        Returns:
+            Optional[str]: Content hash, or None if the file was never ingested
+        """
+        entry = self.manifest.get(self._normalize_source(source))
+        return entry["hash"] if entry else None
+
+    def get_sources(self, directory: Optional[str] = None) -> List[str]:
+        """
+        Get the ingested source files, optionally limited to a directory
+
+        Args:
+            directory (str, optional): Only return sources under this directory
+
+        Returns:
+            List[str]: Absolute paths of ingested source files
+        """
+        if directory is None:
+            return list(self.manifest.keys())
+
+        prefix = os.path.join(os.path.abspath(directory), "")
+        return [source for source in self.manifest if source.startswith(prefix)]
+
+    def _delete_source_chunks(self, source: str, raw_source: Optional[str] = None):
+        """Delete the chunks of a source from the backend and the lexical index"""
+        entry = self.manifest.get(source)
+        if entry and entry["chunk_ids"]:
+            chunk_ids = entry["chunk_ids"]
+        elif raw_source is not None:
+            # Chunks ingested before the manifest existed carry only their loader source
+            chunk_ids = self.backend.get(where={"source": raw_source}, include=[])["ids"]
+        else:
+            return
+
+        if chunk_ids:
+            self.backend.delete(chunk_ids)
+            self.lexical_index.delete(chunk_ids)
+
+    def remove_source(self, source: str, persist: bool = True):
+        """
+        Remove all chunks of an ingested file from the vector store
+
+        Args:
+            source (str): Path to the source file
+            persist (bool): Persist the collection and the manifest after writing
+        """
+        try:
+            if not self.backend:
+                self._initialize_vector_store()
+
+            normalized = self._normalize_source(source)
+            if normalized not in self.manifest:
+                return
+
+            self._delete_source_chunks(normalized)
+            del self.manifest[normalized]
+            self._manifest_dirty = True
+            if persist:
+                self.persist()
+            self._invalidate_retrieval_cache()
+
+            self.logger.info(f"Removed chunks of {source} from vector store")
+        except Exception as e:
+            self.logger.error(f"Error removing {source} from vector store: {str(e)}")
+            raise
+
+    def _invalidate_retrieval_cache(self):
+        """Mark the collection as changed and drop cached retrievals"""
+        self.collection_version += 1
+        self.retrieval_cache.clear()
+
+    def get_source_fields(self, source: str) -> Optional[Dict[str, str]]:
+        """
+        Get the filter fields recorded for an ingested file
+
+        Args:
+            source (str): Path to the source file
+
+        Returns:
+            Optional[Dict[str, str]]: Filter fields, or None if the file was never ingested
+        """
+        entry = self.manifest.get(self._normalize_source(source))
+        return entry.get("fields", {}) if entry else None
+
+    def update_source_metadata(self, source: str, metadata: Dict[str, Any], persist: bool = True):
+        """
+        Update the curriculum tags of an ingested file's chunks without re-embedding them
+
+        The chunks' mata_pelajaran and kelas are replaced, so a tag missing
+        from metadata is removed; other chunk metadata is kept.
+
+        Args:
+            source (str): Path to the source file
+            metadata (Dict[str, Any]): New metadata for every chunk
+            persist (bool): Persist the collection and the manifest after writing
+        """
+        try:
+            if not self.backend:
+                self._initialize_vector_store()
+
+            normalized = self._normalize_source(source)
+            entry = self.manifest.get(normalized)
+            if not entry or not entry["chunk_ids"]:
+                return
+
+            existing = self.backend.get(ids=entry["chunk_ids"], include=["metadatas"])
+            metadatas = [
+                {
+                    **{key: value for key, value in (chunk_metadata or {}).items() if key not in CURRICULUM_FIELDS},
+                    **metadata,
+                    "source_file": normalized
+                }
+                for chunk_metadata in existing["metadatas"]
+            ]
+            self.backend.update_metadatas(existing["ids"], metadatas)
+            self.lexical_index.update_fields(existing["ids"], [self._filter_fields(m) for m in metadatas])
+
+            entry["fields"] = self._filter_fields(metadata)
+            self._manifest_dirty = True
+            if persist:
+                self.persist()
+            self._invalidate_retrieval_cache()
+
+            self.logger.info(f"Updated metadata of {len(existing['ids'])} chunks of {source}")
+        except Exception as e:
+            self.logger.error(f"Error updating metadata of {source}: {str(e)}")
+            raise
+
+    def embed_documents(self, documents: List["Document"]) -> List[List[float]]:
         """
-        Add documents to vector store
+        Embed document chunks with the shared embedding model
+
+        Batch size, normalization and device come from MODEL_CONFIG.
+
+        Args:
+            documents (List[Document]): Document chunks to embed
+
+        Returns:
+            List[List[float]]: One embedding per chunk
+        """
+        try:
+            if not documents:
+                return []
+            return self.embeddings.embed_documents([doc.page_content for doc in documents])
+        except Exception as e:
+            self.logger.error(f"Error embedding documents: {str(e)}")
+            raise
+
+    def add_embedded_documents(self, documents: List["Document"], embeddings: List[List[float]],
+                               metadata: Dict[str, Any] = None, source: Optional[str] = None,
+                               content_hash: Optional[str] = None, persist: bool = True):
+        """
+        Write already embedded documents to the vector store
+
+        When a source file and its content hash are given, the chunks get
+        deterministic IDs and replace any chunks previously ingested from
+        that file, and the manifest is updated.
 
         Args:
             documents (List[Document]): List of documents to add
+            embeddings (List[List[float]]): Embedding of each document
             metadata (Dict[str, Any], optional): Additional metadata
+            source (str, optional): Path of the file the documents came from
+            content_hash (str, optional): Content hash of the source file
+            persist (bool): Persist the collection and the manifest after writing
         """
         try:
-            if not self.vector_store:
+            if not self.backend:
                 self._initialize_vector_store()
 
             # Add metadata to documents if provided
@@ -45,36 +353,246 @@ class VectorStoreManager:
                 for doc in documents:
                     doc.metadata.update(metadata)
 
+            if source is not None and content_hash is not None:
+                normalized = self._normalize_source(source)
+                chunk_ids = self._make_chunk_ids(normalized, content_hash, len(documents))
+
+                # Replace the chunks of the previous version of this file
+                self._delete_source_chunks(normalized, raw_source=source)
+            else:
+                normalized = None
+                chunk_ids = [str(uuid.uuid4()) for _ in documents]
+
+            # Keep the ID in the metadata so retrieved chunks can be identified,
+            # and the absolute source path so retrieval can filter on it
+            for doc, chunk_id in zip(documents, chunk_ids):
+                doc.metadata["chunk_id"] = chunk_id
+                if normalized is not None:
+                    doc.metadata["source_file"] = normalized
+
             # Add documents to vector store
-            self.vector_store.add_documents(documents)
-            self.vector_store.persist()
+            if documents:
+                self.backend.add(
+                    chunk_ids,
+                    embeddings,
+                    [doc.page_content for doc in documents],
+                    [doc.metadata for doc in documents]
+                )
+                self.lexical_index.add(
+                    chunk_ids,
+                    [doc.page_content for doc in documents],
+                    [self._filter_fields(doc.metadata) for doc in documents]
+                )
+
+            if normalized is not None:
+                self.manifest[normalized] = {
+                    "hash": content_hash,
+                    "chunk_ids": chunk_ids,
+                    "fields": self._filter_fields(metadata or {})
+                }
+                self._manifest_dirty = True
+
+            if persist:
+                self.persist()
+            self._invalidate_retrieval_cache()
 
             self.logger.info(f"Successfully added {len(documents)} documents to vector store")
         except Exception as e:
             self.logger.error(f"Error adding documents to vector store: {str(e)}")
             raise
 
-    def similarity_search(self, query: str, k: int = 3) -> List[Document]:
+    def add_documents(self, documents: List["Document"], metadata: Dict[str, Any] = None,
+                      source: Optional[str] = None, content_hash: Optional[str] = None,
+                      persist: bool = True):
+        """
+        Embed documents and add them to vector store
+
+        Args:
+            documents (List[Document]): List of documents to add
+            metadata (Dict[str, Any], optional): Additional metadata
+            source (str, optional): Path of the file the documents came from
+            content_hash (str, optional): Content hash of the source file
+            persist (bool): Persist the collection and the manifest after writing
+        """
+        embeddings = self.embed_documents(documents)
+        self.add_embedded_documents(documents, embeddings, metadata, source, content_hash, persist)
+
+    def persist(self):
+        """Persist the vector backend and the ingestion manifest to disk"""
+        try:
+            if self.backend:
+                self.backend.persist()
+            if self._manifest_dirty:
+                self._save_manifest()
+        except Exception as e:
+            self.logger.error(f"Error persisting vector store: {str(e)}")
+            raise
+
+    def similarity_search(self, query: str, k: int = 3, filter: Optional[Dict[str, Any]] = None) -> List["Document"]:
         """
         Perform similarity search
 
         Args:
             query (str): Search query
             k (int): Number of results to return
+            filter (Dict[str, Any], optional): Only search chunks with this mata_pelajaran,
+                kelas and/or source
 
         Returns:
             List[Document]: List of similar documents
         """
         try:
-            if not self.vector_store:
+            if not self.backend:
                 self._initialize_vector_store()
 
-            results = self.vector_store.similarity_search(query, k=k)
+            cached = self.retrieval_cache.get(query, k, self.collection_version, filter)
+            if cached is not None:
+                return cached
+
+            results = self.search(query, self.embed_query(query), k=k, filter=filter)
+            self.retrieval_cache.put(query, k, self.collection_version, results, filter)
             return results
         except Exception as e:
             self.logger.error(f"Error performing similarity search: {str(e)}")
             raise
 
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a search query with the shared embedding model
+
+        Args:
+            query (str): Search query
+
+        Returns:
+            List[float]: Query embedding
+        """
+        try:
+            return self.embeddings.embed_query(query)
+        except Exception as e:
+            self.logger.error(f"Error embedding query: {str(e)}")
+            raise
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 3,
+                                    filter: Optional[Dict[str, Any]] = None) -> List["Document"]:
+        """
+        Perform similarity search with a precomputed query embedding
+
+        Args:
+            embedding (List[float]): Query embedding
+            k (int): Number of results to return
+            filter (Dict[str, Any], optional): Only search chunks with this mata_pelajaran,
+                kelas and/or source
+
+        Returns:
+            List[Document]: List of similar documents
+        """
+        try:
+            if not self.backend:
+                self._initialize_vector_store()
+
+            from langchain.schema import Document
+
+            filter = self._normalize_filter(filter)
+            results = self.backend.query(embedding, k, where=self._make_where(filter) if filter else None)
+            return [
+                Document(page_content=text, metadata=metadata or {})
+                for text, metadata in zip(results["documents"], results["metadatas"])
+            ]
+        except Exception as e:
+            self.logger.error(f"Error performing similarity search by vector: {str(e)}")
+            raise
+
+    def _ensure_lexical_index(self):
+        """Build the lexical index from the collection if it predates the index"""
+        if self._lexical_index_checked:
+            return
+
+        if len(self.lexical_index) == 0 and self.backend.count() > 0:
+            self.logger.info("Building lexical index from existing vector store chunks")
+            batch_size = 1000
+            offset = 0
+            while True:
+                batch = self.backend.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+                if not batch["ids"]:
+                    break
+                self.lexical_index.add(
+                    batch["ids"],
+                    batch["documents"],
+                    [self._filter_fields(metadata or {}) for metadata in batch["metadatas"]]
+                )
+                offset += batch_size
+        self._lexical_index_checked = True
+
+    def search(self, query: str, embedding: List[float], k: int = 3,
+               mode: Optional[str] = None, filter: Optional[Dict[str, Any]] = None) -> List["Document"]:
+        """
+        Search with a precomputed query embedding, dense only or hybrid
+
+        Hybrid search takes the top candidates of the dense and the BM25
+        ranking and fuses them by reciprocal rank, so chunks that match
+        curriculum terms or codes exactly are found even when the embedding
+        model misses them.
+
+        A filter is pushed down into both indexes as a where clause
+        and a lexical partition, so only matching chunks are scored.
+
+        Args:
+            query (str): Search query, used for the lexical ranking
+            embedding (List[float]): Query embedding
+            k (int): Number of results to return
+            mode (str, optional): "dense" or "hybrid", defaults to VECTOR_STORE_CONFIG
+            filter (Dict[str, Any], optional): Only search chunks with this mata_pelajaran,
+                kelas and/or source
+
+        Returns:
+            List[Document]: List of similar documents
+        """
+        mode = mode or VECTOR_STORE_CONFIG["retrieval_mode"]
+        if mode == "dense":
+            return self.similarity_search_by_vector(embedding, k=k, filter=filter)
+
+        filter = self._normalize_filter(filter)
+
+        try:
+            from langchain.schema import Document
+
+            if not self.backend:
+                self._initialize_vector_store()
+            self._ensure_lexical_index()
+
+            candidates = max(k, VECTOR_STORE_CONFIG["hybrid_candidates"])
+            rrf_k = VECTOR_STORE_CONFIG["rrf_k"]
+
+            dense = self.backend.query(embedding, candidates, where=self._make_where(filter) if filter else None)
+            contents = {
+                chunk_id: (text, metadata)
+                for chunk_id, text, metadata in zip(dense["ids"], dense["documents"], dense["metadatas"])
+            }
+
+            scores: Dict[str, float] = {}
+            for rank, chunk_id in enumerate(dense["ids"]):
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (rrf_k + rank + 1)
+            for rank, (chunk_id, _) in enumerate(self.lexical_index.search(query, k=candidates, filter=filter)):
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (rrf_k + rank + 1)
+
+            top_ids = sorted(scores, key=scores.get, reverse=True)[:k]
+
+            # Fetch the chunks that only the lexical ranking found
+            missing = [chunk_id for chunk_id in top_ids if chunk_id not in contents]
+            if missing:
+                fetched = self.backend.get(ids=missing, include=["documents", "metadatas"])
+                for chunk_id, text, metadata in zip(fetched["ids"], fetched["documents"], fetched["metadatas"]):
+                    contents[chunk_id] = (text, metadata)
+
+            return [
+                Document(page_content=contents[chunk_id][0], metadata=contents[chunk_id][1] or {})
+                for chunk_id in top_ids
+                if chunk_id in contents
+            ]
+        except Exception as e:
+            self.logger.error(f"Error performing hybrid search: {str(e)}")
+            raise
+
     def get_collection_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the vector store collection
@@ -83,14 +601,14 @@ class VectorStoreManager:
             Dict[str, Any]: Collection statistics
         """
         try:
-            if not self.vector_store:
+            if not self.backend:
                 self._initialize_vector_store()
 
-            collection = self.vector_store._collection
             stats = {
-                "count": collection.count(),
-                "name": collection.name,
-                "metadata": collection.metadata
+                **self.backend.get_stats(),
+                "count": self.backend.count(),
+                "retrieval_cache": self.retrieval_cache.get_stats(),
+                "lexical_index": self.lexical_index.get_stats()
             }
             return stats
         except Exception as e:
@@ -100,11 +618,15 @@ class VectorStoreManager:
     def clear_collection(self):
         """Clear all documents from the vector store"""
         try:
-            if not self.vector_store:
+            if not self.backend:
                 self._initialize_vector_store()
 
-            self.vector_store._collection.delete(where={})
-            self.vector_store.persist()
+            self.backend.clear()
+            self.lexical_index.clear()
+            self.backend.persist()
+            self.manifest = {}
+            self._save_manifest()
+            self._invalidate_retrieval_cache()
             self.logger.info("Vector store collection cleared successfully")
         except Exception as e:
             self.logger.error(f"Error clearing vector store: {str(e)}")
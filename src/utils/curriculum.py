@@ -0,0 +1,94 @@
+from typing import Any, Dict, Optional
+import os
+import re
+
+# Subjects recognised in file and directory names, longest names first so
+# "bahasa indonesia" wins over a bare "bahasa"
+KNOWN_SUBJECTS = sorted([
+    "matematika", "fisika", "kimia", "biologi", "ipa", "ips", "sejarah", "geografi",
+    "ekonomi", "sosiologi", "ppkn", "pkn", "informatika", "seni budaya", "pjok",
+    "bahasa indonesia", "bahasa inggris", "bahasa jawa", "bahasa arab",
+    "pendidikan agama islam", "pendidikan agama", "prakarya"
+], key=len, reverse=True)
+
+ROMAN_NUMERALS = {
+    "i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6,
+    "vii": 7, "viii": 8, "ix": 9, "x": 10, "xi": 11, "xii": 12
+}
+
+KELAS_PATTERN = re.compile(r"\bkelas[\s_-]*(\d{1,2}|[ivx]{1,4})\b")
+
+# Chunk metadata fields holding a file's curriculum tags, most specific retrieval filter last
+CURRICULUM_FIELDS = ("mata_pelajaran", "kelas")
+
+
+def normalize_subject(value: Any) -> Optional[str]:
+    """
+    Normalize a subject name for metadata matching
+
+    Args:
+        value: Subject as typed by a user or found in a path
+
+    Returns:
+        Optional[str]: Lowercased subject with single spaces, or None if empty
+    """
+    if value is None:
+        return None
+    subject = " ".join(re.sub(r"[_\-]+", " ", str(value)).lower().split())
+    return subject or None
+
+
+def normalize_kelas(value: Any) -> Optional[str]:
+    """
+    Normalize a grade to its arabic number, so "XII", "Kelas 12" and 12 all match
+
+    Args:
+        value: Grade as typed by a user or found in a path
+
+    Returns:
+        Optional[str]: Grade number as a string, or None if it is not recognised
+    """
+    if value is None:
+        return None
+    text = str(value).strip().lower()
+    text = re.sub(r"^kelas[\s_-]*", "", text)
+    text = text.split("/")[0].strip()
+    if text.isdigit():
+        return str(int(text))
+    if text in ROMAN_NUMERALS:
+        return str(ROMAN_NUMERALS[text])
+    return None
+
+
+def infer_curriculum_metadata(file_path: str, root: Optional[str] = None) -> Dict[str, str]:
+    """
+    Infer subject and grade from the directory and file names of a document
+
+    Only the part of the path below root is considered, e.g.
+    data/matematika/kelas_10/bab1.pdf gives mata_pelajaran "matematika"
+    and kelas "10".
+
+    Args:
+        file_path (str): Path to the document
+        root (str, optional): Directory the document was ingested from
+
+    Returns:
+        Dict[str, str]: The curriculum fields that could be inferred
+    """
+    path = os.path.abspath(file_path)
+    if root is not None:
+        path = os.path.relpath(path, os.path.abspath(root))
+    text = " ".join(re.sub(r"[_\-.]+", " ", part) for part in path.split(os.sep)).lower()
+
+    metadata = {}
+    for subject in KNOWN_SUBJECTS:
+        if re.search(rf"\b{re.escape(subject)}\b", text):
+            metadata["mata_pelajaran"] = subject
+            break
+
+    match = KELAS_PATTERN.search(text)
+    if match:
+        kelas = normalize_kelas(match.group(1))
+        if kelas:
+            metadata["kelas"] = kelas
+    return metadata
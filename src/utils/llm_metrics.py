@@ -0,0 +1,51 @@
+from typing import Dict, Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# Ollama reports durations in nanoseconds
+NANOSECONDS = 1e9
+
+
+def ollama_timings(generation_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Pick token counts and stage durations out of Ollama's final response
+
+    Args:
+        generation_info (Dict[str, Any], optional): generation_info of the last
+            generation chunk, None for models that do not report it
+
+    Returns:
+        Dict[str, Any]: load, prefill and decode times in seconds, and
+            prompt_eval_tokens and output_tokens, for whichever are reported
+    """
+    if not generation_info:
+        return {}
+
+    timings = {}
+    if "load_duration" in generation_info:
+        timings["load"] = generation_info["load_duration"] / NANOSECONDS
+    if "prompt_eval_count" in generation_info:
+        timings["prompt_eval_tokens"] = generation_info["prompt_eval_count"]
+    if "prompt_eval_duration" in generation_info:
+        timings["prefill"] = generation_info["prompt_eval_duration"] / NANOSECONDS
+    if "eval_count" in generation_info:
+        timings["output_tokens"] = generation_info["eval_count"]
+    if "eval_duration" in generation_info:
+        timings["decode"] = generation_info["eval_duration"] / NANOSECONDS
+    return timings
+
+
+class GenerationInfoHandler(BaseCallbackHandler):
+    """Callback that keeps the generation_info of a model call, for invoke and stream alike"""
+
+    def __init__(self):
+        self.generation_info: Optional[Dict[str, Any]] = None
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any):
+        if response.generations and response.generations[0]:
+            self.generation_info = response.generations[0][0].generation_info
+
+    def get_timings(self) -> Dict[str, Any]:
+        """Ollama's token counts and durations for the call, if it reported them"""
+        return ollama_timings(self.generation_info)
@@ -0,0 +1,39 @@
+from typing import Dict, Any, Iterable, Iterator
+import time
+
+
+def timed_stream(tokens: Iterable[str], timings: Dict[str, Any]) -> Iterator[str]:
+    """
+    Pass streamed tokens through while recording latency and throughput
+
+    Each streamed chunk is counted as one token, which matches how Ollama
+    streams its output.
+
+    Args:
+        tokens (Iterable[str]): Token stream from the model
+        timings (Dict[str, Any]): Timings dict, updated in place with
+            time_to_first_token, llm, tokens and tokens_per_second
+
+    Yields:
+        str: Tokens as they arrive
+    """
+    start = time.perf_counter()
+    first_token_at = None
+    token_count = 0
+
+    for token in tokens:
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+            timings["time_to_first_token"] = first_token_at - start
+        token_count += 1
+        yield token
+
+    end = time.perf_counter()
+    timings["llm"] = end - start
+    timings["tokens"] = token_count
+    if first_token_at is None:
+        timings["time_to_first_token"] = None
+        timings["tokens_per_second"] = None
+    else:
+        decode_time = end - first_token_at
+        timings["tokens_per_second"] = token_count / decode_time if decode_time > 0 else None
@@ -0,0 +1,30 @@
+from typing import Optional
+import os
+import sys
+
+
+def get_rss_mb() -> Optional[float]:
+    """
+    Get the resident set size of the current process
+
+    Returns:
+        Optional[float]: Resident memory in megabytes, or None if unavailable
+    """
+    # Current RSS from procfs (Linux)
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    # Fall back to peak RSS from getrusage (macOS and other Unix)
+    try:
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+        if sys.platform == "darwin":
+            return max_rss / (1024 * 1024)
+        return max_rss / 1024
+    except (ImportError, OSError):
+        return None
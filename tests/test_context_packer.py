@@ -0,0 +1,84 @@
+import unittest
+
+from langchain_core.documents import Document
+
+from src.agents.context_packer import ContextPacker, count_tokens, truncate_to_tokens
+
+
+def make_chunk(name, sentences, words=9):
+    """A chunk of distinct sentences, each words + 1 tokens long"""
+    return Document(
+        page_content=" ".join(
+            " ".join(f"{name}{i}w{j}" for j in range(words)) + "." for i in range(sentences)
+        ),
+        metadata={"chunk_id": name}
+    )
+
+
+class CountTokensTest(unittest.TestCase):
+    def test_counts_word_pieces_and_punctuation(self):
+        self.assertEqual(count_tokens("Siswa membaca."), 5)
+        self.assertEqual(count_tokens(""), 0)
+
+    def test_truncate_stays_within_budget_at_sentence_end(self):
+        text = make_chunk("a", 4).page_content
+        truncated = truncate_to_tokens(text, 25)
+        self.assertLessEqual(count_tokens(truncated), 25)
+        self.assertTrue(truncated.endswith("."))
+        self.assertEqual(truncate_to_tokens(text, 1000), text)
+        self.assertEqual(truncate_to_tokens(text, 0), "")
+
+
+class ContextPackerTest(unittest.TestCase):
+    def setUp(self):
+        self.packer = ContextPacker(context_window=1000, output_reserve_tokens=200, min_chunk_tokens=20)
+
+    def test_budget_leaves_room_for_prompt_and_answer(self):
+        prompt = "Buat RPP untuk: {query}"
+        self.assertEqual(self.packer.get_budget(prompt), 800 - count_tokens(prompt))
+        self.assertEqual(ContextPacker(100, 200).get_budget(prompt), 0)
+
+    def test_packs_everything_that_fits(self):
+        documents = [make_chunk("a", 2), make_chunk("b", 2)]
+        context, packed, stats = self.packer.pack(documents, budget=100)
+
+        self.assertEqual(packed, documents)
+        self.assertEqual(stats["context_tokens"], count_tokens(context))
+        self.assertEqual(stats["trimmed_chunks"], 0)
+        self.assertEqual(stats["dropped_chunks"], 0)
+
+    def test_trims_chunk_that_does_not_fit(self):
+        documents = [make_chunk("a", 2), make_chunk("b", 5)]
+        context, packed, stats = self.packer.pack(documents, budget=50)
+
+        self.assertEqual(packed, documents)
+        self.assertLessEqual(stats["context_tokens"], 50)
+        self.assertEqual(stats["trimmed_chunks"], 1)
+        self.assertIn("b0w0", context)
+        self.assertNotIn("b4w0", context)
+
+    def test_skips_chunk_when_too_little_budget_is_left(self):
+        # 40 tokens used leaves 15, below min_chunk_tokens: the 5-sentence chunk
+        # is skipped but the one-sentence chunk after it still fits
+        documents = [make_chunk("a", 4), make_chunk("b", 5), make_chunk("c", 1)]
+        context, packed, stats = self.packer.pack(documents, budget=55)
+
+        self.assertEqual([doc.metadata["chunk_id"] for doc in packed], ["a", "c"])
+        self.assertEqual(stats["dropped_chunks"], 1)
+        self.assertEqual(stats["trimmed_chunks"], 0)
+        self.assertLessEqual(stats["context_tokens"], 55)
+        self.assertNotIn("b0w0", context)
+
+    def test_removes_repeated_sentences(self):
+        first = make_chunk("a", 3)
+        overlap = Document(page_content=first.page_content.split(". ")[-1] + " " + make_chunk("b", 2).page_content)
+        repeat = Document(page_content=first.page_content)
+        context, packed, stats = self.packer.pack([first, overlap, repeat], budget=500)
+
+        self.assertEqual(packed, [first, overlap])
+        self.assertEqual(stats["duplicate_chunks"], 1)
+        self.assertEqual(context.count("a2w0"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
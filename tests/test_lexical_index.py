@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from src.models.lexical_index import LexicalIndex, tokenize
+
+
+class TokenizeTest(unittest.TestCase):
+    def test_drops_stopwords_and_lowercases(self):
+        self.assertEqual(tokenize("Siswa dapat menjelaskan Proses Fotosintesis pada tumbuhan"),
+                         ["siswa", "menjelaskan", "proses", "fotosintesis", "tumbuhan"])
+
+    def test_strips_particles_from_longer_words(self):
+        self.assertEqual(tokenize("pembelajarannya bukankah"), ["pembelajaran", "bukan"])
+        self.assertEqual(tokenize("punya"), ["punya"])
+
+    def test_keeps_competency_codes_and_roman_numerals(self):
+        self.assertEqual(tokenize("KD 3.1 dan 4.10.2 kelas XII"), ["kd", "3.1", "4.10.2", "kelas", "xii"])
+
+
+class LexicalIndexTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._directory.name, "lexical_index.sqlite3")
+        self.indexes = []
+        self.index = self.open_index()
+        self.index.add(
+            ["ipa:0", "ipa:1", "mtk:0"],
+            [
+                "Fotosintesis mengubah cahaya menjadi energi kimia. Fotosintesis terjadi di daun.",
+                "Respirasi sel menghasilkan energi bagi tumbuhan dan hewan.",
+                "Persamaan linear satu variabel dan grafik fungsi linear."
+            ],
+            [
+                {"mata_pelajaran": "ipa", "kelas": "7"},
+                {"mata_pelajaran": "ipa", "kelas": "8"},
+                {"mata_pelajaran": "matematika", "kelas": "7"}
+            ]
+        )
+
+    def tearDown(self):
+        for index in self.indexes:
+            if index._conn is not None:
+                index._conn.close()
+        self._directory.cleanup()
+
+    def open_index(self):
+        index = LexicalIndex(self.path)
+        self.indexes.append(index)
+        return index
+
+    def test_ranks_by_term_frequency_and_rarity(self):
+        results = self.index.search("fotosintesis energi", k=3)
+        self.assertEqual([chunk_id for chunk_id, _ in results], ["ipa:0", "ipa:1"])
+        self.assertGreater(results[0][1], results[1][1])
+
+    def test_rarer_term_scores_higher(self):
+        rare = dict(self.index.search("respirasi"))["ipa:1"]
+        common = dict(self.index.search("energi"))["ipa:1"]
+        self.assertGreater(rare, common)
+
+    def test_filter_limits_candidates(self):
+        self.assertEqual([chunk_id for chunk_id, _ in self.index.search("energi", filter={"kelas": "8"})], ["ipa:1"])
+        self.assertEqual(self.index.search("energi", filter={"mata_pelajaran": "matematika"}), [])
+        self.assertEqual(self.index.search("linear", filter={"kelas": "9"}), [])
+
+    def test_delete_and_reload(self):
+        self.index.delete(["ipa:0"])
+        self.assertEqual(self.index.search("fotosintesis"), [])
+
+        reopened = self.open_index()
+        self.assertEqual(len(reopened), 2)
+        self.assertEqual([chunk_id for chunk_id, _ in reopened.search("linear", filter={"kelas": "7"})], ["mtk:0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from src.memory.memory_store import MemoryStoreManager
+
+
+class MemoryStoreSyncTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        self._directory.cleanup()
+
+    def open_store(self, max_items=100):
+        store = MemoryStoreManager(self.directory, max_items=max_items)
+        self.stores.append(store)
+        return store
+
+    def count_reloads(self, store):
+        reloads = []
+        load_memories = store._load_memories
+        store._load_memories = lambda: (reloads.append(1), load_memories())
+        return reloads
+
+    def test_add_during_reload_flush_stays_in_view(self):
+        store = self.open_store()
+        other = self.open_store()
+
+        store.add_memory("test", {"n": 1})
+        other.add_memory("test", {"n": 0})
+        other.flush()
+
+        # Add a memory from another thread while a full reload's flush is writing
+        added = {}
+        apply_pending = store._apply_pending
+
+        def apply_and_add(operations):
+            evicted = apply_pending(operations)
+            if "thread" not in added:
+                added["thread"] = threading.Thread(
+                    target=lambda: added.setdefault("id", store.add_memory("test", {"n": 2}))
+                )
+                added["thread"].start()
+                added["thread"].join(0.5)
+            return evicted
+
+        store._apply_pending = apply_and_add
+        store._reload()
+        store._apply_pending = apply_pending
+        added["thread"].join()
+
+        self.assertIsNotNone(store.get_memory(added["id"]))
+        store.flush()
+        self.assertIsNotNone(store.get_memory(added["id"]))
+        self.assertEqual(len(store.get_memories("test")), 3)
+
+    def test_sync_applies_logged_changes(self):
+        writer = self.open_store()
+        reader = self.open_store()
+        reloads = self.count_reloads(reader)
+
+        first = writer.add_memory("test", {"n": 0})
+        second = writer.add_memory("test", {"n": 1})
+        writer.flush()
+        self.assertEqual([memory["id"] for memory in reader.get_memories("test")], [first, second])
+
+        writer.update_memory(first, {"content": {"n": 10}})
+        writer.retention = {"test": {"max_items": 2, "max_age_days": None, "max_bytes": None, "archive": False}}
+        third = writer.add_memory("test", {"n": 2})
+        writer.flush()
+
+        self.assertEqual([memory["id"] for memory in reader.get_memories("test")], [second, third])
+        self.assertEqual(reloads, [])
+
+    def test_sync_keeps_pending_local_update(self):
+        writer = self.open_store()
+        reader = self.open_store()
+
+        memory_id = writer.add_memory("test", {"n": 0})
+        writer.flush()
+        reader.get_memory(memory_id)
+
+        reader.update_memory(memory_id, {"content": {"n": "reader"}})
+        writer.update_memory(memory_id, {"content": {"n": "writer"}})
+        writer.flush()
+
+        # The reader's unflushed update is written last, so its view keeps it
+        self.assertEqual(reader.get_memory(memory_id)["content"], {"n": "reader"})
+        reader.flush()
+        self.assertEqual(self.open_store().get_memory(memory_id)["content"], {"n": "reader"})
+
+    def test_sync_reloads_after_clear_or_pruning(self):
+        writer = self.open_store()
+        reader = self.open_store()
+        reloads = self.count_reloads(reader)
+
+        writer.add_memory("test", {"n": 0})
+        writer.flush()
+        reader.get_memories("test")
+        writer.clear_memories("test")
+        writer.flush()
+        self.assertEqual(reader.get_memories("test"), [])
+        self.assertEqual(len(reloads), 1)
+
+        writer.change_log_size = 1
+        for n in range(3):
+            writer.add_memory("test", {"n": n})
+        writer.flush()
+        self.assertEqual(len(reader.get_memories("test")), 3)
+        self.assertEqual(len(reloads), 2)
+
+    def test_retention_across_processes(self):
+        policy = {"max_items": 3, "max_age_days": None, "max_bytes": None, "archive": True}
+        first = self.open_store()
+        second = self.open_store()
+        for store in (first, second):
+            store.retention = {"test": policy}
+
+        for n in range(3):
+            first.add_memory("test", {"n": n})
+        first.flush()
+        self.assertEqual(len(second.get_memories("test")), 3)
+
+        # Both evict the same oldest memory before either has flushed
+        first.add_memory("test", {"n": 3})
+        second.add_memory("test", {"n": 4})
+        first.flush()
+        second.flush()
+
+        reader = self.open_store()
+        stored = [memory["content"]["n"] for memory in reader.get_memories("test")]
+        archived = [memory["content"]["n"] for memory in reader.get_archived_memories("test")]
+        self.assertEqual(len(stored), 3)
+        self.assertEqual(len(archived), len(set(archived)))
+        self.assertEqual(sorted(stored + archived), [0, 1, 2, 3, 4])
+        self.assertEqual(len(first.get_memories("test")), 3)
+
+
+class MemoryStoreMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.memory_file = os.path.join(self.directory, "memory.json")
+        self.legacy = {"memories": [
+            {"id": 7, "type": "test", "timestamp": "2025-05-11T08:00:00", "content": {"n": 0}, "metadata": {}},
+            {"type": "test", "timestamp": "2025-05-12T08:00:00", "content": {"n": 1},
+             "metadata": {"rpp_id": "rpp-1"}}
+        ]}
+        with open(self.memory_file, "w") as f:
+            json.dump(self.legacy, f)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def open_store(self):
+        store = MemoryStoreManager(self.directory)
+        self.addCleanup(store.close)
+        return store
+
+    def test_imports_json_once_and_keeps_file(self):
+        store = self.open_store()
+        memories = store.get_memories("test")
+        self.assertEqual([memory["content"]["n"] for memory in memories], [0, 1])
+        self.assertEqual(store.get_memory(7)["content"], {"n": 0})
+        self.assertIsNotNone(memories[1]["id"])
+        self.assertNotEqual(memories[1]["id"], 7)
+
+        with open(self.memory_file) as f:
+            self.assertEqual(json.load(f), self.legacy)
+
+        store.add_memory("test", {"n": 2})
+        store.close()
+        self.assertEqual([memory["content"]["n"] for memory in self.open_store().get_memories("test")], [0, 1, 2])
+
+    def test_skips_json_renamed_by_earlier_migration(self):
+        open(self.memory_file + ".migrated", "w").close()
+        self.assertEqual(self.open_store().get_memories("test"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
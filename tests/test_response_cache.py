@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from langchain_core.documents import Document
+
+from src.agents.response_cache import ResponseCache
+from src.agents.rpp_agent import RPPAgent
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self._directory.name, "response_cache.sqlite3"), max_entries=2)
+        self.agent = SimpleNamespace(response_cache=self.cache)
+        self.documents = [Document(page_content="Fotosintesis terjadi di daun.", metadata={"chunk_id": "a:0"})]
+
+    def tearDown(self):
+        self.cache._conn.close()
+        self._directory.cleanup()
+
+    def make_key(self, query="RPP IPA kelas 7", section="Tujuan Pembelajaran", documents=None, **prompt_variables):
+        return RPPAgent._response_cache_key(
+            self.agent, query, section, self.documents if documents is None else documents, prompt_variables
+        )
+
+    def test_key_ignores_query_case_and_spacing(self):
+        self.assertEqual(self.make_key(), self.make_key(query="  rpp ipa   KELAS 7 "))
+
+    def test_key_changes_with_prompt_version(self):
+        key = self.make_key()
+        with mock.patch("src.agents.rpp_agent.PROMPT_TEMPLATE_VERSION", "test-next"):
+            self.assertNotEqual(self.make_key(), key)
+
+    def test_key_changes_with_model_options(self):
+        key = self.make_key()
+        for option, value in (("temperature", 0.1), ("max_tokens", 16), ("local_model", "lain.gguf")):
+            with mock.patch.dict("src.agents.rpp_agent.MODEL_CONFIG", {option: value}):
+                self.assertNotEqual(self.make_key(), key, option)
+        self.assertEqual(self.make_key(), key)
+
+    def test_key_changes_with_request_inputs(self):
+        key = self.make_key()
+        self.assertNotEqual(self.make_key(section="Asesmen"), key)
+        self.assertNotEqual(self.make_key(section=None), key)
+        self.assertNotEqual(self.make_key(documents=[]), key)
+        self.assertNotEqual(self.make_key(feedback="Tambahkan contoh"), key)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.put("a", "respons a")
+        self.cache.put("b", "respons b")
+        self.cache.get("a")
+        self.cache.put("c", "respons c")
+
+        self.assertEqual(self.cache.get("a"), "respons a")
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("c"), "respons c")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+
+from langchain_core.documents import Document
+
+from src.models.retrieval_cache import RetrievalCache
+
+
+class RetrievalCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.documents = [Document(page_content="Fotosintesis terjadi di daun.")]
+
+    def test_entry_expires_after_ttl(self):
+        cache = RetrievalCache(max_size=4, ttl=10)
+        with mock.patch("src.models.retrieval_cache.time.monotonic", return_value=100.0):
+            cache.put("fotosintesis", 3, 0, self.documents)
+        with mock.patch("src.models.retrieval_cache.time.monotonic", return_value=109.0):
+            self.assertEqual(cache.get("fotosintesis", 3, 0), self.documents)
+        with mock.patch("src.models.retrieval_cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("fotosintesis", 3, 0))
+        self.assertEqual(cache.get_stats()["entries"], 0)
+
+    def test_evicts_least_recently_used(self):
+        cache = RetrievalCache(max_size=2, ttl=None)
+        cache.put("a", 3, 0, self.documents)
+        cache.put("b", 3, 0, self.documents)
+        cache.get("a", 3, 0)
+        cache.put("c", 3, 0, self.documents)
+
+        self.assertIsNotNone(cache.get("a", 3, 0))
+        self.assertIsNone(cache.get("b", 3, 0))
+        self.assertIsNotNone(cache.get("c", 3, 0))
+
+    def test_collection_version_change_misses(self):
+        cache = RetrievalCache(max_size=4, ttl=None)
+        cache.put("fotosintesis", 3, 0, self.documents)
+
+        self.assertIsNone(cache.get("fotosintesis", 3, 1))
+        self.assertIsNotNone(cache.get("fotosintesis", 3, 0))
+
+    def test_key_includes_k_and_filter(self):
+        cache = RetrievalCache(max_size=4, ttl=None)
+        cache.put("fotosintesis", 3, 0, self.documents, {"kelas": "7"})
+
+        self.assertIsNone(cache.get("fotosintesis", 5, 0, {"kelas": "7"}))
+        self.assertIsNone(cache.get("fotosintesis", 3, 0, {"kelas": "8"}))
+        self.assertIsNone(cache.get("fotosintesis", 3, 0))
+        self.assertIsNotNone(cache.get("  fotosintesis ", 3, 0, {"kelas": "7"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+import unittest
+
+from server import RPPServer
+
+TOKENS = ["Tujuan ", "pembelajaran ", "siswa."]
+
+
+class StubAgent:
+    """Agent stand-in: streams fixed tokens, and blocks full generations until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def stream_rpp_section(self, query, section, context=None, use_cache=True):
+        for token in TOKENS:
+            yield token
+        return {"section_name": section, "section_content": "".join(TOKENS)}
+
+    def generate_rpp(self, query, context=None):
+        self.release.wait(5)
+        return {"rpp": "RPP tiruan"}
+
+
+async def send_request(port, method, path, body=None, headers=None):
+    """Send one HTTP request and return the status, headers and decoded body"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    head = [f"{method} {path} HTTP/1.1", "Host: localhost"]
+    head += [f"{name}: {value}" for name, value in (headers or {"Content-Length": len(data)}).items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, _, payload = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    response_headers = {
+        name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in lines[1:])
+    }
+    if response_headers.get("transfer-encoding") == "chunked":
+        chunks = b""
+        while payload:
+            size_line, _, payload = payload.partition(b"\r\n")
+            size = int(size_line, 16)
+            chunks += payload[:size]
+            payload = payload[size + 2:]
+        payload = chunks
+    return status, response_headers, payload.decode("utf-8")
+
+
+class RPPServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.agent = StubAgent()
+        self.rpp_server = RPPServer(self.agent, llm_concurrency=1, max_queue_size=1)
+        self.server = await self.rpp_server.start("127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.agent.release.set()
+        self.server.close()
+        await self.server.wait_closed()
+        await self.rpp_server.stop()
+
+    async def test_stream_sends_ndjson_in_order(self):
+        status, headers, body = await send_request(self.port, "POST", "/generate-section", {
+            "query": "RPP IPA kelas 7", "section": "Tujuan Pembelajaran", "stream": True
+        })
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-type"], "application/x-ndjson")
+
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertIn("queue_wait", lines[0])
+        self.assertEqual([line["token"] for line in lines[1:-1]], TOKENS)
+        self.assertEqual(lines[-1], {
+            "done": True,
+            "result": {"section_name": "Tujuan Pembelajaran", "section_content": "".join(TOKENS)}
+        })
+
+    async def test_full_queue_is_rejected_with_retry_after(self):
+        request = {"query": "RPP IPA kelas 7"}
+        running = asyncio.create_task(send_request(self.port, "POST", "/generate", request))
+        while self.rpp_server.stats["active"] < 1:
+            await asyncio.sleep(0.01)
+        queued = asyncio.create_task(send_request(self.port, "POST", "/generate", request))
+        while self.rpp_server.queue.qsize() < 1:
+            await asyncio.sleep(0.01)
+
+        status, headers, body = await send_request(self.port, "POST", "/generate", request)
+        self.assertEqual(status, 503)
+        self.assertIn("retry-after", headers)
+        self.assertEqual(self.rpp_server.stats["rejected"], 1)
+
+        self.agent.release.set()
+        for task in (running, queued):
+            status, _, body = await task
+            self.assertEqual(status, 200)
+            self.assertEqual(json.loads(body), {"rpp": "RPP tiruan"})
+
+    async def test_invalid_content_length_is_rejected(self):
+        for content_length in ("abc", "-5"):
+            status, _, body = await send_request(
+                self.port, "POST", "/generate", headers={"Content-Length": content_length}
+            )
+            self.assertEqual(status, 400)
+            self.assertEqual(json.loads(body), {"error": "Content-Length tidak valid"})
+
+
+if __name__ == "__main__":
+    unittest.main()
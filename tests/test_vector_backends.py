@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.models.vector_backends import NumpyIndexBackend
+
+
+def make_vectors(count, dim=32, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+
+
+class NumpyIndexBackendTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.backends = []
+
+    def tearDown(self):
+        for backend in self.backends:
+            backend._conn.close()
+            if backend._writer_lock_file is not None:
+                backend._writer_lock_file.close()
+        self._directory.cleanup()
+
+    def open_backend(self, name="index", **kwargs):
+        backend = NumpyIndexBackend(os.path.join(self.directory, name), partition_fields=("kelas",), **kwargs)
+        self.backends.append(backend)
+        return backend
+
+    def add_chunks(self, backend, vectors):
+        ids = [f"chunk:{i}" for i in range(len(vectors))]
+        backend.add(
+            ids,
+            vectors.tolist(),
+            [f"Isi potongan {i}" for i in range(len(vectors))],
+            [{"kelas": str(7 + i % 3), "mata_pelajaran": "ipa" if i % 2 else "matematika"} for i in range(len(vectors))]
+        )
+        return ids
+
+    def test_query_finds_stored_vectors(self):
+        for dtype in ("float16", "int8"):
+            with self.subTest(dtype=dtype):
+                vectors = make_vectors(200)
+                backend = self.open_backend(dtype, dtype=dtype)
+                self.add_chunks(backend, vectors)
+
+                for i in (0, 57, 199):
+                    result = backend.query(vectors[i].tolist(), k=3)
+                    self.assertEqual(result["ids"][0], f"chunk:{i}")
+                    self.assertEqual(result["documents"][0], f"Isi potongan {i}")
+                    self.assertAlmostEqual(result["distances"][0], 0.0, places=2)
+
+    def test_delete_frees_slots(self):
+        vectors = make_vectors(10)
+        backend = self.open_backend()
+        ids = self.add_chunks(backend, vectors)
+
+        backend.delete(ids[:3])
+        self.assertEqual(backend.count(), 7)
+        self.assertNotIn("chunk:0", backend.query(vectors[0].tolist(), k=10)["ids"])
+        self.assertEqual(backend.get(ids=ids[:3])["ids"], [])
+
+        backend.add(["baru"], [vectors[0].tolist()], ["Potongan baru"], [{}])
+        self.assertEqual(backend.count(), 8)
+        self.assertEqual(backend._next_slot, 10)
+        self.assertEqual(backend.query(vectors[0].tolist(), k=1)["ids"], ["baru"])
+
+    def test_filter_restricts_results(self):
+        vectors = make_vectors(30)
+        backend = self.open_backend()
+        self.add_chunks(backend, vectors)
+
+        result = backend.query(vectors[0].tolist(), k=30, where={"$and": [{"kelas": "8"}, {"mata_pelajaran": "ipa"}]})
+        self.assertTrue(result["ids"])
+        for metadata in result["metadatas"]:
+            self.assertEqual((metadata["kelas"], metadata["mata_pelajaran"]), ("8", "ipa"))
+        self.assertEqual(backend.query(vectors[0].tolist(), k=3, where={"kelas": "12"})["ids"], [])
+
+        backend.update_metadatas(["chunk:0"], [{"kelas": "12"}])
+        self.assertEqual(backend.query(vectors[0].tolist(), k=3, where={"kelas": "12"})["ids"], ["chunk:0"])
+
+    def test_ivf_recall(self):
+        vectors = make_vectors(2000, seed=1)
+        backend = self.open_backend(index_type="ivf", ivf_lists=8, ivf_probes=4)
+        self.add_chunks(backend, vectors)
+        backend.persist()
+        self.assertEqual(backend.get_stats()["ivf_lists"], 8)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        queries = make_vectors(50, seed=2)
+        found = 0
+        for query in queries:
+            exact = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:10]
+            result = backend.query(query.tolist(), k=10)["ids"]
+            found += len({f"chunk:{i}" for i in exact} & set(result))
+        self.assertGreaterEqual(found / (10 * len(queries)), 0.7)
+
+    def test_reopened_index_keeps_chunks(self):
+        vectors = make_vectors(20)
+        backend = self.open_backend()
+        self.add_chunks(backend, vectors)
+        backend.persist()
+
+        reader = self.open_backend()
+        self.assertEqual(reader.count(), 20)
+        self.assertEqual(reader.query(vectors[5].tolist(), k=1)["ids"], ["chunk:5"])
+        with self.assertRaises(RuntimeError):
+            reader.add(["lain"], [vectors[0].tolist()], ["Potongan lain"], [{}])
+
+
+if __name__ == "__main__":
+    unittest.main()